@@ -0,0 +1,8 @@
+#!/bin/sh
+
+# ------------------------------------
+# run the csv, api, web and server steps
+# of coder-mlb.sh concurrently; steps whose
+# prompt and inputs are unchanged are skipped
+# ------------------------------------
+../../../src/tech16-run/tech16-run mlb.workflow.json
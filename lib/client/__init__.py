@@ -28,7 +28,9 @@ from .exceptions import (
     APIKeyMissingError,
     ModelNotFoundError,
     APICallError,
-    InvalidContextError
+    InvalidContextError,
+    PatchError,
+    WorkflowError
 )
 from .config import get_supported_models
 
@@ -88,5 +90,7 @@ __all__ = [
     'ModelNotFoundError', 
     'APICallError',
     'InvalidContextError',
+    'PatchError',
+    'WorkflowError',
     'get_supported_models'
 ]
\ No newline at end of file
@@ -0,0 +1,157 @@
+"""Compact alternate representations of web pages: llms.txt, markdown twins and negotiation."""
+
+import json
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+from typing import Optional
+
+from .cache import DiskCache, content_hash
+
+# Content types of markdown and plain-text alternates
+MARKDOWN_TYPES = {'text/markdown', 'text/x-markdown', 'text/plain'}
+
+# Accept header preferring markdown through content negotiation
+MARKDOWN_ACCEPT = (
+    'text/markdown,text/x-markdown;q=0.95,text/html;q=0.9,application/xhtml+xml;q=0.9,'
+    'application/xml;q=0.8,text/plain;q=0.8,*/*;q=0.1'
+)
+
+# Seconds a host's probe results are trusted before probing again (one week)
+PROBE_TTL = 7 * 24 * 3600
+
+# Pages found without a markdown twin before a host is recorded as offering none
+TWIN_MISSES = 3
+
+# Kinds of alternates recorded per host
+LLMS_TXT = "llms_txt"
+MARKDOWN_TWIN = "markdown_twin"
+
+
+def alternate_url(url: str) -> Optional[str]:
+    """
+    Return the compact alternate to probe for a page URL.
+
+    A site root maps to /llms.txt. Any other page maps to its markdown twin:
+    "/guide/" to "/guide/index.md", "/guide/setup.html" to "/guide/setup.md"
+    and "/guide/setup" to "/guide/setup.md".
+
+    Args:
+        url: Page URL
+
+    Returns:
+        Optional[str]: Alternate URL, or None if the URL already names a
+        markdown or text file
+    """
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path or "/"
+    if path == "/":
+        return urllib.parse.urlunsplit((parts.scheme, parts.netloc, "/llms.txt", "", ""))
+
+    if path.lower().endswith((".md", ".txt")):
+        return None
+    if path.endswith("/"):
+        path += "index.md"
+    else:
+        stem, dot, extension = path.rpartition(".")
+        if dot and "/" not in extension and extension.lower() in ("html", "htm"):
+            path = stem
+        path += ".md"
+    return urllib.parse.urlunsplit((parts.scheme, parts.netloc, path, parts.query, ""))
+
+
+def alternate_kind(url: str) -> str:
+    """Return the kind of alternate alternate_url produces for a page URL."""
+    return LLMS_TXT if urllib.parse.urlsplit(url).path in ("", "/") else MARKDOWN_TWIN
+
+
+class AlternateProbes:
+    """Per-host record of which alternates a site offers, so barren sites are not re-probed."""
+
+    def __init__(self, directory: Optional[Path] = None, ttl: float = PROBE_TTL):
+        """
+        Initialize the probe record.
+
+        Args:
+            directory: Cache directory (default: the "alternates" cache namespace)
+            ttl: Seconds a recorded probe result is trusted
+        """
+        self.disk = DiskCache("alternates", directory)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(url: str) -> str:
+        parts = urllib.parse.urlsplit(url)
+        return content_hash("host", parts.scheme, parts.netloc.lower())
+
+    def _load(self, url: str) -> dict:
+        raw = self.disk.get(self._key(url))
+        try:
+            record = json.loads(raw) if raw else {}
+        except ValueError:
+            return {}
+        return record if isinstance(record, dict) else {}
+
+    def known(self, url: str, kind: str) -> Optional[bool]:
+        """
+        Return whether the URL's host offers a kind of alternate.
+
+        Args:
+            url: Any URL on the host
+            kind: LLMS_TXT or MARKDOWN_TWIN
+
+        Returns:
+            Optional[bool]: Recorded result, or None if never probed or expired
+        """
+        result = self._load(url).get(kind)
+        if not isinstance(result, list) or len(result) != 3:
+            return None
+        found, checked_at, misses = result
+        if time.time() - checked_at >= self.ttl:
+            return None
+        if found:
+            return True
+        return False if misses >= self._misses_needed(kind) else None
+
+    @staticmethod
+    def _misses_needed(kind: str) -> int:
+        # A host has one llms.txt, but one page without a twin says little about the rest
+        return 1 if kind == LLMS_TXT else TWIN_MISSES
+
+    def should_probe(self, url: str, kind: str) -> bool:
+        """Check whether an alternate is worth requesting: not recorded as absent."""
+        return self.known(url, kind) is not False
+
+    def record(self, url: str, kind: str, found: bool) -> None:
+        """
+        Record a probe result for the URL's host.
+
+        Only definitive results should be recorded: the alternate served, or
+        answered with 404/410 or a non-markdown type; never a network error
+        or server error. A host seen offering an alternate keeps that record
+        until it expires. A host is recorded as offering no markdown twins
+        only after TWIN_MISSES pages without one, and no llms.txt after one.
+
+        Args:
+            url: URL that was probed
+            kind: LLMS_TXT or MARKDOWN_TWIN
+            found: Whether the alternate was served
+        """
+        with self._lock:
+            known = self.known(url, kind)
+            if known is True or known is found:
+                return
+            record = self._load(url)
+            previous = record.get(kind)
+            misses = 0
+            if (
+                not found
+                and isinstance(previous, list)
+                and len(previous) == 3
+                and time.time() - previous[1] < self.ttl
+            ):
+                misses = previous[2]
+            record[kind] = [found, time.time(), 0 if found else misses + 1]
+            self.disk.set(self._key(url), json.dumps(record))
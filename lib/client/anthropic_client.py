@@ -1,6 +1,6 @@
 """Anthropic Claude client implementation."""
 
-from typing import List
+from typing import Iterator, List
 from .client import Client
 from .config import get_api_key, validate_model
 from .utils import (
@@ -50,13 +50,7 @@ class AnthropicClient(Client):
             # Format messages for Anthropic API
             messages = self._format_messages(context)
 
-            # Set max_tokens based on model type
-            if "sonnet" in model.lower():
-                max_tokens = 64000
-            elif "haiku" in model.lower():
-                max_tokens = 8192
-            else:
-                max_tokens = 4096
+            max_tokens = self._max_tokens(model)
 
             # Use streaming for large max_tokens to avoid timeout issues
             if max_tokens > 10000:
@@ -80,12 +74,56 @@ class AnthropicClient(Client):
             error_msg = format_error_message(e, self.provider, model)
             return error_msg
 
-    def _format_messages(self, context: List[str]) -> List[dict]:
+    def stream(self, model: str, context: List[str], cache: bool = False) -> Iterator[str]:
+        """
+        Query Claude and yield the response text as it is generated.
+
+        Not retried: once text has been yielded, a retry would repeat it.
+
+        Args:
+            model: The Claude model to use
+            context: List of context strings
+            cache: Add prompt cache breakpoints so the conversation so far is
+                cached for the next turn (see _format_messages)
+
+        Yields:
+            str: Successive pieces of the response
+
+        Raises:
+            APICallError: If the request or the stream fails
+        """
+        try:
+            validate_model(self.provider, model)
+            validate_context(context)
+
+            with self.client.messages.stream(
+                model=model, max_tokens=self._max_tokens(model), messages=self._format_messages(context, cache)
+            ) as stream:
+                yield from stream.text_stream
+        except Exception as e:
+            raise APICallError(format_error_message(e, self.provider, model)) from e
+
+    @staticmethod
+    def _max_tokens(model: str) -> int:
+        """Return the output token limit for a model family."""
+        if "sonnet" in model.lower():
+            return 64000
+        elif "haiku" in model.lower():
+            return 8192
+        return 4096
+
+    def _format_messages(self, context: List[str], cache: bool = False) -> List[dict]:
         """
         Format context strings into Anthropic message format.
 
+        With cache, the first message (the ingested material) and the last
+        one carry cache_control breakpoints: each turn writes the whole
+        conversation to the prompt cache and the next turn reads it back,
+        paying full price only for the newest exchange.
+
         Args:
             context: List of context strings
+            cache: Add prompt cache breakpoints
 
         Returns:
             List[dict]: Formatted messages for Anthropic API
@@ -112,4 +150,10 @@ class AnthropicClient(Client):
                     }
                 )
 
+        if cache:
+            for message in {0: messages[0], len(messages) - 1: messages[-1]}.values():
+                message["content"] = [
+                    {"type": "text", "text": message["content"], "cache_control": {"type": "ephemeral"}}
+                ]
+
         return messages
@@ -0,0 +1,150 @@
+"""Simple on-disk cache keyed by content hashes."""
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+# Environment variable that overrides the cache root directory
+CACHE_DIR_ENV_VAR = "TECH16_CACHE_DIR"
+
+
+def get_cache_dir(namespace: str) -> Path:
+    """
+    Get the cache directory for a namespace, creating it if needed.
+
+    Args:
+        namespace: Subdirectory name, e.g. "map_reduce"
+
+    Returns:
+        Path: Cache directory
+    """
+    root = os.getenv(CACHE_DIR_ENV_VAR)
+    if root:
+        base = Path(root)
+    else:
+        base = Path(os.getenv("XDG_CACHE_HOME", Path.home() / ".cache")) / "tech16"
+
+    cache_dir = base / namespace
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+def content_hash(*parts: str) -> str:
+    """Return a SHA-256 hex digest over the given string parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        encoded = part.encode("utf-8", errors="surrogatepass")
+        # Length prefix keeps ("ab", "c") and ("a", "bc") distinct
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """A directory of text entries addressed by hex keys."""
+
+    def __init__(self, namespace: str, directory: Optional[Path] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            namespace: Namespace used to locate the default directory
+            directory: Explicit directory, overriding the namespace lookup
+        """
+        if directory is None:
+            directory = get_cache_dir(namespace)
+        else:
+            directory.mkdir(parents=True, exist_ok=True)
+        self.directory = directory
+
+    def _path(self, key: str) -> Path:
+        """Return the file path for a key, fanned out by prefix."""
+        return self.directory / key[:2] / key
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached text for key, or None if absent or unreadable."""
+        data = self.get_bytes(key)
+        if data is None:
+            return None
+        try:
+            return data.decode("utf-8")
+        except UnicodeDecodeError:
+            return None
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """Return the cached bytes for key, or None if absent or unreadable."""
+        try:
+            return self._path(key).read_bytes()
+        except OSError:
+            return None
+
+    def set(self, key: str, value: str) -> None:
+        """Store text for key atomically; failures are ignored."""
+        self.set_bytes(key, value.encode("utf-8"))
+
+    def set_bytes(self, key: str, value: bytes) -> None:
+        """Store bytes for key atomically; failures are ignored."""
+        path = self._path(key)
+        tmp_path = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(value)
+            os.replace(tmp_path, path)
+        except OSError:
+            if tmp_path:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
+    def touch(self, key: str) -> None:
+        """Mark an entry as recently used so eviction keeps it longer."""
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+
+    def delete(self, key: str) -> None:
+        """Remove an entry if present."""
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+    def evict(self, max_bytes: int) -> int:
+        """
+        Remove least recently used entries until the cache fits in max_bytes.
+
+        Args:
+            max_bytes: Size limit for all entries together
+
+        Returns:
+            int: Number of entries removed
+        """
+        entries = []
+        total = 0
+        for path in self.directory.glob("??/*"):
+            if path.name.startswith(".tmp-"):
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        removed = 0
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
@@ -0,0 +1,84 @@
+"""Splitting of large text into chunks on semantic boundaries."""
+
+import re
+from typing import List
+
+# Rough characters-per-token ratio used for budget estimates
+CHARS_PER_TOKEN = 4
+
+# Default chunk size in characters (~12k tokens)
+DEFAULT_CHUNK_CHARS = 48000
+
+# Boundaries tried in order: blank lines, line breaks, sentence ends, spaces
+_SPLIT_PATTERNS = [
+    re.compile(r"\n\s*\n"),
+    re.compile(r"\n"),
+    re.compile(r"(?<=[.!?])\s+"),
+    re.compile(r" "),
+]
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of text without a tokenizer."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _split_pieces(text: str, level: int) -> List[str]:
+    """Split text at the given boundary level, keeping the separators attached."""
+    pattern = _SPLIT_PATTERNS[level]
+    pieces = []
+    start = 0
+    for match in pattern.finditer(text):
+        pieces.append(text[start:match.end()])
+        start = match.end()
+    if start < len(text):
+        pieces.append(text[start:])
+    return pieces
+
+
+def split_into_chunks(text: str, max_chars: int = DEFAULT_CHUNK_CHARS) -> List[str]:
+    """
+    Split text into chunks of at most max_chars characters.
+
+    Paragraph boundaries are preferred, then line breaks, sentence ends and
+    spaces. Text with no usable boundary is cut at max_chars.
+
+    Args:
+        text: Text to split
+        max_chars: Maximum characters per chunk
+
+    Returns:
+        List[str]: Chunks that concatenate back to the original text
+    """
+    if max_chars <= 0:
+        raise ValueError("max_chars must be positive")
+
+    if len(text) <= max_chars:
+        return [text] if text else []
+
+    return _pack(text, max_chars, 0)
+
+
+def _pack(text: str, max_chars: int, level: int) -> List[str]:
+    """Greedily pack pieces at one boundary level, recursing into oversize pieces."""
+    if level >= len(_SPLIT_PATTERNS):
+        return [text[i:i + max_chars] for i in range(0, len(text), max_chars)]
+
+    chunks = []
+    current = ""
+    for piece in _split_pieces(text, level):
+        if len(piece) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.extend(_pack(piece, max_chars, level + 1))
+        elif len(current) + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current += piece
+
+    if current:
+        chunks.append(current)
+
+    return chunks
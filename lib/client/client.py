@@ -1,10 +1,11 @@
 """Abstract Client interface for LLM providers."""
 
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterator, List
 
-from .exceptions import ModelNotFoundError, APIKeyMissingError, error_exit
+from .exceptions import ModelNotFoundError, APIKeyMissingError, APICallError, error_exit
 from .config import get_provider_for_model
+from .utils import is_error_response
 
 
 class Client(ABC):
@@ -30,6 +31,30 @@ class Client(ABC):
         """
         pass
 
+    def stream(self, model: str, context: List[str], cache: bool = False) -> Iterator[str]:
+        """
+        Query the LLM and yield the response text as it is generated.
+
+        Providers without a streaming implementation yield the whole
+        response from query() as a single chunk.
+
+        Args:
+            model: The model identifier to use for the query
+            context: List of strings that make up the context/conversation
+            cache: Mark the conversation prefix for prompt caching, for
+                providers that need it requested explicitly
+
+        Yields:
+            str: Successive pieces of the response
+
+        Raises:
+            APICallError: If the API call fails, possibly after some text was yielded
+        """
+        response = self.query(model, context)
+        if is_error_response(response):
+            raise APICallError(response)
+        yield response
+
 
 def create_client(model: str):
     """Create appropriate client instance for the given model."""
@@ -0,0 +1,305 @@
+"""Code-aware context compaction: reduce supporting source files to their interfaces."""
+
+import ast
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from .cache import DiskCache, content_hash
+from .chunking import estimate_tokens
+from .utils import worker_process_context
+
+# Bump when the skeleton format changes so cached results are not reused
+COMPACTION_VERSION = "1"
+
+# Below this many files the process pool costs more than it saves
+MIN_FILES_FOR_POOL = 4
+
+_FILE_HEADER = re.compile(r"^Content from file (.+) \(encoding: [^)]*\):$")
+
+# Declarations kept for brace-delimited languages, at top level or directly
+# inside a container block (class, struct, interface, ...)
+_BRACE_LANGUAGES = {
+    (".js", ".jsx", ".ts", ".tsx"): re.compile(
+        r"^\s*(import\b|export\b|(abstract\s+)?class\b|interface\b|type\b|enum\b|"
+        r"(async\s+)?function\b|(const|let|var)\s+\w+\s*=\s*(async\s*)?(\(|function\b)|"
+        r"(?!(if|for|while|switch|catch|return|else)\b)"
+        r"(public|private|protected|static|async|get|set|readonly|\s)*\w+\s*\(.*\)\s*(:\s*[^{]+)?\{)"
+    ),
+    (".java",): re.compile(
+        r"^\s*(package\b|import\b|@\w+|((public|protected|private|static|final|abstract|"
+        r"synchronized|default)\s+)*(class|interface|enum|record)\b|"
+        r"((public|protected|private|static|final|abstract|synchronized|default)\s+)+"
+        r"[\w<>\[\], ?]+\s+\w+\s*\()"
+    ),
+    (".go",): re.compile(r"^(package\b|import\b|func\b|type\b|const\b|var\b|\t\"[^\"]+\"$|\)$)"),
+    (".rs",): re.compile(
+        r"^\s*(use\b|mod\b|#\[|(pub(\([^)]*\))?\s+)?(async\s+)?(unsafe\s+)?"
+        r"(fn|struct|enum|trait|impl|type|const|static)\b)"
+    ),
+    (".c", ".h", ".cpp", ".hpp"): re.compile(
+        r"^\s*(#include\b|#define\b|typedef\b|(struct|class|enum|union|namespace)\b|template\s*<|"
+        r"(?!(if|for|while|switch|return|else)\b)[\w:<>\*&\s]+\s+[\*&]*[\w:~]+\s*\([^;]*\)\s*(const\s*)?(\{|$))"
+    ),
+    (".php",): re.compile(
+        r"^\s*(namespace\b|use\b|(abstract\s+|final\s+)?class\b|interface\b|trait\b|"
+        r"((public|protected|private|static|abstract|final)\s+)*function\b)"
+    ),
+}
+
+# Lines opening a block whose direct members are declarations too
+_CONTAINER = re.compile(r"\b(class|interface|struct|enum|union|trait|impl|namespace)\b")
+
+# Declarations kept for keyword-delimited languages
+_LINE_LANGUAGES = {
+    (".rb",): re.compile(r"^\s*(require|require_relative|include|extend|module|class|def|attr_\w+)\b"),
+    (".sh", ".bash", ".zsh"): re.compile(r"^\s*(function\s+\w+|\w+\s*\(\)\s*\{?)"),
+    (".pl",): re.compile(r"^\s*(use|package|sub)\b"),
+    (".r",): re.compile(r"^\s*(library\(|\w+\s*<-\s*function\b)"),
+}
+
+
+def _first_line(docstring: Optional[str]) -> Optional[str]:
+    """Return the first non-empty line of a docstring."""
+    if not docstring:
+        return None
+    for line in docstring.strip().splitlines():
+        if line.strip():
+            return line.strip()
+    return None
+
+
+def _stub_body(node: ast.AST) -> List[ast.stmt]:
+    """Return a body of the docstring's first line (if any) followed by '...'."""
+    body: List[ast.stmt] = []
+    doc = _first_line(ast.get_docstring(node))
+    if doc:
+        body.append(ast.Expr(ast.Constant(doc)))
+    body.append(ast.Expr(ast.Constant(Ellipsis)))
+    return body
+
+
+def _compact_python_body(body: List[ast.stmt]) -> List[ast.stmt]:
+    """Keep the interface-bearing statements of a module or class body."""
+    kept: List[ast.stmt] = []
+    for node in body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            kept.append(node)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            node.body = _stub_body(node)
+            kept.append(node)
+        elif isinstance(node, ast.ClassDef):
+            doc = _first_line(ast.get_docstring(node))
+            members = _compact_python_body(node.body)
+            node.body = ([ast.Expr(ast.Constant(doc))] if doc else []) + (
+                members or [ast.Expr(ast.Constant(Ellipsis))]
+            )
+            kept.append(node)
+        elif isinstance(node, ast.AnnAssign):
+            if len(ast.unparse(node)) > 120:
+                node.value = None
+            kept.append(node)
+        elif isinstance(node, ast.Assign) and len(ast.unparse(node)) <= 120:
+            # Short constants and class attributes describe the interface
+            kept.append(node)
+    return kept
+
+
+def compact_python(source: str) -> str:
+    """
+    Reduce Python source to imports, signatures, class shapes and docstring first lines.
+
+    Args:
+        source: Python source code
+
+    Returns:
+        str: Skeleton source
+
+    Raises:
+        SyntaxError: If the source does not parse
+    """
+    tree = ast.parse(source)
+    doc = _first_line(ast.get_docstring(tree))
+    body = _compact_python_body(tree.body)
+    tree.body = ([ast.Expr(ast.Constant(doc))] if doc else []) + body
+    return ast.unparse(tree) + "\n"
+
+
+def _compact_braces(source: str, pattern: "re.Pattern") -> str:
+    """Keep declaration lines of a brace-delimited source, eliding bodies."""
+    kept = []
+    # One entry per open brace: True if the block is a container
+    blocks: List[bool] = []
+    for line in source.splitlines():
+        stripped = line.strip()
+        visible = all(blocks)
+        is_declaration = visible and bool(stripped) and bool(pattern.match(line))
+        if is_declaration:
+            if stripped.endswith("{"):
+                kept.append(line.rstrip()[:-1].rstrip() + " { ... }")
+            else:
+                kept.append(line.rstrip())
+        elif visible and stripped.startswith(("/**", "///", "//!")):
+            # First line of a doc comment
+            kept.append(line.rstrip())
+
+        is_container = is_declaration and bool(_CONTAINER.search(line))
+        for char in line:
+            if char == "{":
+                blocks.append(is_container)
+                is_container = False
+            elif char == "}" and blocks:
+                blocks.pop()
+    return "\n".join(kept) + "\n"
+
+
+def _compact_lines(source: str, pattern: "re.Pattern") -> str:
+    """Keep the declaration lines of a keyword-delimited source."""
+    return "\n".join(line.rstrip() for line in source.splitlines() if pattern.match(line)) + "\n"
+
+
+def is_compactable(filepath: str) -> bool:
+    """Check whether a file's language has compaction rules."""
+    ext = Path(filepath).suffix.lower()
+    return ext == ".py" or any(ext in exts for exts in list(_BRACE_LANGUAGES) + list(_LINE_LANGUAGES))
+
+
+def compact_source(filepath: str, source: str) -> Optional[str]:
+    """
+    Reduce a source file to its interface.
+
+    Args:
+        filepath: File path, used to select the language rules
+        source: File content
+
+    Returns:
+        Optional[str]: Skeleton, or None if the language is unsupported or the file does not parse
+    """
+    ext = Path(filepath).suffix.lower()
+    if ext == ".py":
+        try:
+            return compact_python(source)
+        except (SyntaxError, ValueError):
+            return None
+
+    for exts, pattern in _BRACE_LANGUAGES.items():
+        if ext in exts:
+            return _compact_braces(source, pattern)
+
+    for exts, pattern in _LINE_LANGUAGES.items():
+        if ext in exts:
+            return _compact_lines(source, pattern)
+
+    return None
+
+
+def _compact_job(job: Tuple[str, str]) -> Optional[str]:
+    """Process pool entry point."""
+    return compact_source(*job)
+
+
+def _mentioned(name: str, text: str) -> bool:
+    """Check whether a path or file name appears in text as a whole name, not inside a longer one."""
+    # Not preceded by a name character, nor followed by one or by an extension ("a.py" in "data.py", "a.pyc")
+    pattern = rf"(?<![\w.-]){re.escape(name)}(?![\w-]|\.\w)"
+    return re.search(pattern, text) is not None
+
+
+def files_named_in(texts: Iterable[str], filepaths: Iterable[str]) -> set:
+    """Return the file paths whose path or file name appears in any of the texts as a whole name."""
+    named = set()
+    joined = "\n".join(texts)
+    for filepath in filepaths:
+        if _mentioned(filepath, joined) or _mentioned(Path(filepath).name, joined):
+            named.add(filepath)
+    return named
+
+
+def compact_contents(
+    contents: List[str],
+    targets: Iterable[str] = (),
+    max_workers: Optional[int] = None,
+    use_cache: bool = True,
+) -> List[str]:
+    """
+    Compact supporting source files in the context to signature skeletons.
+
+    Target files, files named in any non-code input (the prompt), and files
+    in unsupported languages are kept in full. Skeletons are computed in a
+    process pool and cached by content hash.
+
+    Args:
+        contents: Input contents; file contents start with "Content from file ..."
+        targets: File paths to keep in full
+        max_workers: Process pool size (default: CPU count)
+        use_cache: Reuse skeletons cached on disk
+
+    Returns:
+        List[str]: Contents with supporting source files compacted
+    """
+    parsed = []
+    for content in contents:
+        header, _, body = content.partition("\n")
+        match = _FILE_HEADER.match(header)
+        parsed.append((match.group(1) if match else None, header, body))
+
+    code_paths = [path for path, _, _ in parsed if path and is_compactable(path)]
+    prompt_texts = [body for path, _, body in parsed if not (path and is_compactable(path))]
+    target_paths = {os.path.normpath(t) for t in targets}
+    keep_full = files_named_in(prompt_texts, code_paths)
+    keep_full.update(p for p in code_paths if os.path.normpath(p) in target_paths)
+
+    to_compact = [
+        i for i, (path, _, _) in enumerate(parsed)
+        if path and is_compactable(path) and path not in keep_full
+    ]
+
+    cache = DiskCache("compaction") if use_cache else None
+    keys = {
+        i: content_hash(COMPACTION_VERSION, Path(parsed[i][0]).suffix.lower(), parsed[i][2])
+        for i in to_compact
+    }
+    skeletons = {}
+    if cache is not None:
+        for i in to_compact:
+            cached = cache.get(keys[i])
+            if cached is not None:
+                skeletons[i] = cached
+
+    pending = [i for i in to_compact if i not in skeletons]
+    jobs = [(parsed[i][0], parsed[i][2]) for i in pending]
+    if len(jobs) >= MIN_FILES_FOR_POOL:
+        # Not forked: callers such as tech16-coder's compact stage run beside other threads
+        with ProcessPoolExecutor(
+            max_workers=max_workers or os.cpu_count(), mp_context=worker_process_context()
+        ) as executor:
+            results = list(executor.map(_compact_job, jobs, chunksize=4))
+    else:
+        results = [_compact_job(job) for job in jobs]
+
+    for i, skeleton in zip(pending, results):
+        if skeleton is not None:
+            skeletons[i] = skeleton
+            if cache is not None:
+                cache.set(keys[i], skeleton)
+
+    result = list(contents)
+    compacted = before = after = 0
+    for i, skeleton in skeletons.items():
+        _, header, body = parsed[i]
+        # Only use the skeleton when it is actually smaller
+        if len(skeleton) < len(body):
+            result[i] = f"{header.rstrip(':')} [compacted to signatures]:\n{skeleton}"
+            compacted += 1
+            before += estimate_tokens(contents[i])
+            after += estimate_tokens(result[i])
+
+    print(
+        f"Compaction: {compacted} file(s) reduced from ~{before:,} to ~{after:,} tokens "
+        f"({len(keep_full)} named or target file(s) kept in full)",
+        file=sys.stderr,
+    )
+    return result
@@ -0,0 +1,398 @@
+"""Bounded, concurrent same-site crawling of URL inputs."""
+
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.robotparser
+import xml.etree.ElementTree as ET
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import requests
+
+from .chunking import estimate_tokens
+from .fetcher import DEFAULT_MAX_CONNECTIONS, DEFAULT_PER_HOST, create_extraction_pool, create_session
+from .http_cache import HTTPCache
+from .url_handler import scrape_url_content, MAX_TEXT_CHARS, REQUEST_TIMEOUT
+
+# Default maximum number of pages fetched by one crawl
+DEFAULT_MAX_PAGES = 50
+
+# Default token budget for all crawled pages together
+DEFAULT_CRAWL_TOKEN_BUDGET = 100000
+
+# Minimum seconds between requests to one host when robots.txt sets no Crawl-delay
+DEFAULT_HOST_INTERVAL = 0.2
+
+# Largest sitemap document read
+MAX_SITEMAP_SIZE = 5 * 1024 * 1024
+
+USER_AGENT = "tech16-cli"
+
+# Link targets that are never pages worth extracting
+SKIPPED_EXTENSIONS = (
+    ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".ico", ".pdf", ".zip", ".gz",
+    ".tar", ".tgz", ".whl", ".exe", ".dmg", ".mp3", ".mp4", ".mov", ".woff", ".woff2",
+    ".ttf", ".css", ".js",
+)
+
+_SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+
+class CrawledPage(NamedTuple):
+    """A fetched page in discovery order."""
+
+    order: int
+    depth: int
+    url: str
+    content: str
+
+
+def canonicalize_url(url: str) -> Optional[str]:
+    """
+    Normalize a URL so equivalent forms compare equal.
+
+    Lowercases the scheme and host, drops default ports, fragments and
+    utm_* tracking parameters, and gives an empty path a "/".
+
+    Args:
+        url: Absolute URL
+
+    Returns:
+        Optional[str]: Canonical URL, or None if it is not http(s)
+    """
+    parts = urllib.parse.urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https") or not parts.hostname:
+        return None
+
+    host = parts.hostname.lower()
+    port = parts.port
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+
+    query = urllib.parse.urlencode(
+        [(k, v) for k, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+         if not k.lower().startswith("utm_")]
+    )
+    return urllib.parse.urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+def _is_page_link(url: str) -> bool:
+    return not urllib.parse.urlsplit(url).path.lower().endswith(SKIPPED_EXTENSIONS)
+
+
+class RobotsPolicy:
+    """Per-host robots.txt rules, fetched once per host; other threads asking meanwhile wait for it."""
+
+    def __init__(self, session: requests.Session):
+        self.session = session
+        self._parsers: Dict[str, Optional[urllib.robotparser.RobotFileParser]] = {}
+        self._origin_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _parser(self, url: str) -> Optional[urllib.robotparser.RobotFileParser]:
+        parts = urllib.parse.urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        with self._lock:
+            if origin in self._parsers:
+                return self._parsers[origin]
+            origin_lock = self._origin_locks.setdefault(origin, threading.Lock())
+
+        with origin_lock:
+            with self._lock:
+                if origin in self._parsers:
+                    return self._parsers[origin]
+            parser = self._download(origin)
+            with self._lock:
+                self._parsers[origin] = parser
+        return parser
+
+    def _download(self, origin: str) -> Optional[urllib.robotparser.RobotFileParser]:
+        parser: Optional[urllib.robotparser.RobotFileParser] = urllib.robotparser.RobotFileParser()
+        try:
+            response = self.session.get(f"{origin}/robots.txt", timeout=REQUEST_TIMEOUT)
+            if response.status_code in (401, 403):
+                parser.disallow_all = True
+            elif response.status_code >= 400:
+                parser = None  # No robots.txt: everything is allowed
+            else:
+                parser.parse(response.text.splitlines())
+        except requests.exceptions.RequestException:
+            parser = None
+        return parser
+
+    def allowed(self, url: str) -> bool:
+        """Check whether robots.txt allows fetching a URL."""
+        parser = self._parser(url)
+        return parser is None or parser.can_fetch(USER_AGENT, url)
+
+    def crawl_delay(self, url: str) -> Optional[float]:
+        """Return the host's Crawl-delay, if any."""
+        parser = self._parser(url)
+        delay = parser.crawl_delay(USER_AGENT) if parser is not None else None
+        return float(delay) if delay is not None else None
+
+    def sitemaps(self, url: str) -> List[str]:
+        """Return the sitemap URLs listed in the host's robots.txt."""
+        parser = self._parser(url)
+        return list(parser.site_maps() or []) if parser is not None else []
+
+
+class HostRateLimiter:
+    """Spaces out requests to each host by a minimum interval."""
+
+    def __init__(self, robots: RobotsPolicy, default_interval: float = DEFAULT_HOST_INTERVAL):
+        self.robots = robots
+        self.default_interval = default_interval
+        self._next_allowed: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> None:
+        """Block until a request to the URL's host is allowed."""
+        host = urllib.parse.urlsplit(url).netloc
+        delay = self.robots.crawl_delay(url)
+        interval = delay if delay is not None else self.default_interval
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_allowed.get(host, now))
+            self._next_allowed[host] = start + interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def sitemap_urls(session: requests.Session, sitemap_url: str, limit: int, depth: int = 1) -> List[str]:
+    """
+    Read page URLs from a sitemap, following one level of sitemap indexes.
+
+    Args:
+        session: Session used for the requests
+        sitemap_url: URL of sitemap.xml or a sitemap index
+        limit: Maximum number of URLs returned
+        depth: Levels of nested sitemap indexes still followed
+
+    Returns:
+        List[str]: Page URLs, or an empty list if the sitemap is missing or invalid
+    """
+    try:
+        response = session.get(sitemap_url, timeout=REQUEST_TIMEOUT)
+        if response.status_code != 200 or len(response.content) > MAX_SITEMAP_SIZE:
+            return []
+        root = ET.fromstring(response.content)
+    except (requests.exceptions.RequestException, ET.ParseError):
+        return []
+
+    locations = [
+        (loc.text or "").strip()
+        for loc in root.iter()
+        if loc.tag in (f"{_SITEMAP_NS}loc", "loc")
+    ]
+    if root.tag.endswith("sitemapindex"):
+        urls: List[str] = []
+        for nested in locations if depth > 0 else []:
+            urls.extend(sitemap_urls(session, nested, limit - len(urls), depth - 1))
+            if len(urls) >= limit:
+                break
+        return urls[:limit]
+    return [loc for loc in locations if loc][:limit]
+
+
+class Crawler:
+    """Breadth-first crawler that scrapes pages concurrently and yields them as they arrive."""
+
+    def __init__(
+        self,
+        max_depth: int = 1,
+        max_pages: int = DEFAULT_MAX_PAGES,
+        same_host: bool = False,
+        max_chars: Optional[int] = MAX_TEXT_CHARS,
+        token_budget: Optional[int] = DEFAULT_CRAWL_TOKEN_BUDGET,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        per_host: int = DEFAULT_PER_HOST,
+        session: Optional[requests.Session] = None,
+        cache: Optional[HTTPCache] = None,
+        extract: str = "full",
+        use_sitemap: bool = True,
+        extract_workers: Optional[int] = None,
+    ):
+        """
+        Initialize the crawler.
+
+        Args:
+            max_depth: Link hops followed from the seed URLs (0 fetches only the seeds)
+            max_pages: Maximum number of pages fetched
+            same_host: Only follow links to the hosts of the seed URLs
+            max_chars: Maximum characters of text per page, or None for no limit
+            token_budget: Stop once crawled pages reach this many estimated tokens, or None
+            max_connections: Maximum concurrent requests overall
+            per_host: Maximum concurrent requests to one host
+            session: Session to reuse; one is created if omitted
+            cache: HTTP cache for page fetches, or None to always download
+            extract: Extraction mode, "full" or "main"
+            use_sitemap: Seed the frontier from the seed hosts' sitemaps
+            extract_workers: Processes extracting page text (default: CPU count);
+                1 extracts in the fetch threads
+        """
+        self.max_depth = max(0, max_depth)
+        self.max_pages = max(1, max_pages)
+        self.same_host = same_host
+        self.max_chars = max_chars
+        self.token_budget = token_budget
+        self.max_connections = max(1, max_connections)
+        self.per_host = max(1, per_host)
+        self.session = session or create_session(self.max_connections)
+        self.cache = cache
+        self.extract = extract
+        self.use_sitemap = use_sitemap
+        self.extract_workers = extract_workers
+        self._pool = None
+        self.robots = RobotsPolicy(self.session)
+        self.rate_limiter = HostRateLimiter(self.robots)
+        self._host_slots: Dict[str, threading.Semaphore] = {}
+        self._slots_lock = threading.Lock()
+
+    def _host_slot(self, url: str) -> threading.Semaphore:
+        host = urllib.parse.urlsplit(url).netloc
+        with self._slots_lock:
+            return self._host_slots.setdefault(host, threading.Semaphore(self.per_host))
+
+    def _fetch(self, url: str, check_robots: bool) -> Tuple[Optional[str], List[str]]:
+        """
+        Fetch one page, returning its content and the links found on it.
+
+        robots.txt is checked here, on the worker, so a host's first check
+        does not hold up scheduling; content is None if it disallows the page.
+        """
+        if check_robots and not self.robots.allowed(url):
+            return None, []
+        links: List[str] = []
+        with self._host_slot(url):
+            self.rate_limiter.wait(url)
+            print(f"Crawling URL: {url}", file=sys.stderr)
+            content = scrape_url_content(
+                url, self.max_chars, session=self.session, cache=self.cache,
+                extract=self.extract, links=links, pool=self._pool,
+            )
+        return content, links
+
+    def _in_scope(self, url: str, seed_hosts: set) -> bool:
+        if not _is_page_link(url):
+            return False
+        return not self.same_host or urllib.parse.urlsplit(url).netloc in seed_hosts
+
+    def _sitemap_seeds(self, seeds: List[str]) -> List[str]:
+        """Return sitemap URLs under each seed's directory, for seeding depth 1."""
+        found = []
+        for seed in seeds:
+            parts = urllib.parse.urlsplit(seed)
+            prefix = parts.path.rsplit("/", 1)[0] + "/"
+            origin = f"{parts.scheme}://{parts.netloc}"
+            sitemaps = self.robots.sitemaps(seed) or [f"{origin}/sitemap.xml"]
+            for sitemap in sitemaps:
+                for url in sitemap_urls(self.session, sitemap, self.max_pages):
+                    if urllib.parse.urlsplit(url).path.startswith(prefix):
+                        found.append(url)
+        return found
+
+    def pages(self, seeds: List[str]) -> Iterator[CrawledPage]:
+        """
+        Crawl from the seed URLs, yielding pages as they are fetched.
+
+        Seeds are always fetched and reported, errors included. Discovered
+        pages that fail or are disallowed by robots.txt are skipped. The crawl
+        stops at max_pages or when the token budget is reached.
+
+        Args:
+            seeds: Starting URLs
+
+        Yields:
+            CrawledPage: Fetched pages, in completion order
+        """
+        seen = set()
+        frontier: List[Tuple[int, str]] = []
+        for seed in seeds:
+            canonical = canonicalize_url(seed)
+            if canonical and canonical not in seen:
+                seen.add(canonical)
+                frontier.append((0, canonical))
+        seed_urls = {url for _, url in frontier}
+        seed_hosts = {urllib.parse.urlsplit(url).netloc for url in seed_urls}
+
+        if self.use_sitemap and self.max_depth > 0:
+            for url in self._sitemap_seeds(sorted(seed_urls)):
+                canonical = canonicalize_url(url)
+                if canonical and canonical not in seen and self._in_scope(canonical, seed_hosts):
+                    seen.add(canonical)
+                    frontier.append((1, canonical))
+
+        scheduled = 0
+        used_tokens = 0
+        order = 0
+        self._pool = create_extraction_pool(self.max_pages, self.extract_workers)
+        executor = ThreadPoolExecutor(max_workers=self.max_connections)
+        running: Dict = {}
+        try:
+            while frontier or running:
+                budget_full = self.token_budget is not None and used_tokens >= self.token_budget
+                # Keep the pool busy, lowest depth first
+                while frontier and len(running) < self.max_connections and scheduled < self.max_pages and not budget_full:
+                    frontier.sort(key=lambda item: item[0])
+                    depth, url = frontier.pop(0)
+                    running[executor.submit(self._fetch, url, url not in seed_urls)] = (depth, url)
+                    scheduled += 1
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    depth, url = running.pop(future)
+                    content, links = future.result()
+                    if content is None:
+                        # Disallowed by robots.txt: does not count towards max_pages
+                        scheduled -= 1
+                        continue
+                    is_seed = url in seed_urls
+                    if not is_seed and not content.startswith("Content from "):
+                        continue
+
+                    yield CrawledPage(order, depth, url, content)
+                    order += 1
+                    used_tokens += estimate_tokens(content)
+
+                    if depth < self.max_depth:
+                        for link in links:
+                            canonical = canonicalize_url(link)
+                            if canonical and canonical not in seen and self._in_scope(canonical, seed_hosts):
+                                seen.add(canonical)
+                                frontier.append((depth + 1, canonical))
+
+            if self.token_budget is not None and used_tokens >= self.token_budget:
+                print(f"Crawl stopped: token budget of {self.token_budget:,} reached", file=sys.stderr)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+def crawl_urls(seeds: List[str], **options) -> List[str]:
+    """
+    Crawl from seed URLs and return page contents in breadth-first order.
+
+    Args:
+        seeds: Starting URLs
+        **options: Crawler options (see Crawler)
+
+    Returns:
+        List[str]: Scraped contents, seeds first, then by depth and discovery
+    """
+    if not seeds:
+        return []
+    start = time.monotonic()
+    pages = sorted(Crawler(**options).pages(seeds), key=lambda p: (p.depth, p.order))
+    print(
+        f"Crawled {len(pages)} page(s) in {time.monotonic() - start:.1f}s",
+        file=sys.stderr,
+    )
+    return [page.content for page in pages]
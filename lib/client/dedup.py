@@ -0,0 +1,219 @@
+"""Exact and near-duplicate removal across input sources before context assembly."""
+
+import hashlib
+import re
+import sys
+import zlib
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .chunking import estimate_tokens
+
+# Words per shingle for MinHash
+SHINGLE_SIZE = 5
+
+# MinHash signature length, split into LSH bands of NUM_PERMUTATIONS / LSH_BANDS rows
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 32
+
+# Estimated Jaccard similarity at which two sources count as near-duplicates
+NEAR_DUPLICATE_THRESHOLD = 0.85
+
+# Repeated blocks shorter than this are kept (short lines repeat legitimately)
+MIN_BLOCK_CHARS = 200
+
+# Shingles hashed per NumPy batch, bounding memory for large sources
+_MINHASH_BATCH = 4096
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Coefficients below 2**31 keep a * x + b for 32-bit x inside uint64
+_rng = np.random.default_rng(16)
+_PERM_A = _rng.integers(1, 1 << 31, NUM_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 1 << 31, NUM_PERMUTATIONS, dtype=np.uint64)
+
+_WHITESPACE = re.compile(r"\s+")
+_BLOCK_SEPARATOR = re.compile(r"(\n\s*\n)")
+
+
+class DedupReport(NamedTuple):
+    """Summary of what deduplication removed."""
+
+    exact_sources: int
+    near_sources: int
+    repeated_blocks: int
+    bytes_saved: int
+    tokens_saved: int
+
+    def summary(self) -> str:
+        """Return a one-line description for stderr."""
+        return (
+            f"Dedup: {self.exact_sources} exact and {self.near_sources} near-duplicate "
+            f"source(s), {self.repeated_blocks} repeated block(s); saved "
+            f"{self.bytes_saved:,} bytes (~{self.tokens_saved:,} tokens)"
+        )
+
+
+def _normalize(text: str) -> str:
+    """Collapse whitespace so formatting differences do not hide duplicates."""
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _digest(text: str) -> bytes:
+    """Return a digest of normalized text."""
+    return hashlib.blake2b(_normalize(text).encode("utf-8"), digest_size=16).digest()
+
+
+def minhash_signature(text: str) -> Optional[np.ndarray]:
+    """
+    Compute the MinHash signature of the word shingles of text.
+
+    Args:
+        text: Text to sign
+
+    Returns:
+        Optional[np.ndarray]: Signature of NUM_PERMUTATIONS values, or None for empty text
+    """
+    words = _normalize(text).lower().split(" ")
+    if not words or words == [""]:
+        return None
+
+    count = max(1, len(words) - SHINGLE_SIZE + 1)
+    hashes = np.fromiter(
+        (zlib.crc32(" ".join(words[i:i + SHINGLE_SIZE]).encode("utf-8")) for i in range(count)),
+        dtype=np.uint64,
+        count=count,
+    )
+
+    signature = np.full(NUM_PERMUTATIONS, _MAX_HASH, dtype=np.uint64)
+    for start in range(0, count, _MINHASH_BATCH):
+        batch = hashes[start:start + _MINHASH_BATCH]
+        # (a * x + b) mod p, truncated to 32 bits
+        permuted = (np.outer(_PERM_A, batch) + _PERM_B[:, None]) % _MERSENNE_PRIME
+        np.minimum(signature, (permuted & _MAX_HASH).min(axis=1), out=signature)
+    return signature
+
+
+def _lsh_candidates(signatures: Dict[int, np.ndarray]) -> List[Tuple[int, int]]:
+    """Return candidate (earlier, later) index pairs that share an LSH band."""
+    rows = NUM_PERMUTATIONS // LSH_BANDS
+    buckets: Dict[Tuple[int, bytes], List[int]] = {}
+    for index, signature in signatures.items():
+        for band in range(LSH_BANDS):
+            key = (band, signature[band * rows:(band + 1) * rows].tobytes())
+            buckets.setdefault(key, []).append(index)
+
+    pairs = set()
+    for members in buckets.values():
+        for i, first in enumerate(members):
+            for second in members[i + 1:]:
+                pairs.add((min(first, second), max(first, second)))
+    return sorted(pairs)
+
+
+def _label(content: str) -> str:
+    """Return the header line of a content item without its trailing colon."""
+    return content.partition("\n")[0].rstrip(":")
+
+
+def _dedup_blocks(contents: List[str], labels: List[str]) -> Tuple[List[str], int]:
+    """Replace repeated paragraph-level blocks with a reference to their first occurrence."""
+    seen: Dict[bytes, str] = {}
+    repeated = 0
+    result = []
+    for index, content in enumerate(contents):
+        header, sep, body = content.partition("\n")
+        parts = _BLOCK_SEPARATOR.split(body)
+        for i in range(0, len(parts), 2):
+            block = parts[i]
+            if len(block) < MIN_BLOCK_CHARS:
+                continue
+            digest = _digest(block)
+            if digest in seen:
+                parts[i] = f"[repeated block omitted, same as in {seen[digest]}]"
+                repeated += 1
+            else:
+                seen[digest] = labels[index]
+        result.append(header + sep + "".join(parts))
+    return result, repeated
+
+
+def deduplicate_contents(
+    contents: List[str], threshold: float = NEAR_DUPLICATE_THRESHOLD
+) -> Tuple[List[str], DedupReport]:
+    """
+    Remove exact and near-duplicate material across input contents.
+
+    Whole sources that duplicate an earlier source are replaced by a short
+    reference to the copy that is kept, and repeated blocks within or across
+    sources are replaced by a reference to their first occurrence. Only file
+    and page contents ("Content from ...") are considered.
+
+    Args:
+        contents: Input contents in context order
+        threshold: Estimated Jaccard similarity for near-duplicate sources
+
+    Returns:
+        Tuple[List[str], DedupReport]: (deduplicated contents, report)
+    """
+    candidates = [i for i, c in enumerate(contents) if c.startswith("Content from ")]
+    labels = [_label(c) for c in contents]
+    result = list(contents)
+    dropped = set()
+
+    # Exact duplicates of whole sources
+    exact = 0
+    first_by_digest: Dict[bytes, int] = {}
+    for index in candidates:
+        digest = _digest(contents[index].partition("\n")[2])
+        if digest in first_by_digest:
+            kept = first_by_digest[digest]
+            result[index] = f"{labels[index]}: same content as {labels[kept]} (omitted)"
+            dropped.add(index)
+            exact += 1
+        else:
+            first_by_digest[digest] = index
+
+    # Near duplicates of whole sources via MinHash and LSH
+    near = 0
+    signatures = {}
+    for index in candidates:
+        if index not in dropped:
+            signature = minhash_signature(contents[index].partition("\n")[2])
+            if signature is not None:
+                signatures[index] = signature
+
+    for first, second in _lsh_candidates(signatures):
+        if first in dropped or second in dropped:
+            continue
+        similarity = float(np.mean(signatures[first] == signatures[second]))
+        if similarity >= threshold:
+            result[second] = (
+                f"{labels[second]}: near-duplicate ({similarity:.0%} similar) of "
+                f"{labels[first]} (omitted)"
+            )
+            dropped.add(second)
+            near += 1
+
+    # Repeated blocks in the sources that remain
+    remaining = [i for i in candidates if i not in dropped]
+    deduped, repeated = _dedup_blocks([result[i] for i in remaining], [labels[i] for i in remaining])
+    for index, content in zip(remaining, deduped):
+        result[index] = content
+
+    bytes_saved = sum(len(c.encode("utf-8")) for c in contents) - sum(
+        len(c.encode("utf-8")) for c in result
+    )
+    tokens_saved = sum(estimate_tokens(c) for c in contents) - sum(
+        estimate_tokens(c) for c in result
+    )
+    return result, DedupReport(exact, near, repeated, bytes_saved, tokens_saved)
+
+
+def deduplicate_and_report(contents: List[str]) -> List[str]:
+    """Deduplicate contents and print the report to stderr."""
+    result, report = deduplicate_contents(contents)
+    print(report.summary(), file=sys.stderr)
+    return result
@@ -33,6 +33,18 @@ class InvalidContextError(ClientError):
     pass
 
 
+class PatchError(ClientError):
+    """Raised when a model-written edit cannot be parsed or applied to a file."""
+
+    pass
+
+
+class WorkflowError(ClientError):
+    """Raised when a workflow file is invalid or a step's inputs cannot be read."""
+
+    pass
+
+
 def error_exit(message: str, exit_code: int = 1) -> None:
     """Print error message to stderr and exit with specified code."""
     print(f"Error: {message}", file=sys.stderr)
@@ -0,0 +1,238 @@
+"""Concurrent URL fetching over a shared keep-alive connection pool."""
+
+import os
+import sys
+import threading
+import time
+import urllib.parse
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .alternates import AlternateProbes
+from .http_cache import HTTPCache
+from .url_handler import scrape_url_content, MAX_TEXT_CHARS
+from .utils import worker_process_context
+
+# Maximum concurrent requests overall
+DEFAULT_MAX_CONNECTIONS = 8
+
+# Maximum concurrent requests to one host
+DEFAULT_PER_HOST = 4
+
+# Seconds allowed for fetching all URLs
+DEFAULT_DEADLINE = 60
+
+# Fewest pages worth starting extraction worker processes for
+MIN_PAGES_FOR_POOL = 2
+
+# Seconds allowed for extraction workers to start before extracting in-process instead
+WARM_UP_TIMEOUT = 30
+
+
+def _warm_up() -> None:
+    """No-op task that makes the pool start its workers."""
+
+
+def _start_pool(workers: int) -> Optional[ProcessPoolExecutor]:
+    """
+    Start a process pool and wait for its workers.
+
+    Fetch threads are usually running already, so the workers are started
+    through worker_process_context rather than forked.
+
+    Args:
+        workers: Worker processes
+
+    Returns:
+        Optional[ProcessPoolExecutor]: Started pool, or None if the workers
+        did not start within WARM_UP_TIMEOUT
+    """
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=worker_process_context())
+    try:
+        pool.submit(_warm_up).result(timeout=WARM_UP_TIMEOUT)
+    except (TimeoutError, OSError, BrokenProcessPool) as e:
+        print(f"Warning: Extraction workers did not start, extracting in-process: {e or 'timed out'}", file=sys.stderr)
+        pool.shutdown(wait=False, cancel_futures=True)
+        return None
+    return pool
+
+
+class ExtractionPool(Executor):
+    """
+    Process pool for HTML-to-text extraction, started by the first page submitted.
+
+    Pages served from the HTTP cache are never submitted, so a run whose
+    pages are all cache hits starts no worker processes. If the workers do
+    not start, submitted pages are extracted in the calling thread.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._started = False
+        self._lock = threading.Lock()
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        """Run fn in a worker process, starting the workers on first use."""
+        with self._lock:
+            if not self._started:
+                self._started = True
+                self._pool = _start_pool(self.workers)
+        if self._pool is not None:
+            return self._pool.submit(fn, *args, **kwargs)
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        """Stop the workers, if they were started."""
+        with self._lock:
+            self._started = True
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+def create_extraction_pool(pages: int, workers: Optional[int] = None) -> Optional[ExtractionPool]:
+    """
+    Create a process pool for HTML-to-text extraction, if it is worth having.
+
+    Parsing is pure Python and holds the GIL, so fetch threads would take
+    turns on one core; worker processes parse pages in parallel. The
+    workers are only started when the first downloaded page needs parsing.
+
+    Args:
+        pages: Number of pages that will be extracted
+        workers: Worker processes (default: CPU count), capped at pages
+
+    Returns:
+        Optional[ExtractionPool]: Pool, or None to extract in-process
+        (a single page, or a single worker)
+    """
+    workers = min(workers or os.cpu_count() or 1, pages)
+    if workers < MIN_PAGES_FOR_POOL:
+        return None
+    return ExtractionPool(workers)
+
+
+def create_session(max_connections: int = DEFAULT_MAX_CONNECTIONS) -> requests.Session:
+    """
+    Create a session whose connection pool can serve max_connections requests at once.
+
+    Args:
+        max_connections: Connections kept per host pool
+
+    Returns:
+        requests.Session: Session with keep-alive pooling for http and https
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class _HostLimiter:
+    """Per-host semaphores created on first use."""
+
+    def __init__(self, per_host: int):
+        self.per_host = per_host
+        self._semaphores: Dict[str, threading.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> threading.Semaphore:
+        """Return the semaphore for the URL's host."""
+        host = urllib.parse.urlparse(url).netloc.lower()
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.Semaphore(self.per_host)
+            return self._semaphores[host]
+
+
+def fetch_urls(
+    urls: List[str],
+    max_chars: Optional[int] = MAX_TEXT_CHARS,
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    per_host: int = DEFAULT_PER_HOST,
+    deadline: Optional[float] = DEFAULT_DEADLINE,
+    session: Optional[requests.Session] = None,
+    cache: Optional[HTTPCache] = None,
+    extract: str = "full",
+    alternates: Optional[AlternateProbes] = None,
+    extract_workers: Optional[int] = None,
+) -> List[str]:
+    """
+    Scrape URLs concurrently, returning contents in input order.
+
+    Each result is what scrape_url_content returns for that URL, so errors
+    are reported per URL. URLs still pending when the deadline passes get
+    an error message instead of content.
+
+    Args:
+        urls: URLs to scrape
+        max_chars: Maximum characters of text per page, or None for no limit
+        max_connections: Maximum concurrent requests overall
+        per_host: Maximum concurrent requests to one host
+        deadline: Seconds allowed for all URLs, or None to wait for every URL
+        session: Session to reuse; one with a matching pool is created if omitted
+        cache: HTTP cache shared by all fetches, or None to always download
+        extract: Extraction mode, "full" or "main" (see scrape_url_content)
+        alternates: Probe record for preferring llms.txt and markdown
+            alternates, or None to fetch URLs as-is
+        extract_workers: Processes extracting page text (default: CPU count);
+            1 extracts in the fetch threads
+
+    Returns:
+        List[str]: Scraped contents or error messages, in the order of urls
+    """
+    if not urls:
+        return []
+
+    max_connections = max(1, max_connections)
+    own_session = session is None
+    if own_session:
+        session = create_session(max_connections)
+    limiter = _HostLimiter(max(1, per_host))
+    pool = create_extraction_pool(len(urls), extract_workers)
+
+    def fetch_one(url: str) -> str:
+        with limiter.get(url):
+            print(f"Scraping URL: {url}", file=sys.stderr)
+            return scrape_url_content(
+                url, max_chars, session=session, cache=cache, extract=extract,
+                alternates=alternates, pool=pool,
+            )
+
+    executor = ThreadPoolExecutor(max_workers=min(max_connections, len(urls)))
+    try:
+        start = time.monotonic()
+        futures = [executor.submit(fetch_one, url) for url in urls]
+        wait(futures, timeout=deadline)
+
+        results = []
+        for url, future in zip(urls, futures):
+            if future.done():
+                results.append(future.result())
+            else:
+                future.cancel()
+                results.append(f"Error: Deadline of {deadline}s exceeded before fetching URL: {url}")
+
+        print(
+            f"Fetched {len(urls)} URL(s) in {time.monotonic() - start:.1f}s",
+            file=sys.stderr,
+        )
+        return results
+    finally:
+        # Requests still running finish within REQUEST_TIMEOUT; do not wait for them
+        executor.shutdown(wait=False, cancel_futures=True)
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        if own_session:
+            session.close()
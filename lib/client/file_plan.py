@@ -0,0 +1,154 @@
+"""Manifest-first code generation: list the files with their interfaces, then generate each file concurrently."""
+
+import posixpath
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, NamedTuple, Tuple
+
+from .client import Client
+from .exceptions import APICallError, ClientError
+from .file_writer import FileSpec, parse_llm_output
+from .sections import ask_after_context
+
+# Most files a manifest may list; later ones are dropped
+MAX_PLANNED_FILES = 20
+
+FILE_PLAN_PROMPT = """Before writing any code, list every file you will output for the request above. For each file, give its purpose and an interface summary: everything other files rely on, such as exported functions and classes with their signatures, element ids and class names, endpoints, data formats and file names it reads or writes. The files will be generated separately, each from this list alone, so the summaries must be specific enough for the files to work together.
+
+Reply with only the list, in exactly this format, and nothing else:
+
+FILE: <relative path>
+PURPOSE: <one line>
+INTERFACE: <summary, may continue on the following lines>
+"""
+
+FILE_PROMPT = """You are generating one file of the project listed in the file manifest below. The other files are being generated at the same time from the same manifest, so use exactly the names, signatures, ids, endpoints and formats it gives for them, and provide everything it lists for this file.
+
+Output only the file {path}, in a single fence labelled with its path.
+
+=== FILE MANIFEST ===
+{manifest}
+"""
+
+
+class PlannedFile(NamedTuple):
+    """A file listed in the manifest, before it is generated."""
+
+    path: str
+    purpose: str
+    interface: str
+
+
+def parse_file_plan(response: str) -> List[PlannedFile]:
+    """
+    Parse a file manifest reply.
+
+    Args:
+        response: Reply to FILE_PLAN_PROMPT
+
+    Returns:
+        List[PlannedFile]: Up to MAX_PLANNED_FILES files, each path once, in the order listed
+
+    Raises:
+        ClientError: If the reply lists no files
+    """
+    files: List[PlannedFile] = []
+    field = None
+    for line in response.splitlines():
+        label, _, value = line.partition(":")
+        label = label.strip().strip("*-# ").upper()
+        if label == "FILE" and value.strip():
+            path = posixpath.normpath(value.strip().strip("`*"))
+            if len(files) < MAX_PLANNED_FILES and path not in (planned.path for planned in files):
+                files.append(PlannedFile(path, "", ""))
+                field = None
+            else:
+                field = "skip"
+        elif files and field != "skip" and label in ("PURPOSE", "INTERFACE"):
+            field = label.lower()
+            files[-1] = files[-1]._replace(**{field: value.strip()})
+        elif files and field == "interface" and line.strip():
+            files[-1] = files[-1]._replace(interface=f"{files[-1].interface}\n{line.rstrip()}".strip())
+    if not files:
+        raise ClientError("The file manifest reply did not list any files")
+    return files
+
+
+def format_file_plan(files: List[PlannedFile]) -> str:
+    """Render a manifest as sent with each file request."""
+    return "\n\n".join(
+        f"FILE: {planned.path}\nPURPOSE: {planned.purpose}\nINTERFACE: {planned.interface}" for planned in files
+    )
+
+
+def request_file_plan(client: Client, model: str, context: str) -> List[PlannedFile]:
+    """
+    Ask for the manifest of files a request will produce.
+
+    The request also writes the shared context to the prompt cache, so the
+    file requests that follow read it from there.
+
+    Args:
+        client: Client used for the request
+        model: Model identifier
+        context: System prompt and input sources
+
+    Returns:
+        List[PlannedFile]: Files to generate
+
+    Raises:
+        APICallError: If the request fails
+        ClientError: If the reply is not a usable manifest
+    """
+    return parse_file_plan(ask_after_context(client, model, context, FILE_PLAN_PROMPT))
+
+
+def generate_files(
+    client: Client, model: str, context: str, files: List[PlannedFile], max_workers: int = 4
+) -> Tuple[List[FileSpec], List[str]]:
+    """
+    Generate every planned file in its own concurrent request.
+
+    Each response is parsed with parse_llm_output, and only the block for
+    the file it was asked for is kept, since every other file has a request
+    of its own. A file whose request fails, or whose response has no block
+    for it, is reported on stderr and left out.
+
+    Args:
+        client: Client used for every request
+        model: Model identifier
+        context: System prompt and input sources, as sent for the manifest
+        files: Files to generate
+        max_workers: Maximum number of concurrent requests
+
+    Returns:
+        Tuple[List[FileSpec], List[str]]: (generated files in manifest order, raw responses)
+
+    Raises:
+        APICallError: If every file request fails
+    """
+    manifest = format_file_plan(files)
+
+    def generate(planned: PlannedFile) -> Tuple[List[FileSpec], str]:
+        request = FILE_PROMPT.format(path=planned.path, manifest=manifest)
+        try:
+            response = ask_after_context(client, model, context, request)
+        except APICallError as e:
+            print(f"Error: Could not generate {planned.path}: {e}", file=sys.stderr)
+            return [], ""
+        file_specs, _ = parse_llm_output(response)
+        matching = [file_spec for file_spec in file_specs if posixpath.normpath(file_spec.filepath) == planned.path]
+        if not matching:
+            print(f"Warning: The response for {planned.path} had no block for it", file=sys.stderr)
+        elif len(file_specs) > len(matching):
+            print(f"Warning: Ignoring other files in the response for {planned.path}", file=sys.stderr)
+        else:
+            print(f"Generated {planned.path}", file=sys.stderr)
+        return matching, response
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        results = list(executor.map(generate, files))
+    if not any(response for _, response in results):
+        raise APICallError("Every file request failed")
+    file_specs = [file_spec for matching, _ in results for file_spec in matching]
+    return file_specs, [response for _, response in results]
@@ -1,10 +1,33 @@
 """File writer module for parsing LLM output and writing generated files."""
 
+import contextlib
+import difflib
+import hashlib
+import json
 import os
 import re
 import random
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Tuple, NamedTuple
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+from .exceptions import PatchError
+from .patcher import (
+    DIFF_LABELS,
+    FilePatch,
+    apply_hunks,
+    is_search_replace,
+    is_unified_diff,
+    parse_search_replace,
+    parse_unified_diff,
+)
 
 
 class FileSpec(NamedTuple):
@@ -12,6 +35,149 @@ class FileSpec(NamedTuple):
 
     filepath: str
     content: str
+    base: Optional[str] = None  # Disk content the file's edits were applied to, if it was patched
+
+
+# Opening or closing code fence: up to three spaces, then three or more ` or ~
+_FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})[ \t]*(.*?)\s*$")
+
+
+class FenceParser:
+    """
+    Single-pass parser for fenced file blocks in LLM output.
+
+    Text is fed incrementally, whole or in streamed chunks, and each file
+    block is returned as soon as its closing fence arrives. A fence whose
+    info string is a single token (```path/to/file.py) opens a file block;
+    fences of ``` or ~~~ of any length are recognised, and a block only
+    closes on a bare fence of the same character at least as long as the
+    opener. Fences with an info string inside a block open nested blocks,
+    so a markdown file may contain its own fenced examples. Everything
+    outside file blocks is collected as non-file text in the same pass.
+    """
+
+    def __init__(self):
+        self._partial: List[str] = []
+        self._text: List[str] = []
+        self._block: Optional[Tuple[str, int, str]] = None  # (fence char, length, filepath)
+        self._opener = ""
+        self._lines: List[str] = []
+        self._nested: List[int] = []
+        self.file_count = 0  # File blocks returned so far
+        self.root = Path.cwd().resolve()  # Directory every file block must stay within
+
+    def feed(self, chunk: str) -> List[FileSpec]:
+        """
+        Parse a chunk of output.
+
+        Args:
+            chunk: Next piece of the response
+
+        Returns:
+            List[FileSpec]: File blocks closed by this chunk
+        """
+        specs: List[FileSpec] = []
+        start = 0
+        while True:
+            end = chunk.find("\n", start)
+            if end < 0:
+                if start < len(chunk):
+                    self._partial.append(chunk[start:])
+                return specs
+            line = chunk[start:end + 1]
+            if self._partial:
+                self._partial.append(line)
+                line = "".join(self._partial)
+                self._partial = []
+            spec = self._line(line)
+            if spec is not None:
+                specs.append(spec)
+            start = end + 1
+
+    def close(self) -> List[FileSpec]:
+        """
+        Finish parsing; an unterminated file block is kept as non-file text.
+
+        Returns:
+            List[FileSpec]: File block closed by the final line, if any
+        """
+        specs = []
+        if self._partial:
+            spec = self._line("".join(self._partial))
+            self._partial = []
+            if spec is not None:
+                specs.append(spec)
+        if self._block is not None:
+            self._text.append(self._opener)
+            self._text.extend(self._lines)
+            self._block = None
+            self._lines = []
+        return specs
+
+    @property
+    def non_file_text(self) -> str:
+        """Text outside file blocks, with runs of blank lines collapsed."""
+        return re.sub(r"\n\s*\n\s*\n", "\n\n", "".join(self._text).strip())
+
+    def _line(self, line: str) -> Optional[FileSpec]:
+        """Process one line (with its newline, except possibly the last)."""
+        match = _FENCE.match(line) if line.lstrip(" ")[:1] in ("`", "~") else None
+
+        if self._block is None:
+            if match and match.group(2) and not any(c.isspace() for c in match.group(2)):
+                fence = match.group(1)
+                self._block = (fence[0], len(fence), match.group(2))
+                self._opener = line
+            else:
+                self._text.append(line)
+            return None
+
+        char, length, filepath = self._block
+        if match and match.group(1)[0] == char:
+            fence_length = len(match.group(1))
+            if match.group(2):
+                self._nested.append(fence_length)
+            elif self._nested and fence_length >= self._nested[-1]:
+                self._nested.pop()
+            elif not self._nested and fence_length >= length:
+                return self._close_block(filepath)
+        self._lines.append(line)
+        return None
+
+    def _close_block(self, filepath: str) -> Optional[FileSpec]:
+        content = "".join(self._lines)
+        if content.endswith("\n"):
+            content = content[:-1]
+        self._block = None
+        self._lines = []
+        self._nested = []
+
+        # Validate filepath format - basic security check
+        if not _is_safe_filepath(filepath, self.root):
+            print(
+                f"Warning: Skipping potentially unsafe filepath: {filepath}",
+                file=sys.stderr,
+            )
+            return None
+        self.file_count += 1
+        return FileSpec(filepath=filepath, content=content)
+
+
+def iter_file_specs(chunks: Iterable[str], parser: Optional[FenceParser] = None) -> Iterator[FileSpec]:
+    """
+    Yield file blocks from streamed output as each one closes.
+
+    Args:
+        chunks: Pieces of the response, e.g. from a streaming API
+        parser: Parser to use, so its non_file_text can be read afterwards
+
+    Yields:
+        FileSpec: Each complete file block, in order
+    """
+    parser = parser if parser is not None else FenceParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
 
 
 def parse_llm_output(response: str) -> Tuple[List[FileSpec], str]:
@@ -24,85 +190,650 @@ def parse_llm_output(response: str) -> Tuple[List[FileSpec], str]:
     Returns:
         Tuple[List[FileSpec], str]: (file_specs, non_file_text)
     """
-    file_specs = []
+    parser = FenceParser()
+    file_specs = list(iter_file_specs([response], parser))
+    return file_specs, parser.non_file_text
 
-    # Pattern to match triple backtick blocks with file annotations
-    # Captures: filepath on same line as opening ```, and file content
-    file_pattern = r"```(\S+)\n(.*?)\n```"
 
-    # Find all file blocks
-    matches = re.findall(file_pattern, response, re.MULTILINE | re.DOTALL)
+class ManifestEntry(NamedTuple):
+    """A file that would be written, as listed by a dry run."""
 
-    for filepath, content in matches:
-        # Validate filepath format - basic security check
-        if not _is_safe_filepath(filepath):
-            print(
-                f"Warning: Skipping potentially unsafe filepath: {filepath}",
-                file=sys.stderr,
-            )
-            continue
+    filepath: str
+    size: int
+    sha256: str
+
+
+# Record of what the writer last wrote, kept in the working directory
+MANIFEST_NAME = ".tech16-manifest.json"
+
+class WriteReport(NamedTuple):
+    """Outcome of writing generated files, by change status."""
+
+    created: List[str]
+    modified: List[str]
+    unchanged: List[str]
+    preserved: List[str]
+    conflicts: List[str]
+
+    @property
+    def written(self) -> List[str]:
+        """Files actually written: created, then modified."""
+        return self.created + self.modified
+
+    def summary(self) -> str:
+        """One-line count of files by status."""
+        text = (
+            f"{len(self.created)} created, {len(self.modified)} modified, "
+            f"{len(self.unchanged)} unchanged"
+        )
+        if self.preserved:
+            text += f", {len(self.preserved)} edited by hand and preserved"
+        if self.conflicts:
+            text += f", {len(self.conflicts)} with edits that did not apply"
+        return text
+
+
+def new_write_report() -> WriteReport:
+    """Return an empty report to collect write results in."""
+    return WriteReport([], [], [], [], [])
 
-        file_specs.append(FileSpec(filepath=filepath, content=content))
 
-    # Extract non-file text by removing all file blocks
-    non_file_text = re.sub(file_pattern, "", response, flags=re.MULTILINE | re.DOTALL)
+class _EditApplier:
+    """
+    Turns search/replace blocks and unified diffs into whole-file specs.
+
+    Edits are applied to the file's current content: the disk, or the
+    result of earlier blocks in the same response, so several blocks may
+    change one file. A file whose edits do not all apply is left as it is
+    and recorded as a conflict.
+    """
+
+    def __init__(self, root: Path, report: WriteReport):
+        self.root = root
+        self.report = report
+        self.contents: dict = {}  # destination -> (content after earlier blocks, disk content they started from)
+
+    def _current(self, destination: Path) -> Tuple[Optional[str], Optional[str]]:
+        if destination in self.contents:
+            return self.contents[destination]
+        try:
+            with open(destination, encoding="utf-8", newline="") as f:
+                content = f.read()
+        except FileNotFoundError:
+            return None, None
+        except (OSError, UnicodeDecodeError) as e:
+            raise PatchError(f"cannot read the file: {e}")
+        return content, content
+
+    def _conflict(self, filepath: str, error: PatchError) -> None:
+        print(f"Error: Could not apply edits to {filepath}: {error}", file=sys.stderr)
+        self.report.conflicts.append(filepath)
+
+    def apply(self, file_spec: FileSpec) -> List[FileSpec]:
+        """
+        Resolve a file block into the whole files it produces.
+
+        Args:
+            file_spec: Parsed block: a whole file, search/replace blocks or a diff
+
+        Returns:
+            List[FileSpec]: Files to write; whole files pass through unchanged
+        """
+        try:
+            if is_unified_diff(file_spec.filepath, file_spec.content):
+                default = None if file_spec.filepath.lower() in DIFF_LABELS else file_spec.filepath
+                patches = parse_unified_diff(file_spec.content, default)
+            elif is_search_replace(file_spec.content):
+                patches = [FilePatch(file_spec.filepath, parse_search_replace(file_spec.content))]
+            else:
+                destination = _resolve_within(file_spec.filepath, self.root)
+                if destination is not None:
+                    self.contents[destination] = (file_spec.content, None)
+                return [file_spec]
+        except PatchError as e:
+            self._conflict(file_spec.filepath, e)
+            return []
+
+        specs = []
+        for patch in patches:
+            destination = _resolve_within(patch.filepath, self.root)
+            if not _is_safe_filepath(patch.filepath, self.root) or destination is None:
+                print(f"Warning: Skipping potentially unsafe filepath: {patch.filepath}", file=sys.stderr)
+                continue
+            try:
+                current, base = self._current(destination)
+                content = apply_hunks(current, patch.hunks)
+            except PatchError as e:
+                self._conflict(patch.filepath, e)
+                continue
+            self.contents[destination] = (content, base)
+            specs.append(FileSpec(patch.filepath, content, base))
+        return specs
+
 
-    # Clean up extra whitespace while preserving intentional formatting
-    non_file_text = re.sub(r"\n\s*\n\s*\n", "\n\n", non_file_text.strip())
+class _ChangeSet:
+    """Compares generated files with the disk and the manifest of the last write."""
 
-    return file_specs, non_file_text
+    CREATED, MODIFIED, UNCHANGED, EDITED = "created", "modified", "unchanged", "edited"
 
+    def __init__(self, root: Path, report: WriteReport, show_diff: bool, overwrite_edited: bool):
+        self.root = root
+        self.report = report
+        self.show_diff = show_diff
+        self.overwrite_edited = overwrite_edited
+        self.path = root / MANIFEST_NAME
+        self.hashes = self._read()
+        self.updates: dict = {}
 
-def write_generated_files(file_specs: List[FileSpec]) -> List[str]:
+    def _read(self) -> dict:
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8")).get("files", {})
+        except (OSError, ValueError, AttributeError):
+            return {}
+
+    def _key(self, destination: Path) -> str:
+        return destination.relative_to(self.root).as_posix()
+
+    def classify(self, filepath: str, destination: Path, content: str, base: Optional[str] = None) -> bool:
+        """
+        Decide whether a file needs writing, recording skipped files in the report.
+
+        Args:
+            filepath: Filepath as reported to the user
+            destination: Resolved destination path
+            content: Generated content
+            base: Disk content that edits were applied to; hand edits in it are kept, not at risk
+
+        Returns:
+            bool: True if the file should be written
+        """
+        key = self._key(destination)
+        try:
+            existing = destination.read_bytes()
+        except FileNotFoundError:
+            return True
+        except OSError:
+            return True
+
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        existing_digest = hashlib.sha256(existing).hexdigest()
+        if existing_digest == digest:
+            self.report.unchanged.append(filepath)
+            self._record(key, digest)
+            return False
+
+        last_written = self.hashes.get(key)
+        patched = base is not None and hashlib.sha256(base.encode("utf-8")).hexdigest() == existing_digest
+        if last_written is not None and last_written != existing_digest and not patched:
+            if not self.overwrite_edited:
+                print(
+                    f"Warning: Preserving {filepath}: edited since it was last generated "
+                    f"(use --overwrite-edited to replace it)",
+                    file=sys.stderr,
+                )
+                self.report.preserved.append(filepath)
+                return False
+            print(f"Warning: Overwriting hand edits in {filepath}", file=sys.stderr)
+
+        if self.show_diff:
+            _print_diff(filepath, existing.decode("utf-8", errors="replace"), content)
+        return True
+
+    def written(self, filepath: str, destination: Path, content: str, existed: bool) -> None:
+        """Record a file that was written."""
+        (self.report.modified if existed else self.report.created).append(filepath)
+        self._record(self._key(destination), hashlib.sha256(content.encode("utf-8")).hexdigest())
+
+    def _record(self, key: str, digest: str) -> None:
+        if self.hashes.get(key) != digest:
+            self.hashes[key] = digest
+            self.updates[key] = digest
+
+    def save(self) -> None:
+        """
+        Persist the manifest if anything changed; failures are reported, not raised.
+
+        Only this write's entries are merged into the manifest as it is now,
+        under an exclusive lock, so tools writing other files in the same
+        tree at the same time (e.g. concurrent tech16-run steps) keep theirs.
+        """
+        if not self.updates:
+            return
+        try:
+            with self._locked():
+                hashes = self._read()
+                hashes.update(self.updates)
+                write_file_atomic(str(self.path), json.dumps({"files": hashes}, indent=1, sort_keys=True))
+            self.updates = {}
+        except OSError as e:
+            print(f"Warning: Could not update {MANIFEST_NAME}: {e}", file=sys.stderr)
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        """
+        Hold an exclusive lock across a manifest read and write.
+
+        The lock is taken on the manifest's directory: the manifest file is
+        replaced on every save, so processes locking it could each hold a
+        lock on a different file. Where fcntl is missing, no lock is taken.
+        """
+        if fcntl is None:
+            yield
+            return
+        fd = os.open(self.root, os.O_RDONLY)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+
+def _print_diff(filepath: str, old: str, new: str) -> None:
+    """Print a unified diff of a file's change to stderr."""
+    diff = difflib.unified_diff(
+        old.splitlines(keepends=True), new.splitlines(keepends=True),
+        fromfile=f"a/{filepath}", tofile=f"b/{filepath}",
+    )
+    for line in diff:
+        sys.stderr.write(line if line.endswith("\n") else line + "\n")
+
+
+def write_generated_files(
+    file_specs: List[FileSpec],
+    dry_run: bool = False,
+    fsync: bool = False,
+    max_workers: Optional[int] = None,
+) -> List[str]:
     """
-    Write generated files to filesystem with collision avoidance.
+    Write generated files to filesystem as one all-or-nothing transaction.
     Only writes files within the current working directory for security.
 
+    Files whose content is already on disk are skipped, and files edited by
+    hand since the last write are preserved (see write_changed_files).
+
     Args:
         file_specs: List of file specifications to write
+        dry_run: Print a manifest of paths, sizes and hashes instead of writing
+        fsync: Flush the temporary files to disk before renaming them, and
+            the affected directories after, so the tree survives a crash
+        max_workers: Threads writing temporary files (default: up to 8)
 
     Returns:
         List[str]: List of actual filepaths written (may differ from requested due to collisions)
     """
-    written_files = []
-    cwd = Path.cwd()
+    written = set(write_changed_files(file_specs, dry_run, fsync, max_workers).written)
+    ordered = dict.fromkeys(generate_safe_filename(file_spec.filepath) for file_spec in file_specs)
+    return [filepath for filepath in ordered if filepath in written]
+
+
+def write_changed_files(
+    file_specs: List[FileSpec],
+    dry_run: bool = False,
+    fsync: bool = False,
+    max_workers: Optional[int] = None,
+    show_diff: bool = False,
+    overwrite_edited: bool = False,
+    apply_edits: bool = False,
+) -> WriteReport:
+    """
+    Write the generated files that differ from disk as one all-or-nothing transaction.
+
+    All paths are checked up front against the resolved working directory.
+    Each file is compared by SHA-256 with the file on disk, and files that
+    are identical are not touched, so their mtimes do not change. A file
+    whose disk content differs from what MANIFEST_NAME says was last written
+    has been edited by hand and is preserved unless overwrite_edited is set.
+
+    The remaining contents are written to temporary files next to their
+    destinations in parallel and renamed into place with os.replace. If any
+    write or rename fails, files already replaced are restored, new files
+    and directories are removed, and nothing is reported as written.
+
+    With apply_edits, blocks holding search/replace edits or unified diffs
+    are applied to the current files first (see patcher.apply_hunks).
+
+    Args:
+        file_specs: List of file specifications to write
+        dry_run: Print a manifest of the files that would be written instead of writing
+        fsync: Flush the temporary files to disk before renaming them, and
+            the affected directories after, so the tree survives a crash
+        max_workers: Threads writing temporary files (default: up to 8)
+        show_diff: Print a unified diff of each modified file to stderr
+        overwrite_edited: Replace files edited by hand since the last write
+        apply_edits: Apply edit blocks and diffs to existing files
+
+    Returns:
+        WriteReport: Files created, modified, unchanged and preserved, and edit conflicts
+    """
+    root = Path.cwd().resolve()
+    planned: dict = {}
+    report = new_write_report()
+    if apply_edits:
+        applier = _EditApplier(root, report)
+        file_specs = [resolved for file_spec in file_specs for resolved in applier.apply(file_spec)]
 
     for file_spec in file_specs:
+        # Generate safe filename to avoid collisions
+        safe_filepath = generate_safe_filename(file_spec.filepath)
+
+        destination = _resolve_within(safe_filepath, root)
+        if destination is None:
+            print(
+                f"Warning: Skipping file outside current working directory: {file_spec.filepath}",
+                file=sys.stderr,
+            )
+            continue
+        if destination in planned:
+            print(f"Warning: {safe_filepath} generated more than once; keeping the last version", file=sys.stderr)
+        planned[destination] = (safe_filepath, file_spec.content, file_spec.base)
+
+    changes = _ChangeSet(root, report, show_diff, overwrite_edited)
+    to_write = {
+        destination: (path, content)
+        for destination, (path, content, base) in planned.items()
+        if changes.classify(path, destination, content, base)
+    }
+
+    if dry_run:
+        print_manifest(build_manifest([FileSpec(path, content) for path, content in to_write.values()]))
+        return report
+
+    existed = {destination: destination.exists() for destination in to_write}
+    if to_write:
+        transaction = _WriteTransaction(root, fsync)
         try:
-            # Validate that the file path is within current working directory
-            if not _is_within_cwd(file_spec.filepath, cwd):
-                print(
-                    f"Warning: Skipping file outside current working directory: {file_spec.filepath}",
-                    file=sys.stderr,
-                )
-                continue
+            transaction.stage(
+                [(destination, content) for destination, (_, content) in to_write.items()],
+                max_workers,
+            )
+            transaction.commit()
+        except OSError as e:
+            transaction.rollback()
+            print(f"Error writing generated files, no files were changed: {e}", file=sys.stderr)
+            return report
+
+    for destination, (path, content) in to_write.items():
+        changes.written(path, destination, content, existed[destination])
+    changes.save()
+    return report
+
+
+class _WriteTransaction:
+    """Temporary files renamed into place together, with rollback."""
+
+    def __init__(self, root: Path, fsync: bool):
+        self.root = root
+        self.fsync = fsync
+        self.created_dirs: List[Path] = []
+        self.staged: List[Tuple[Path, Path]] = []  # (temporary file, destination)
+        self.backups: List[Tuple[Path, Optional[Path]]] = []  # (destination, backup of the old file)
+
+    def _make_parents(self, destination: Path) -> None:
+        missing = []
+        parent = destination.parent
+        while parent != self.root and not parent.exists():
+            missing.append(parent)
+            parent = parent.parent
+        for directory in reversed(missing):
+            directory.mkdir(exist_ok=True)
+            self.created_dirs.append(directory)
+
+    def _write_temp(self, destination: Path, content: str) -> Path:
+        fd, tmp_path = tempfile.mkstemp(dir=destination.parent, prefix=".tmp-", suffix=destination.name)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            _copy_destination_mode(tmp_path, str(destination))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return Path(tmp_path)
+
+    def stage(self, files: List[Tuple[Path, str]], max_workers: Optional[int]) -> None:
+        """Write every file's content to a temporary file beside its destination."""
+        for destination, _ in files:
+            self._make_parents(destination)
+
+        workers = max(1, min(max_workers or 8, len(files)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self._write_temp, destination, content) for destination, content in files]
+            errors = []
+            for (destination, _), future in zip(files, futures):
+                try:
+                    self.staged.append((future.result(), destination))
+                except OSError as e:
+                    errors.append(e)
+        if errors:
+            raise errors[0]
+
+    def commit(self) -> None:
+        """Rename the temporary files into place, keeping the old files until all succeed."""
+        for tmp_path, destination in self.staged:
+            backup = None
+            if destination.exists():
+                backup = destination.with_name(f".bak-{tmp_path.name}")
+                os.replace(destination, backup)
+            self.backups.append((destination, backup))
+            os.replace(tmp_path, destination)
+
+        if self.fsync:
+            for directory in {destination.parent for _, destination in self.staged}:
+                _fsync_directory(directory)
+
+        for _, backup in self.backups:
+            if backup is not None:
+                backup.unlink()
+
+    def rollback(self) -> None:
+        """Undo a partial commit and remove every temporary file and new directory."""
+        for destination, backup in reversed(self.backups):
+            try:
+                if backup is not None:
+                    os.replace(backup, destination)
+                elif destination.exists():
+                    destination.unlink()
+            except OSError as e:
+                print(f"Error restoring {destination}: {e}", file=sys.stderr)
+        for tmp_path, _ in self.staged:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        for directory in reversed(self.created_dirs):
+            try:
+                directory.rmdir()
+            except OSError:
+                pass
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Flush a directory entry so renames in it are durable (no-op where unsupported)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
 
-            # Generate safe filename to avoid collisions
-            safe_filepath = generate_safe_filename(file_spec.filepath)
 
-            # Double-check that the safe filepath is still within CWD
-            if not _is_within_cwd(safe_filepath, cwd):
-                print(
-                    f"Warning: Skipping file outside current working directory after collision avoidance: {safe_filepath}",
-                    file=sys.stderr,
-                )
-                continue
+def build_manifest(file_specs: List[FileSpec]) -> List[ManifestEntry]:
+    """
+    Describe files by path, UTF-8 size and SHA-256 of their content.
 
-            # Create parent directories if they don't exist
-            parent_dir = Path(safe_filepath).parent
-            parent_dir.mkdir(parents=True, exist_ok=True)
+    Args:
+        file_specs: Files to describe
 
-            # Write the file
-            with open(safe_filepath, "w", encoding="utf-8") as f:
-                f.write(file_spec.content)
+    Returns:
+        List[ManifestEntry]: One entry per file, in order
+    """
+    entries = []
+    for file_spec in file_specs:
+        data = file_spec.content.encode("utf-8")
+        entries.append(ManifestEntry(file_spec.filepath, len(data), hashlib.sha256(data).hexdigest()))
+    return entries
 
-            written_files.append(safe_filepath)
 
-        except (OSError, IOError) as e:
-            print(f"Error writing file {file_spec.filepath}: {e}", file=sys.stderr)
-            continue
+def print_manifest(entries: List[ManifestEntry]) -> None:
+    """
+    Print a dry-run manifest to stdout.
+
+    Args:
+        entries: Manifest entries to list
+    """
+    total = sum(entry.size for entry in entries)
+    print(f"Dry run: {len(entries)} file(s), {total:,} bytes would be written")
+    for entry in entries:
+        print(f"  {entry.size:>10,}  {entry.sha256[:16]}  {entry.filepath}")
+
+
+def write_streamed_files(
+    chunks: Iterable[str],
+    parser: Optional[FenceParser] = None,
+    fsync: bool = False,
+    report: Optional[WriteReport] = None,
+    show_diff: bool = False,
+    overwrite_edited: bool = False,
+    apply_edits: bool = False,
+) -> Iterator[str]:
+    """
+    Write each file block to disk as soon as its closing fence arrives.
+
+    Files are written atomically, so if the stream fails partway the files
+    already completed stay on disk and the unfinished one never appears.
+    Unchanged and hand-edited files are skipped, and edit blocks applied
+    when apply_edits is set, as in write_changed_files. Errors from the
+    stream propagate to the caller.
+
+    Args:
+        chunks: Pieces of the response, e.g. from Client.stream
+        parser: Parser to use, so its non_file_text can be read afterwards
+        fsync: Flush each file to disk before renaming it into place
+        report: Report to collect created, modified, unchanged and preserved files in
+        show_diff: Print a unified diff of each modified file to stderr
+        overwrite_edited: Replace files edited by hand since the last write
+        apply_edits: Apply edit blocks and diffs to existing files
+
+    Yields:
+        str: Each filepath written, in order
+    """
+    root = Path.cwd().resolve()
+    report = report if report is not None else new_write_report()
+    changes = _ChangeSet(root, report, show_diff, overwrite_edited)
+    applier = _EditApplier(root, report) if apply_edits else None
+    try:
+        for block in iter_file_specs(chunks, parser):
+            for file_spec in applier.apply(block) if applier is not None else [block]:
+                written = _write_file_spec(file_spec, root, fsync, changes)
+                if written is not None:
+                    print(f"Wrote {written}", file=sys.stderr)
+                    yield written
+    finally:
+        changes.save()
+
+
+def _read_umask() -> int:
+    """Return the process umask (os.umask can only be read by setting it)."""
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+# Read once at import, before any threads write files, since reading it briefly changes it
+_UMASK = _read_umask()
 
-    return written_files
+
+def _copy_destination_mode(tmp_path: str, destination: str) -> None:
+    """
+    Give a temporary file the mode its destination has, or a new file's default mode.
+
+    mkstemp creates files readable by the owner only, and os.replace would
+    carry that mode onto the destination; an existing file keeps its own
+    mode (e.g. an executable script stays executable).
+    """
+    try:
+        shutil.copymode(destination, tmp_path)
+    except FileNotFoundError:
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+
+
+def write_file_atomic(filepath: str, content: str, fsync: bool = False) -> None:
+    """
+    Write a file through a temporary file and rename, so readers never see a partial file.
+
+    Args:
+        filepath: Destination path
+        content: Text to write
+        fsync: Flush the file to disk before renaming it into place
+
+    Raises:
+        OSError: If the file cannot be written
+    """
+    directory = os.path.dirname(filepath) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(filepath))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        _copy_destination_mode(tmp_path, filepath)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _write_file_spec(file_spec: FileSpec, root: Path, fsync: bool, changes: _ChangeSet) -> Optional[str]:
+    """
+    Write one file within the working directory if it changed.
+
+    Args:
+        file_spec: File to write
+        root: Resolved current working directory
+        fsync: Flush the file to disk before renaming it into place
+        changes: Change tracking against the disk and the manifest
+
+    Returns:
+        Optional[str]: Filepath written, or None if skipped, unchanged or failed
+    """
+    # Generate safe filename to avoid collisions
+    safe_filepath = generate_safe_filename(file_spec.filepath)
+
+    # Validate that the file path is within current working directory
+    destination = _resolve_within(safe_filepath, root)
+    if destination is None:
+        print(
+            f"Warning: Skipping file outside current working directory: {file_spec.filepath}",
+            file=sys.stderr,
+        )
+        return None
+
+    if not changes.classify(safe_filepath, destination, file_spec.content, file_spec.base):
+        return None
+
+    try:
+        existed = destination.exists()
+
+        # Create parent directories if they don't exist
+        destination.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write the file
+        write_file_atomic(str(destination), file_spec.content, fsync)
+
+        changes.written(safe_filepath, destination, file_spec.content, existed)
+        return safe_filepath
+
+    except (OSError, IOError) as e:
+        print(f"Error writing file {file_spec.filepath}: {e}", file=sys.stderr)
+        return None
 
 
 def generate_safe_filename(filepath: str) -> str:
@@ -155,12 +886,13 @@ def print_non_file_text(non_file_text: str) -> None:
         print(non_file_text)
 
 
-def _is_safe_filepath(filepath: str) -> bool:
+def _is_safe_filepath(filepath: str, root: Optional[Path] = None) -> bool:
     """
     Check if a filepath is safe to write to (basic path traversal protection).
 
     Args:
         filepath: Filepath to validate
+        root: Resolved directory the file must stay within (default: the current working directory)
 
     Returns:
         bool: True if filepath is considered safe
@@ -189,7 +921,7 @@ def _is_safe_filepath(filepath: str) -> bool:
             return False
 
         # Check if path is within current working directory
-        if not _is_within_cwd(filepath, Path.cwd()):
+        if not _is_within_cwd(filepath, root if root is not None else Path.cwd()):
             return False
 
         return True
@@ -198,6 +930,24 @@ def _is_safe_filepath(filepath: str) -> bool:
         return False
 
 
+def _resolve_within(filepath: str, root: Path) -> Optional[Path]:
+    """
+    Resolve a filepath against an already resolved root directory.
+
+    Args:
+        filepath: Relative filepath to resolve
+        root: Resolved directory the file must stay within
+
+    Returns:
+        Optional[Path]: Resolved path, or None if it escapes root or is root itself
+    """
+    try:
+        resolved_path = (root / filepath).resolve()
+    except (ValueError, OSError):
+        return None
+    return resolved_path if root in resolved_path.parents else None
+
+
 def _is_within_cwd(filepath: str, cwd: Path) -> bool:
     """
     Check if a filepath resolves to a location within the current working directory.
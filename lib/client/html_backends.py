@@ -0,0 +1,173 @@
+"""Pluggable HTML-to-text parser backends with automatic selection."""
+
+import os
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from .exceptions import ClientError
+from .html_stream import (
+    HTMLTextParser,
+    PhraseBuffer,
+    SKIPPED_TAGS,
+    StreamingTextExtractor,
+    TextParser,
+)
+
+# Environment variable that forces a backend by name
+BACKEND_ENV_VAR = "TECH16_HTML_BACKEND"
+
+# Backends in order of preference, fastest first (see scripts/bench_html_backends.py)
+PREFERRED_BACKENDS = ("lxml", "stdlib", "bs4")
+
+
+class HTMLBackend(NamedTuple):
+    """An HTML parser that writes visible text to a phrase buffer."""
+
+    name: str
+    parser_factory: Callable[[PhraseBuffer], TextParser]
+    streaming: bool
+    description: str
+
+
+class _BeautifulSoupParser:
+    """Buffers the document and extracts it with clean_html_content when closed."""
+
+    def __init__(self, sink: PhraseBuffer):
+        self.sink = sink
+        self.parts: List[str] = []
+
+    def feed(self, data: str) -> None:
+        self.parts.append(data)
+
+    def close(self) -> None:
+        # Imported here to avoid a circular import with url_handler
+        from .url_handler import clean_html_content
+
+        # The cleaned text is already normalized, so the buffer only applies the budget
+        self.sink.write(clean_html_content("".join(self.parts)))
+
+
+class _LxmlTarget:
+    """lxml parser target forwarding visible text; libxml2 reports implied end tags."""
+
+    def __init__(self, sink: PhraseBuffer):
+        self.sink = sink
+        self.skipping = 0
+
+    def start(self, tag, attrib):
+        if tag in SKIPPED_TAGS:
+            self.skipping += 1
+
+    def end(self, tag):
+        if tag in SKIPPED_TAGS and self.skipping:
+            self.skipping -= 1
+
+    def data(self, data):
+        if not self.skipping:
+            self.sink.write(data)
+
+    def close(self):
+        return None
+
+
+class _LxmlParser:
+    """Incremental libxml2 HTML parser."""
+
+    def __init__(self, sink: PhraseBuffer):
+        from lxml import etree
+
+        self.parser = etree.HTMLParser(target=_LxmlTarget(sink))
+
+    def feed(self, data: str) -> None:
+        self.parser.feed(data)
+
+    def close(self) -> None:
+        self.parser.close()
+
+
+def _lxml_available() -> bool:
+    try:
+        import lxml.etree  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def available_backends() -> Dict[str, HTMLBackend]:
+    """
+    Return the backends whose dependencies are installed.
+
+    Returns:
+        Dict[str, HTMLBackend]: Backends by name, in order of preference
+    """
+    backends = {}
+    for name in PREFERRED_BACKENDS:
+        if name == "lxml" and _lxml_available():
+            backends[name] = HTMLBackend(name, _LxmlParser, True, "libxml2 (C) incremental parser")
+        elif name == "stdlib":
+            backends[name] = HTMLBackend(name, HTMLTextParser, True, "html.parser streaming parser")
+        elif name == "bs4":
+            backends[name] = HTMLBackend(name, _BeautifulSoupParser, False, "BeautifulSoup with html.parser")
+    return backends
+
+
+def get_backend(name: Optional[str] = None) -> HTMLBackend:
+    """
+    Select an HTML backend.
+
+    Args:
+        name: Backend name; defaults to $TECH16_HTML_BACKEND, then the fastest available
+
+    Returns:
+        HTMLBackend: Selected backend
+
+    Raises:
+        ClientError: If the named backend is unknown or not installed
+    """
+    backends = available_backends()
+    name = name or os.getenv(BACKEND_ENV_VAR)
+    if not name:
+        return next(iter(backends.values()))
+    if name not in backends:
+        raise ClientError(
+            f"HTML backend '{name}' is not available (available: {', '.join(backends)})"
+        )
+    return backends[name]
+
+
+def create_extractor(
+    encoding: str,
+    is_html: bool = True,
+    max_chars: Optional[int] = None,
+    backend: Optional[str] = None,
+) -> StreamingTextExtractor:
+    """
+    Create a streaming text extractor using the selected backend.
+
+    Args:
+        encoding: Character encoding of the byte stream
+        is_html: Parse the stream as HTML; otherwise keep the decoded text as-is
+        max_chars: Maximum characters of text to keep, or None for no limit
+        backend: Backend name, or None for automatic selection
+
+    Returns:
+        StreamingTextExtractor: Extractor to feed response chunks to
+    """
+    return StreamingTextExtractor(encoding, is_html, max_chars, get_backend(backend).parser_factory)
+
+
+def html_to_text(html: str, backend: Optional[str] = None) -> str:
+    """
+    Extract the visible text of a complete HTML document.
+
+    Args:
+        html: HTML source
+        backend: Backend name, or None for automatic selection
+
+    Returns:
+        str: Cleaned text
+    """
+    sink = PhraseBuffer(None)
+    parser = get_backend(backend).parser_factory(sink)
+    parser.feed(html)
+    parser.close()
+    return sink.close()[0]
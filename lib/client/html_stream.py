@@ -0,0 +1,254 @@
+"""Streaming HTML-to-text extraction that stops once a text budget is reached."""
+
+import codecs
+import re
+import urllib.parse
+from html.parser import HTMLParser
+from typing import Callable, List, Optional, Protocol, Tuple
+
+# Elements whose whole subtree is dropped from the extracted text
+SKIPPED_TAGS = frozenset({"script", "style", "nav", "header", "footer", "aside"})
+
+# Elements that never have an end tag, so are not pushed on the tag stack
+VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "param", "source", "track", "wbr",
+})
+
+# Phrase delimiters of the legacy whitespace cleanup: line breaks (as in
+# str.splitlines) and double spaces
+_DELIMITER = re.compile(r"  |\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
+
+class PhraseBuffer:
+    """Collects text into stripped phrases joined by single spaces, up to a budget."""
+
+    def __init__(self, max_chars: Optional[int]):
+        self.max_chars = max_chars
+        self.phrases: List[str] = []
+        self.length = 0
+        self.pending = ""
+        self.full = False
+
+    def _emit(self, phrase: str) -> None:
+        phrase = phrase.strip()
+        if not phrase or self.full:
+            return
+        self.length += len(phrase) + (1 if self.phrases else 0)
+        self.phrases.append(phrase)
+        # One character past the budget is enough to know the text was cut
+        if self.max_chars is not None and self.length > self.max_chars:
+            self.full = True
+
+    def write(self, text: str) -> None:
+        """Add text; complete phrases are emitted, the last partial one is held back."""
+        if self.full:
+            return
+        parts = _DELIMITER.split(self.pending + text)
+        self.pending = parts.pop()
+        for part in parts:
+            self._emit(part)
+        # A long unbroken phrase already past the budget can be cut here
+        if self.max_chars is not None and self.length + len(self.pending) > self.max_chars + 1:
+            if self.length + 1 + len(self.pending.strip()) > self.max_chars:
+                self._emit(self.pending)
+                self.pending = ""
+
+    def close(self) -> Tuple[str, bool]:
+        """Flush held-back text and return (text, truncated)."""
+        self._emit(self.pending)
+        self.pending = ""
+        text = " ".join(self.phrases)
+        if self.max_chars is not None and len(text) > self.max_chars:
+            return text[:self.max_chars], True
+        return text, False
+
+
+class TextParser(Protocol):
+    """Incremental parser interface used by StreamingTextExtractor."""
+
+    def feed(self, data: str) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class HTMLTextParser(HTMLParser):
+    """HTMLParser that forwards visible text to a phrase buffer."""
+
+    def __init__(self, sink: PhraseBuffer):
+        super().__init__(convert_charrefs=True)
+        self.sink = sink
+        self.stack: List[str] = []
+        self.skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            return
+        self.stack.append(tag)
+        if tag in SKIPPED_TAGS:
+            self.skipping += 1
+
+    def handle_startendtag(self, tag, attrs):
+        # Self-closing tags have no content
+        pass
+
+    def handle_endtag(self, tag):
+        # Close everything up to the matching start tag; stray end tags are ignored
+        if tag not in self.stack:
+            return
+        while self.stack:
+            closed = self.stack.pop()
+            if closed in SKIPPED_TAGS:
+                self.skipping -= 1
+            if closed == tag:
+                break
+
+    def handle_data(self, data):
+        if not self.skipping:
+            self.sink.write(data)
+
+
+class StreamingTextExtractor:
+    """
+    Incremental extractor fed with raw response chunks.
+
+    HTML is parsed as it arrives and only visible text is kept, with the
+    same whitespace cleanup as clean_html_content. Memory is bounded by the
+    text budget rather than by the page size.
+    """
+
+    def __init__(
+        self,
+        encoding: str,
+        is_html: bool = True,
+        max_chars: Optional[int] = None,
+        parser_factory: Optional[Callable[[PhraseBuffer], TextParser]] = None,
+    ):
+        """
+        Initialize the extractor.
+
+        Args:
+            encoding: Character encoding of the byte stream
+            is_html: Parse the stream as HTML; otherwise keep the decoded text as-is
+            max_chars: Maximum characters of text to keep, or None for no limit
+            parser_factory: Builds the incremental parser that writes visible text
+                to the phrase buffer (default: the stdlib html.parser one)
+        """
+        self.decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self.is_html = is_html
+        self.max_chars = max_chars
+        self.sink = PhraseBuffer(max_chars)
+        factory = parser_factory or HTMLTextParser
+        self.parser = factory(self.sink) if is_html else None
+        self.parts: List[str] = []
+        self.length = 0
+
+    @property
+    def done(self) -> bool:
+        """True once the text budget is reached and further input would be discarded."""
+        if self.is_html:
+            return self.sink.full
+        return self.max_chars is not None and self.length > self.max_chars
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        Feed a chunk of the response body.
+
+        Args:
+            chunk: Raw bytes
+
+        Returns:
+            bool: True if the text budget is reached and the download can stop
+        """
+        if self.done:
+            return True
+        text = self.decoder.decode(chunk)
+        if self.is_html:
+            self.parser.feed(text)
+        else:
+            self.parts.append(text)
+            self.length += len(text)
+        return self.done
+
+    def close(self) -> Tuple[str, bool]:
+        """
+        Finish extraction.
+
+        Returns:
+            Tuple[str, bool]: (text, truncated)
+        """
+        tail = self.decoder.decode(b"", final=True)
+        if not self.is_html:
+            text = "".join(self.parts) + tail
+            if self.max_chars is not None and len(text) > self.max_chars:
+                return text[:self.max_chars], True
+            return text, False
+
+        if not self.done:
+            self.parser.feed(tail)
+            self.parser.close()
+        return self.sink.close()
+
+
+def extract_text(data: bytes, encoding: str = "utf-8", max_chars: Optional[int] = None) -> str:
+    """
+    Extract visible text from a complete HTML document.
+
+    Args:
+        data: Raw HTML bytes
+        encoding: Character encoding of data
+        max_chars: Maximum characters of text to keep, or None for no limit
+
+    Returns:
+        str: Cleaned text
+    """
+    extractor = StreamingTextExtractor(encoding, max_chars=max_chars)
+    extractor.feed(data)
+    return extractor.close()[0]
+
+
+class LinkCollector(HTMLParser):
+    """Incrementally collects absolute http(s) link targets from an HTML byte stream."""
+
+    def __init__(self, base_url: str, encoding: str):
+        """
+        Initialize the collector.
+
+        Args:
+            base_url: URL of the page, used to resolve relative links
+            encoding: Character encoding of the byte stream
+        """
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self.links: List[str] = []
+        self._seen = set()
+        self._base_set = False
+
+    def feed_bytes(self, chunk: bytes) -> None:
+        """Feed a chunk of the response body."""
+        self.feed(self.decoder.decode(chunk))
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in ("a", "base"):
+            return
+        href = dict(attrs).get("href")
+        if not href:
+            return
+        if tag == "base":
+            # Only the first <base> applies
+            if not self._base_set:
+                self.base_url = urllib.parse.urljoin(self.base_url, href.strip())
+                self._base_set = True
+            return
+        link = urllib.parse.urldefrag(urllib.parse.urljoin(self.base_url, href.strip()))[0]
+        if link.startswith(("http://", "https://")) and link not in self._seen:
+            self._seen.add(link)
+            self.links.append(link)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+    def close(self) -> None:
+        self.feed(self.decoder.decode(b"", final=True))
+        super().close()
@@ -0,0 +1,235 @@
+"""On-disk HTTP cache for scraped pages with conditional revalidation."""
+
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+from .cache import DiskCache, content_hash
+
+# Default size limit for cached bodies and metadata together (200MB)
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+class CacheEntry(NamedTuple):
+    """Metadata and extracted text of a cached page."""
+
+    url: str
+    content_type: str
+    encoding: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+    max_age: Optional[int]
+    no_cache: bool
+    text: str
+    truncated: bool
+    max_chars: Optional[int]
+    complete: bool
+    extract: str = "full"
+    links: Optional[List[str]] = None
+
+
+def parse_cache_control(header: Optional[str]) -> Dict[str, Optional[str]]:
+    """
+    Parse a Cache-Control header into lowercase directives.
+
+    Args:
+        header: Header value, e.g. "public, max-age=300"
+
+    Returns:
+        Dict[str, Optional[str]]: Directive names mapped to their values (None if valueless)
+    """
+    directives: Dict[str, Optional[str]] = {}
+    for part in (header or "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') if value else None
+    return directives
+
+
+def is_storable(headers: Mapping[str, str]) -> bool:
+    """Check whether a response may be stored."""
+    directives = parse_cache_control(headers.get("cache-control"))
+    return "no-store" not in directives and "private" not in directives
+
+
+class HTTPCache:
+    """Cache of page bodies, validators and extracted text, keyed by URL."""
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl: Optional[float] = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            directory: Cache directory (default: the "http" cache namespace)
+            max_bytes: Size limit; least recently used entries are evicted beyond it
+            ttl: Seconds a stored page is used without revalidation, overriding
+                the server's Cache-Control; None to follow the server
+        """
+        self.disk = DiskCache("http", directory)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+    @staticmethod
+    def _meta_key(url: str) -> str:
+        return content_hash("meta", url)
+
+    @staticmethod
+    def _body_key(url: str) -> str:
+        return content_hash("body", url)
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        """Return the cached entry for a URL, or None."""
+        raw = self.disk.get(self._meta_key(url))
+        if raw is None:
+            return None
+        try:
+            entry = CacheEntry(**json.loads(raw))
+        except (ValueError, TypeError):
+            return None
+        self.disk.touch(self._meta_key(url))
+        self.disk.touch(self._body_key(url))
+        return entry
+
+    def is_fresh(self, entry: CacheEntry, now: Optional[float] = None) -> bool:
+        """Check whether an entry can be used without asking the server."""
+        if self.ttl is not None:
+            lifetime = self.ttl
+        elif entry.no_cache or entry.max_age is None:
+            return False
+        else:
+            lifetime = entry.max_age
+        return (now if now is not None else time.time()) - entry.stored_at < lifetime
+
+    def body(self, entry: CacheEntry) -> Optional[bytes]:
+        """Return the stored body of a complete download, or None."""
+        if not entry.complete:
+            return None
+        return self.disk.get_bytes(self._body_key(entry.url))
+
+    def cached_text(
+        self, entry: CacheEntry, max_chars: Optional[int], extract: str = "full"
+    ) -> Optional[Tuple[str, bool]]:
+        """
+        Return (text, truncated) for a text budget if the stored text covers it.
+
+        Args:
+            entry: Cached entry
+            max_chars: Text budget of the current request, or None for no limit
+            extract: Extraction mode of the current request
+
+        Returns:
+            Optional[Tuple[str, bool]]: Text and truncation flag, or None if the
+            stored text was extracted with a smaller budget or another mode
+        """
+        if entry.extract != extract:
+            return None
+        if max_chars is None:
+            return (entry.text, False) if not entry.truncated else None
+        if entry.max_chars is not None and max_chars > entry.max_chars and entry.truncated:
+            return None
+        if len(entry.text) > max_chars:
+            return entry.text[:max_chars], True
+        return entry.text, entry.truncated
+
+    def can_serve(self, entry: CacheEntry, max_chars: Optional[int], extract: str = "full") -> bool:
+        """Check whether an entry can produce text for the budget and mode without downloading."""
+        return entry.complete or self.cached_text(entry, max_chars, extract) is not None
+
+    @staticmethod
+    def conditional_headers(entry: CacheEntry) -> Dict[str, str]:
+        """Return If-None-Match / If-Modified-Since headers for revalidating an entry."""
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def _write(self, entry: CacheEntry) -> None:
+        self.disk.set(self._meta_key(entry.url), json.dumps(entry._asdict()))
+
+    def store(
+        self,
+        url: str,
+        headers: Mapping[str, str],
+        content_type: str,
+        encoding: str,
+        text: str,
+        truncated: bool,
+        max_chars: Optional[int],
+        body: bytes,
+        complete: bool,
+        extract: str = "full",
+        links: Optional[List[str]] = None,
+    ) -> None:
+        """
+        Store a downloaded page.
+
+        Args:
+            url: Requested URL
+            headers: Response headers (case-insensitive mapping)
+            content_type: Response content type
+            encoding: Encoding used to decode the body
+            text: Extracted text
+            truncated: Whether text was cut at the budget
+            max_chars: Budget the text was extracted with
+            body: Raw body bytes downloaded
+            complete: Whether body is the whole response body
+            extract: Extraction mode the text was produced with
+            links: Links found on the page, if they were collected
+        """
+        if not is_storable(headers):
+            return
+        directives = parse_cache_control(headers.get("cache-control"))
+        try:
+            max_age = int(directives["max-age"]) if directives.get("max-age") else None
+        except ValueError:
+            max_age = None
+
+        # A partial body cannot be re-extracted, so only complete ones are kept
+        if complete:
+            self.disk.set_bytes(self._body_key(url), body)
+        else:
+            self.disk.delete(self._body_key(url))
+        self._write(CacheEntry(
+            url=url,
+            content_type=content_type,
+            encoding=encoding,
+            etag=headers.get("etag"),
+            last_modified=headers.get("last-modified"),
+            stored_at=time.time(),
+            max_age=max_age,
+            no_cache="no-cache" in directives,
+            text=text,
+            truncated=truncated,
+            max_chars=max_chars,
+            complete=complete,
+            extract=extract,
+            links=links,
+        ))
+        self.disk.evict(self.max_bytes)
+
+    def refresh(self, entry: CacheEntry, headers: Mapping[str, str]) -> CacheEntry:
+        """Record a 304 Not Modified response, renewing the entry's freshness."""
+        directives = parse_cache_control(headers.get("cache-control"))
+        max_age = entry.max_age
+        if directives.get("max-age"):
+            try:
+                max_age = int(directives["max-age"])
+            except ValueError:
+                pass
+        entry = entry._replace(
+            stored_at=time.time(),
+            max_age=max_age,
+            etag=headers.get("etag") or entry.etag,
+            last_modified=headers.get("last-modified") or entry.last_modified,
+        )
+        self._write(entry)
+        return entry
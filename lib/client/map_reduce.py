@@ -0,0 +1,295 @@
+"""Map-reduce processing of inputs that are too large for a single request."""
+
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from .cache import DiskCache, content_hash
+from .chunking import split_into_chunks, DEFAULT_CHUNK_CHARS
+from .client import Client
+from .exceptions import APICallError
+from .utils import is_error_response
+
+# Default number of concurrent requests
+DEFAULT_MAX_WORKERS = 4
+
+# Small inputs (typically prompts) up to this total size are shared with every map request
+SHARED_INPUT_CHARS = 8000
+
+# Largest file read in map-reduce mode (256MB)
+MAX_INPUT_SIZE = 256 * 1024 * 1024
+
+# Reply the map prompt asks for when a part holds nothing useful
+NOTHING_RELEVANT = "Nothing relevant."
+
+MAP_PROMPT = """You are reading one part of a larger input that was split into parts so it can be processed in parallel.
+
+Extract everything in this part that is relevant to the task below: facts, figures, names, errors, decisions and open questions. Keep the source reference of anything you extract. Be concise and do not carry out the task itself. If nothing in this part is relevant, reply with "{nothing}"
+
+=== TASK ===
+{task}
+
+=== {label} ===
+{chunk}
+"""
+
+COMBINE_PROMPT = """Merge the following notes, extracted from consecutive parts of a larger input, into one set of notes. Remove duplicates, keep every distinct fact with its source reference, and do not carry out the task itself.
+
+=== TASK ===
+{task}
+
+=== NOTES ===
+{notes}
+"""
+
+REDUCE_PROMPT = """{task}
+
+=== NOTES EXTRACTED FROM THE INPUT SOURCES ===
+The input sources were too large to send in full. The notes below were extracted from them part by part, in order.
+
+{notes}
+"""
+
+
+class _Progress:
+    """Thread-safe progress reporting to stderr."""
+
+    def __init__(self, label: str, total: int, enabled: bool):
+        self.label = label
+        self.total = total
+        self.enabled = enabled
+        self.done = 0
+        self.cached = 0
+        self._lock = threading.Lock()
+
+    def advance(self, cached: bool) -> None:
+        """Record one finished item and report it."""
+        with self._lock:
+            self.done += 1
+            self.cached += cached
+            if self.enabled:
+                print(
+                    f"{self.label}: {self.done}/{self.total} done ({self.cached} cached)",
+                    file=sys.stderr,
+                )
+
+
+def partition_inputs(
+    contents: List[str], max_shared_chars: int = SHARED_INPUT_CHARS
+) -> Tuple[List[str], List[str]]:
+    """
+    Split input contents into shared instructions and sources to be chunked.
+
+    Args:
+        contents: Input contents (file contents, scraped pages, stdin)
+        max_shared_chars: Total size of the inputs kept whole and shared with every request
+
+    Returns:
+        Tuple[List[str], List[str]]: (shared, sources)
+    """
+    shared = []
+    sources = []
+    shared_chars = 0
+    for content in contents:
+        if shared_chars + len(content) <= max_shared_chars:
+            shared.append(content)
+            shared_chars += len(content)
+        else:
+            sources.append(content)
+    return shared, sources
+
+
+def make_chunks(sources: List[str], chunk_chars: int) -> List[Tuple[str, str]]:
+    """
+    Split sources into labelled chunks.
+
+    The first line of each source (e.g. "Content from file ...") is used as
+    its label so every chunk keeps its attribution.
+
+    Args:
+        sources: Source contents
+        chunk_chars: Maximum characters per chunk
+
+    Returns:
+        List[Tuple[str, str]]: (label, chunk_text) pairs in input order
+    """
+    chunks = []
+    for source in sources:
+        header, _, body = source.partition("\n")
+        parts = split_into_chunks(body, chunk_chars) or [""]
+        for i, part in enumerate(parts, 1):
+            chunks.append((f"{header.rstrip(':')} [part {i}/{len(parts)}]", part))
+    return chunks
+
+
+class MapReduce:
+    """Run a task over large inputs by mapping over chunks and reducing the notes."""
+
+    def __init__(
+        self,
+        client: Client,
+        model: str,
+        chunk_chars: int = DEFAULT_CHUNK_CHARS,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        cache: Optional[DiskCache] = None,
+        progress: bool = True,
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            client: Client used for every request
+            model: Model identifier
+            chunk_chars: Maximum characters per chunk and per reduce request
+            max_workers: Maximum number of concurrent requests
+            cache: Cache for map and combine results, or None to disable caching
+            progress: Report progress to stderr
+        """
+        self.client = client
+        self.model = model
+        self.chunk_chars = chunk_chars
+        self.max_workers = max(1, max_workers)
+        self.cache = cache
+        self.progress = progress
+
+    def _query(self, prompt: str, use_cache: bool = True) -> Tuple[str, bool]:
+        """Query the model, consulting the cache. Returns (response, was_cached)."""
+        key = content_hash(self.model, prompt)
+        if use_cache and self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached, True
+
+        response = self.client.query(self.model, [prompt])
+        if is_error_response(response):
+            raise APICallError(response)
+
+        if use_cache and self.cache is not None:
+            self.cache.set(key, response)
+        return response, False
+
+    def _run_all(self, label: str, prompts: List[str]) -> List[str]:
+        """Run prompts concurrently and return responses in order."""
+        progress = _Progress(label, len(prompts), self.progress)
+
+        def run_one(prompt: str) -> str:
+            response, cached = self._query(prompt)
+            progress.advance(cached)
+            return response
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(run_one, prompts))
+
+    def _combine(self, task: str, notes: List[str]) -> List[str]:
+        """Merge groups of notes until they fit in one reduce request."""
+        while len(notes) > 1 and sum(len(n) for n in notes) > self.chunk_chars:
+            groups = []
+            current: List[str] = []
+            size = 0
+            for note in notes:
+                if current and size + len(note) > self.chunk_chars:
+                    groups.append(current)
+                    current, size = [], 0
+                current.append(note)
+                size += len(note)
+            groups.append(current)
+
+            if len(groups) == len(notes):
+                # Every note is already too large to pair up; stop merging
+                break
+
+            prompts = [
+                COMBINE_PROMPT.format(task=task, notes="\n\n".join(group))
+                for group in groups
+            ]
+            notes = self._run_all("Combine", prompts)
+
+        return notes
+
+    def run(self, task: str, sources: List[str]) -> str:
+        """
+        Run the task over the sources.
+
+        Args:
+            task: Instructions and shared inputs sent with every request
+            sources: Large source contents to chunk
+
+        Returns:
+            str: Final response
+
+        Raises:
+            APICallError: If any request fails
+        """
+        chunks = make_chunks(sources, self.chunk_chars)
+        print(
+            f"Map-reduce: {len(sources)} source(s) split into {len(chunks)} chunk(s)",
+            file=sys.stderr,
+        )
+
+        prompts = [
+            MAP_PROMPT.format(nothing=NOTHING_RELEVANT, task=task, label=label, chunk=chunk)
+            for label, chunk in chunks
+        ]
+        partials = self._run_all("Map", prompts)
+
+        notes = [
+            f"Notes from {label}:\n{partial}"
+            for (label, _), partial in zip(chunks, partials)
+            if partial.strip() != NOTHING_RELEVANT
+        ]
+        notes = self._combine(task, notes) or [NOTHING_RELEVANT]
+
+        print("Reduce: querying for the final response", file=sys.stderr)
+        response, _ = self._query(
+            REDUCE_PROMPT.format(task=task, notes="\n\n".join(notes)), use_cache=False
+        )
+        return response
+
+
+def map_reduce_query(
+    client: Client,
+    model: str,
+    instructions: str,
+    contents: List[str],
+    chunk_chars: int = DEFAULT_CHUNK_CHARS,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    use_cache: bool = True,
+) -> str:
+    """
+    Query a model over inputs that may exceed the context window.
+
+    Small inputs are sent whole with the instructions. If everything fits in
+    one chunk a single request is made; otherwise large inputs are processed
+    with map-reduce.
+
+    Args:
+        client: Client used for every request
+        model: Model identifier
+        instructions: System prompt or user prompt describing the task
+        contents: Input contents (file contents, scraped pages, stdin)
+        chunk_chars: Maximum characters per chunk
+        max_workers: Maximum number of concurrent requests
+        use_cache: Cache map results on disk so reruns only redo changed chunks
+
+    Returns:
+        str: Final response
+
+    Raises:
+        APICallError: If any request fails
+    """
+    if len(instructions) + sum(len(c) for c in contents) <= chunk_chars:
+        context_parts = [instructions] if instructions else []
+        context_parts.append("\n=== INPUT SOURCES ===\n")
+        context_parts.extend(contents)
+        return client.query(model, ["\n".join(context_parts)])
+
+    shared, sources = partition_inputs(contents)
+    task_parts = [instructions] if instructions else []
+    if shared:
+        task_parts.append("\n=== INPUT SOURCES ===\n")
+        task_parts.extend(shared)
+
+    cache = DiskCache("map_reduce") if use_cache else None
+    runner = MapReduce(client, model, chunk_chars, max_workers, cache)
+    return runner.run("\n".join(task_parts), sources)
@@ -0,0 +1,251 @@
+"""Rolling summarization that keeps a session's context within a token budget."""
+
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterator, List, NamedTuple, Optional
+
+from .chunking import estimate_tokens
+from .client import Client
+from .exceptions import ClientError
+from .session import Session
+from .utils import is_error_response
+
+# Tokens of context (pinned material, digest, material, turns) a session may grow to
+DEFAULT_MEMORY_BUDGET = 60000
+
+# Most recent turns always kept verbatim
+DEFAULT_KEEP_TURNS = 4
+
+# Once over budget, summarize down to this fraction of it, so summaries (and
+# the prompt cache misses they cause) are rare rather than every turn
+LOW_WATER_FRACTION = 0.6
+
+# Tokens reserved for the digest when planning what to summarize
+DIGEST_TOKENS = 1500
+
+# Inexpensive model per provider used for summaries by default
+SUMMARY_MODELS = {
+    "anthropic": "claude-3-5-haiku-20241022",
+    "openai": "o4-mini",
+    "gemini": "gemini-2.5-flash",
+}
+
+SUMMARY_PROMPT = """You maintain the memory of a long working session. Rewrite the earlier summary together with the material and conversation below into one compact summary that replaces them.
+
+Keep every fact, decision, requirement, file and function name, identifier, number and open question that later questions may depend on. Note which source each fact came from. Drop pleasantries, repetition and reasoning that led nowhere. Write terse notes, not prose, in at most about {words} words.
+
+=== EARLIER SUMMARY ===
+{digest}
+
+=== MATERIAL ===
+{material}
+
+=== CONVERSATION ===
+{conversation}"""
+
+
+class FoldPlan(NamedTuple):
+    """How much of a session's oldest content to summarize."""
+
+    material: int  # Leading material entries
+    turns: int  # Leading turns
+
+
+def plan_fold(session: Session, max_tokens: int, keep_turns: int = DEFAULT_KEEP_TURNS) -> Optional[FoldPlan]:
+    """
+    Decide what to summarize so the session fits its budget again.
+
+    Nothing is planned while the session is within max_tokens. Past it, the
+    oldest unpinned material and then the oldest turns are taken, never the
+    last keep_turns, until the rest plus a digest fits in LOW_WATER_FRACTION
+    of the budget. Pinned material is never part of a plan.
+
+    Args:
+        session: Session to measure
+        max_tokens: Token budget for the whole context
+        keep_turns: Recent turns kept verbatim
+
+    Returns:
+        Optional[FoldPlan]: Entries to summarize, or None if within budget or nothing can be summarized
+    """
+    material_tokens = [estimate_tokens(content) for content in session.material]
+    turn_tokens = [estimate_tokens(message) + estimate_tokens(answer) for message, answer in session.turns]
+    fixed = sum(estimate_tokens(content) for content in session.pinned + session.pending)
+    total = fixed + estimate_tokens(session.digest) + sum(material_tokens) + sum(turn_tokens)
+    if total <= max_tokens:
+        return None
+
+    target = max_tokens * LOW_WATER_FRACTION
+    remaining = total - estimate_tokens(session.digest) + DIGEST_TOKENS
+    folded_material = 0
+    for tokens in material_tokens:
+        if remaining <= target:
+            break
+        remaining -= tokens
+        folded_material += 1
+    folded_turns = 0
+    for tokens in turn_tokens[:max(0, len(turn_tokens) - keep_turns)]:
+        if remaining <= target:
+            break
+        remaining -= tokens
+        folded_turns += 1
+
+    if not folded_material and not folded_turns:
+        return None
+    return FoldPlan(folded_material, folded_turns)
+
+
+def summarize(
+    client: Client, model: str, digest: str, material: List[str], turns: List[List[str]]
+) -> str:
+    """
+    Summarize an earlier digest, material and turns into a new digest.
+
+    Args:
+        client: Client for the summary model's provider
+        model: Summary model
+        digest: Current digest, possibly empty
+        material: Material entries to fold in
+        turns: [message, answer] turns to fold in
+
+    Returns:
+        str: New digest
+
+    Raises:
+        ClientError: If the summary request fails or returns nothing
+    """
+    conversation = "\n\n".join(f"User: {message}\n\nAssistant: {answer}" for message, answer in turns)
+    prompt = SUMMARY_PROMPT.format(
+        words=DIGEST_TOKENS * 3 // 4,
+        digest=digest or "(none)",
+        material="\n\n".join(material) or "(none)",
+        conversation=conversation or "(none)",
+    )
+    response = client.query(model, [prompt])
+    if is_error_response(response) or not response.strip():
+        raise ClientError(response or "Empty summary")
+    return response.strip()
+
+
+def verify_pinned(session: Session) -> None:
+    """
+    Check that every pinned entry is still sent verbatim at the start of the context.
+
+    Raises:
+        ClientError: If a pinned entry is missing from the context
+    """
+    first = session.context("")[0]
+    for content in session.pinned:
+        if content not in first:
+            raise ClientError(f"Pinned material was lost from the session context: {content[:60]!r}")
+
+
+class RollingMemory:
+    """
+    Keeps a session within a token budget by summarizing its oldest content.
+
+    After each turn, if the session is over budget, the oldest unpinned
+    material and turns are summarized by a cheap model on a background
+    thread, while the user reads the answer and types the next question.
+    The digest replaces them before the next turn is sent. Recent turns and
+    pinned material always stay verbatim.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        client: Client,
+        model: str,
+        max_tokens: int = DEFAULT_MEMORY_BUDGET,
+        keep_turns: int = DEFAULT_KEEP_TURNS,
+    ):
+        """
+        Initialize the memory manager.
+
+        Args:
+            session: Session to manage
+            client: Client for the summary model's provider
+            model: Summary model
+            max_tokens: Token budget for the whole context
+            keep_turns: Recent turns kept verbatim
+        """
+        self.session = session
+        self.client = client
+        self.model = model
+        self.max_tokens = max_tokens
+        self.keep_turns = keep_turns
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory")
+        self._pending: Optional[Future] = None
+        self._plan: Optional[FoldPlan] = None
+
+    def schedule(self) -> bool:
+        """
+        Start summarizing in the background if the session is over budget.
+
+        Returns:
+            bool: True if a summary was started
+        """
+        if self._pending is not None:
+            return False
+        plan = plan_fold(self.session, self.max_tokens, self.keep_turns)
+        if plan is None:
+            return False
+        session = self.session
+        self._plan = plan
+        self._pending = self._executor.submit(
+            summarize,
+            self.client,
+            self.model,
+            session.digest,
+            list(session.material[:plan.material]),
+            [list(turn) for turn in session.turns[:plan.turns]],
+        )
+        return True
+
+    def settle(self) -> None:
+        """Wait for a running summary and replace the content it covers with the digest."""
+        if self._pending is None:
+            return
+        future, plan = self._pending, self._plan
+        self._pending = self._plan = None
+        try:
+            digest = future.result()
+        except ClientError as e:
+            print(f"Warning: Could not summarize earlier conversation, keeping it in full: {e}", file=sys.stderr)
+            return
+
+        session = self.session
+        session.digest = digest
+        del session.material[:plan.material]
+        del session.turns[:plan.turns]
+        verify_pinned(session)
+        session.save()
+        print(
+            f"Summarized {plan.material} source(s) and {plan.turns} turn(s) of earlier conversation",
+            file=sys.stderr,
+        )
+
+    def ask(self, client: Client, model: str, question: str) -> Iterator[str]:
+        """
+        Ask a question through the session, summarizing around the turn as needed.
+
+        Args:
+            client: Client for the answering model's provider
+            model: Answering model
+            question: Question text
+
+        Yields:
+            str: Successive pieces of the answer
+        """
+        self.settle()
+        # A session already over budget (e.g. just resumed) is summarized before sending
+        if self.schedule():
+            self.settle()
+        yield from self.session.ask(client, model, question)
+        self.schedule()
+
+    def close(self) -> None:
+        """Finish any running summary, so it is saved before exiting."""
+        self.settle()
+        self._executor.shutdown()
+
@@ -1,6 +1,6 @@
 """OpenAI client implementation."""
 
-from typing import List
+from typing import Iterator, List
 from .client import Client
 from .config import get_api_key, validate_model
 from .utils import validate_context, clean_response, retry_on_failure, format_error_message
@@ -45,17 +45,7 @@ class OpenAIClient(Client):
             messages = self._format_messages(context)
             
             # Make the API call
-            # Use max_completion_tokens for newer models (o1, o4 series) and max_tokens for others
-            completion_params = {
-                "model": model,
-                "messages": messages
-            }
-            
-            # Newer models use max_completion_tokens, older models use max_tokens
-            if model.startswith(('o1-', 'o3-', 'o4-')):
-                completion_params["max_completion_tokens"] = 100000
-            else:
-                completion_params["max_tokens"] = 100000
+            completion_params = self._completion_params(model, messages)
             
             response = self.client.chat.completions.create(**completion_params)
             
@@ -67,6 +57,49 @@ class OpenAIClient(Client):
             error_msg = format_error_message(e, self.provider, model)
             return error_msg
     
+    def stream(self, model: str, context: List[str], cache: bool = False) -> Iterator[str]:
+        """
+        Query OpenAI and yield the response text as it is generated.
+        
+        Not retried: once text has been yielded, a retry would repeat it.
+        
+        Args:
+            model: The OpenAI model to use
+            context: List of context strings
+            cache: Unused; OpenAI caches repeated message prefixes automatically
+            
+        Yields:
+            str: Successive pieces of the response
+            
+        Raises:
+            APICallError: If the request or the stream fails
+        """
+        try:
+            validate_model(self.provider, model)
+            validate_context(context)
+            
+            completion_params = self._completion_params(model, self._format_messages(context))
+            for chunk in self.client.chat.completions.create(stream=True, **completion_params):
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            raise APICallError(format_error_message(e, self.provider, model)) from e
+    
+    @staticmethod
+    def _completion_params(model: str, messages: List[dict]) -> dict:
+        """Build chat completion parameters for a model."""
+        completion_params = {
+            "model": model,
+            "messages": messages
+        }
+        
+        # Newer models (o1, o3, o4 series) use max_completion_tokens, older models use max_tokens
+        if model.startswith(('o1-', 'o3-', 'o4-')):
+            completion_params["max_completion_tokens"] = 100000
+        else:
+            completion_params["max_tokens"] = 100000
+        return completion_params
+    
     def _format_messages(self, context: List[str]) -> List[dict]:
         """
         Format context strings into OpenAI message format.
@@ -0,0 +1,320 @@
+"""Model-written edits to existing files: search/replace blocks and unified diffs."""
+
+import difflib
+import re
+from typing import List, NamedTuple, Optional, Tuple
+
+from .exceptions import PatchError
+
+# Markers of a search/replace block, as emitted inside a fence labelled with the file path
+_SEARCH = re.compile(r"^\s*<{5,9} ?SEARCH\b.*$")
+_DIVIDER = re.compile(r"^\s*={5,9}\s*$")
+_REPLACE = re.compile(r"^\s*>{5,9} ?REPLACE\b.*$")
+
+# Unified diff file headers and hunk headers
+_OLD_FILE = re.compile(r"^--- (\S.*)$")
+_NEW_FILE = re.compile(r"^\+\+\+ (\S.*)$")
+_HUNK = re.compile(r"^@@ -(\d+)(?:,\d+)? \+\d+(?:,\d+)? @@")
+
+# Fence labels that mark a block as a diff rather than a file
+DIFF_LABELS = {"diff", "patch", "udiff"}
+
+# Similarity (difflib ratio) a region needs to match a search text that is not found verbatim
+FUZZY_THRESHOLD = 0.85
+
+# Best fuzzy matches closer than this are ambiguous
+_FUZZY_MARGIN = 0.02
+
+
+class Hunk(NamedTuple):
+    """One edit: lines to find in a file and the lines to put in their place."""
+
+    search: List[str]
+    replace: List[str]
+    line: Optional[int] = None  # 1-based line the search text is expected near, if known
+
+
+class FilePatch(NamedTuple):
+    """Edits to one file, applied in order."""
+
+    filepath: str
+    hunks: List[Hunk]
+
+
+def is_search_replace(content: str) -> bool:
+    """Check whether a file block holds search/replace blocks instead of a whole file."""
+    return any(_SEARCH.match(line) for line in content.splitlines())
+
+
+def is_unified_diff(label: str, content: str) -> bool:
+    """
+    Check whether a fenced block is a unified diff.
+
+    Args:
+        label: Fence info string (the file path for file blocks)
+        content: Block content
+
+    Returns:
+        bool: True for blocks labelled diff/patch or starting with ---/+++ headers
+    """
+    lines = content.lstrip("\n").splitlines()
+    has_headers = len(lines) > 1 and bool(_OLD_FILE.match(lines[0]) and _NEW_FILE.match(lines[1]))
+    return has_headers or (label.lower() in DIFF_LABELS and any(_HUNK.match(line) for line in lines))
+
+
+def parse_search_replace(content: str) -> List[Hunk]:
+    """
+    Parse search/replace blocks:
+
+        <<<<<<< SEARCH
+        lines currently in the file
+        =======
+        lines to put in their place
+        >>>>>>> REPLACE
+
+    Args:
+        content: Body of a file block
+
+    Returns:
+        List[Hunk]: Edits in order
+
+    Raises:
+        PatchError: If a block is missing its divider or closing marker
+    """
+    hunks = []
+    search: List[str] = []
+    replace: List[str] = []
+    state = None
+    for line in content.splitlines():
+        if state is None:
+            if _SEARCH.match(line):
+                state, search, replace = "search", [], []
+        elif state == "search":
+            if _DIVIDER.match(line):
+                state = "replace"
+            elif _REPLACE.match(line) or _SEARCH.match(line):
+                raise PatchError("search/replace block is missing its ======= divider")
+            else:
+                search.append(line)
+        elif _REPLACE.match(line):
+            hunks.append(Hunk(search, replace))
+            state = None
+        elif _SEARCH.match(line):
+            raise PatchError("search/replace block is missing its >>>>>>> REPLACE marker")
+        else:
+            replace.append(line)
+    if state is not None:
+        raise PatchError("search/replace block is not terminated by >>>>>>> REPLACE")
+    return hunks
+
+
+def _diff_path(header: str) -> Optional[str]:
+    """Path from a ---/+++ header, without a/ b/ prefixes or timestamps; None for /dev/null."""
+    path = header.split("\t")[0].strip()
+    if path == "/dev/null":
+        return None
+    if path[:2] in ("a/", "b/"):
+        path = path[2:]
+    return path
+
+
+def parse_unified_diff(content: str, default_path: Optional[str] = None) -> List[FilePatch]:
+    """
+    Parse a unified diff into per-file hunks.
+
+    Line counts in hunk headers are ignored, since models often get them
+    wrong: a hunk runs until the next hunk or file header. Hunk start lines
+    are kept as hints for choosing between repeated matches. Blank lines
+    and lines missing their leading space are taken as context.
+
+    Args:
+        content: Diff text, possibly covering several files
+        default_path: File the hunks apply to when the diff has no file headers
+
+    Returns:
+        List[FilePatch]: Edits per file, in order; a new file has one hunk with no search lines
+
+    Raises:
+        PatchError: If the diff deletes a file or has hunks without a file
+    """
+    patches: List[FilePatch] = []
+    lines = content.splitlines()
+    filepath = default_path
+    hunks: Optional[List[Hunk]] = None
+    search: Optional[List[str]] = None
+    replace: List[str] = []
+    start: Optional[int] = None
+
+    def finish_hunk():
+        if search is not None and hunks is not None and (search or replace):
+            hunks.append(Hunk(search, replace, start))
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        old = _OLD_FILE.match(line)
+        new = _NEW_FILE.match(lines[i + 1]) if old and i + 1 < len(lines) else None
+        hunk = _HUNK.match(line)
+        if old and new:
+            finish_hunk()
+            search, hunks = None, None
+            filepath = _diff_path(new.group(1))
+            if filepath is None:
+                raise PatchError(f"deleting files is not supported: {_diff_path(old.group(1))}")
+            i += 2
+            continue
+        if hunk:
+            finish_hunk()
+            if filepath is None:
+                raise PatchError("diff hunk does not name the file it changes")
+            if hunks is None:
+                hunks = []
+                patches.append(FilePatch(filepath, hunks))
+            search, replace, start = [], [], int(hunk.group(1))
+        elif search is not None:
+            if line.startswith("-"):
+                search.append(line[1:])
+            elif line.startswith("+"):
+                replace.append(line[1:])
+            elif not line.startswith("\\"):
+                context = line[1:] if line.startswith(" ") else line
+                search.append(context)
+                replace.append(context)
+        i += 1
+    finish_hunk()
+    return [patch for patch in patches if patch.hunks]
+
+
+def _trim_blank_edges(hunk: Hunk) -> Hunk:
+    """Drop blank lines at the edges of the search text, and the same ones from the replacement."""
+    search, replace = list(hunk.search), list(hunk.replace)
+    while search and not search[0].strip():
+        search.pop(0)
+        if replace and not replace[0].strip():
+            replace.pop(0)
+    while search and not search[-1].strip():
+        search.pop()
+        if replace and not replace[-1].strip():
+            replace.pop()
+    return Hunk(search, replace, hunk.line)
+
+
+def _indent(line: str) -> str:
+    return line[:len(line) - len(line.lstrip())]
+
+
+def _reindent(search: List[str], found: List[str], replace: List[str]) -> List[str]:
+    """Shift replacement lines by the indentation difference between the search text and the file."""
+    pairs = [(s, f) for s, f in zip(search, found) if s.strip()]
+    if not pairs:
+        return replace
+    wanted, given = _indent(pairs[0][1]), _indent(pairs[0][0])
+    if wanted.endswith(given):
+        extra = wanted[:len(wanted) - len(given)]
+        return [extra + line if line.strip() else line for line in replace]
+    if given.endswith(wanted):
+        excess = given[:len(given) - len(wanted)]
+        return [line[len(excess):] if line.startswith(excess) else line for line in replace]
+    return replace
+
+
+def _choose(positions: List[int], hint: Optional[int], what: str) -> int:
+    """Pick one match, using the hinted line to break ties."""
+    if len(positions) == 1:
+        return positions[0]
+    if hint is None:
+        raise PatchError(f"{what} matches {len(positions)} places; more context is needed")
+    return min(positions, key=lambda position: abs(position + 1 - hint))
+
+
+def _find(lines: List[str], search: List[str], hint: Optional[int]) -> Tuple[int, int, bool]:
+    """
+    Locate search lines in a file, exactly, then ignoring whitespace, then fuzzily.
+
+    Returns:
+        Tuple[int, int, bool]: (start, end, whether indentation differed)
+    """
+    size = len(search)
+    candidates = range(len(lines) - size + 1)
+
+    exact = [i for i in candidates if lines[i] == search[0] and lines[i:i + size] == search]
+    if exact:
+        return _choose(exact, hint, "search text"), size, False
+
+    stripped = [line.rstrip() for line in lines]
+    target = [line.rstrip() for line in search]
+    loose = [i for i in candidates if stripped[i:i + size] == target]
+    if loose:
+        return _choose(loose, hint, "search text"), size, False
+
+    stripped = [line.strip() for line in lines]
+    target = [line.strip() for line in search]
+    unindented = [i for i in candidates if stripped[i:i + size] == target]
+    if unindented:
+        return _choose(unindented, hint, "search text"), size, True
+
+    # Fuzzy: the most similar window of the same length, if clearly the best
+    wanted = "\n".join(target)
+    matcher = difflib.SequenceMatcher(autojunk=False)
+    matcher.set_seq2(wanted)
+    scored = []
+    for i in candidates:
+        matcher.set_seq1("\n".join(stripped[i:i + size]))
+        if matcher.real_quick_ratio() < FUZZY_THRESHOLD or matcher.quick_ratio() < FUZZY_THRESHOLD:
+            continue
+        ratio = matcher.ratio()
+        if ratio >= FUZZY_THRESHOLD:
+            scored.append((ratio, i))
+    if not scored:
+        raise PatchError(f"search text not found: {search[0].strip()!r}")
+    scored.sort(reverse=True)
+    best_ratio, best = scored[0]
+    rivals = [i for ratio, i in scored[1:] if best_ratio - ratio < _FUZZY_MARGIN and abs(i - best) >= size]
+    if rivals:
+        best = _choose([best] + rivals, hint, "approximate search text")
+    return best, size, True
+
+
+def apply_hunks(original: Optional[str], hunks: List[Hunk]) -> str:
+    """
+    Apply edits to a file's content, all or nothing.
+
+    Each hunk's search lines are located exactly, then ignoring trailing
+    whitespace, then ignoring indentation (re-indenting the replacement to
+    match), then as the most similar region above FUZZY_THRESHOLD. Search
+    text found in several places is resolved by the hunk's line hint, or
+    reported as a conflict. An empty search creates the file, or appends
+    to it if it exists. Line endings and the final newline are preserved.
+
+    Args:
+        original: Current file content, or None if the file does not exist
+        hunks: Edits to apply in order
+
+    Returns:
+        str: Edited content
+
+    Raises:
+        PatchError: If any edit cannot be placed unambiguously
+    """
+    newline = "\r\n" if original and "\r\n" in original else "\n"
+    lines = original.splitlines() if original else []
+    final_newline = original.endswith(("\n", "\r")) if original else True
+    offset = 0
+
+    for hunk in hunks:
+        hunk = _trim_blank_edges(hunk)
+        if not hunk.search:
+            lines.extend(hunk.replace)
+            continue
+        if not lines:
+            raise PatchError(
+                "cannot edit a file that does not exist" if original is None else "cannot edit an empty file"
+            )
+
+        hint = hunk.line + offset if hunk.line is not None else None
+        start, size, reindent = _find(lines, hunk.search, hint)
+        replace = _reindent(hunk.search, lines[start:start + size], hunk.replace) if reindent else hunk.replace
+        lines[start:start + size] = replace
+        offset += len(replace) - size
+
+    return newline.join(lines) + (newline if final_newline and lines else "")
@@ -0,0 +1,140 @@
+"""Concurrent CLI stages with a timing breakdown showing the critical path."""
+
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, NamedTuple, Optional, TextIO
+
+# Threads for concurrent stages: client setup, file reads, URL downloads and stdin
+DEFAULT_STAGE_WORKERS = 4
+
+# A stage starting this soon after another ends is taken to have waited for it
+_HANDOFF_SECONDS = 0.005
+
+
+class StageTiming(NamedTuple):
+    """When a stage ran, in seconds since the pipeline started."""
+
+    name: str
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        """Seconds the stage took."""
+        return self.end - self.start
+
+
+class Pipeline:
+    """
+    Runs independent CLI stages concurrently and records when each ran.
+
+    Stages submitted with submit() run on worker threads and return futures;
+    stages run inline with stage() are timed on the calling thread. Errors,
+    including SystemExit from error_exit, are raised from Future.result().
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_STAGE_WORKERS):
+        """
+        Initialize the pipeline and start its clock.
+
+        Args:
+            max_workers: Threads available to submitted stages
+        """
+        self.origin = time.perf_counter()
+        self.timings: List[StageTiming] = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stage")
+
+    def __enter__(self) -> "Pipeline":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _now(self) -> float:
+        return time.perf_counter() - self.origin
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a block of code as a named stage."""
+        start = self._now()
+        try:
+            yield
+        finally:
+            timing = StageTiming(name, start, self._now())
+            with self._lock:
+                self.timings.append(timing)
+
+    def submit(self, name: str, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Start a stage on a worker thread.
+
+        Args:
+            name: Stage name shown in the timing breakdown
+            fn: Function to run
+            *args, **kwargs: Arguments for fn
+
+        Returns:
+            Future: Resolves to fn's result
+        """
+        def timed():
+            with self.stage(name):
+                return fn(*args, **kwargs)
+
+        return self._executor.submit(timed)
+
+    def critical_path(self) -> List[StageTiming]:
+        """
+        Return the chain of stages that determined the wall time.
+
+        Starting from the stage that finished last, each step goes back to
+        the latest stage that had finished by the time the current one
+        started, which is the one it was waiting for.
+
+        Returns:
+            List[StageTiming]: Stages on the critical path, earliest first
+        """
+        with self._lock:
+            remaining = sorted(self.timings, key=lambda timing: timing.end)
+        if not remaining:
+            return []
+        path = [remaining.pop()]
+        while True:
+            before = [t for t in remaining if t.end <= path[-1].start + _HANDOFF_SECONDS]
+            if not before:
+                break
+            path.append(before[-1])
+            remaining = before[:-1]
+        return list(reversed(path))
+
+    def print_timings(self, file: Optional[TextIO] = None) -> None:
+        """
+        Print each stage's start, end and duration, marking the critical path.
+
+        Args:
+            file: Stream to print to (default: stderr)
+        """
+        file = file if file is not None else sys.stderr
+        with self._lock:
+            timings = sorted(self.timings, key=lambda timing: (timing.start, timing.end))
+        path = self.critical_path()
+        wall = max((timing.end for timing in timings), default=0.0)
+
+        print(f"\nTimings (wall {wall:.2f}s, * = critical path):", file=file)
+        width = max((len(timing.name) for timing in timings), default=0)
+        for timing in timings:
+            marker = "*" if timing in path else " "
+            print(
+                f"  {marker} {timing.name:<{width}}  {timing.start:7.2f}s -> {timing.end:7.2f}s  "
+                f"{timing.duration:7.2f}s",
+                file=file,
+            )
+        if path:
+            print(f"Critical path: {' -> '.join(timing.name for timing in path)}", file=file)
+
+    def close(self) -> None:
+        """Stop accepting stages; stages already running finish in the background."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
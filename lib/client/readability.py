@@ -0,0 +1,387 @@
+"""Main-content extraction: keep the article or data block of a page, drop page chrome."""
+
+import codecs
+import re
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple, Union
+
+from .html_stream import SKIPPED_TAGS, VOID_TAGS
+
+# Extraction modes selectable per run
+EXTRACT_MODES = ("full", "main")
+
+# Subtrees dropped before scoring, in addition to SKIPPED_TAGS
+REMOVED_TAGS = SKIPPED_TAGS | {"form", "button", "select", "iframe", "svg", "noscript", "template"}
+
+# Class/id patterns of page chrome and of content containers
+UNLIKELY_PATTERN = re.compile(
+    r"cookie|consent|gdpr|banner|promo|advert|\bads?\b|sponsor|social|share|related|"
+    r"comment|popup|modal|newsletter|subscribe|menu|breadcrumb|sidebar|widget|masthead|skip",
+    re.IGNORECASE,
+)
+POSITIVE_PATTERN = re.compile(
+    r"article|content|main|body|post|story|entry|text|schedule|results|scores|table",
+    re.IGNORECASE,
+)
+
+# Paragraph-like elements whose text is scored and credited to their ancestors
+SCORED_TAGS = frozenset({"p", "pre", "td", "blockquote", "li", "tr", "dd"})
+
+# Minimum characters for a paragraph to count; table rows are often short
+MIN_PARAGRAPH_CHARS = 25
+MIN_ROW_CHARS = 10
+
+BLOCK_TAGS = frozenset({
+    "address", "article", "blockquote", "body", "dd", "details", "dialog", "div", "dl", "dt",
+    "fieldset", "figcaption", "figure", "h1", "h2", "h3", "h4", "h5", "h6", "hr", "html",
+    "li", "main", "ol", "p", "pre", "section", "summary", "table", "tbody", "td", "tfoot",
+    "th", "thead", "tr", "ul", "caption",
+})
+
+INLINE_TAGS = frozenset({
+    "a", "abbr", "b", "bdi", "bdo", "cite", "code", "data", "dfn", "em", "i", "kbd", "mark",
+    "q", "s", "samp", "small", "span", "strong", "sub", "sup", "time", "u", "var", "font",
+})
+
+# Start tags that implicitly close an open element: tag -> (closed tags, scope boundaries)
+_IMPLIED_CLOSE = {
+    "li": ({"li"}, {"ul", "ol"}),
+    "dt": ({"dt", "dd"}, {"dl"}),
+    "dd": ({"dt", "dd"}, {"dl"}),
+    "td": ({"td", "th"}, {"tr", "table"}),
+    "th": ({"td", "th"}, {"tr", "table"}),
+    "tr": ({"tr", "td", "th"}, {"table", "tbody", "thead", "tfoot"}),
+    "tbody": ({"thead", "tbody", "tfoot", "tr", "td", "th"}, {"table"}),
+    "tfoot": ({"thead", "tbody", "tfoot", "tr", "td", "th"}, {"table"}),
+    "option": ({"option"}, {"select", "datalist"}),
+}
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class Node:
+    """Element in the lightweight document tree."""
+
+    __slots__ = ("tag", "hint", "parent", "children", "text_len", "link_len", "score")
+
+    def __init__(self, tag: str, hint: str = "", parent: Optional["Node"] = None):
+        self.tag = tag
+        self.hint = hint
+        self.parent = parent
+        self.children: List[Union["Node", str]] = []
+        self.text_len = 0
+        self.link_len = 0
+        self.score: Optional[float] = None
+
+
+class _TreeBuilder(HTMLParser):
+    """Builds a Node tree, dropping removed subtrees and applying common implied end tags."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("#document")
+        self.stack = [self.root]
+        self.removing = 0
+
+    def _close_to(self, index: int) -> None:
+        del self.stack[index:]
+
+    def handle_starttag(self, tag, attrs):
+        if self.removing:
+            if tag in REMOVED_TAGS and tag not in VOID_TAGS:
+                self.removing += 1
+            return
+        if tag in REMOVED_TAGS:
+            self.removing = 1
+            return
+
+        hint = " ".join(v for k, v in attrs if k in ("id", "class", "role") and v)
+        if tag in _IMPLIED_CLOSE:
+            # Close the outermost open element it ends, e.g. <tr> ends an open <tr> and its <td>
+            closes, scope = _IMPLIED_CLOSE[tag]
+            outermost = None
+            for i in range(len(self.stack) - 1, 0, -1):
+                if self.stack[i].tag in scope:
+                    break
+                if self.stack[i].tag in closes:
+                    outermost = i
+            if outermost is not None:
+                self._close_to(outermost)
+        elif tag in BLOCK_TAGS:
+            # A block start closes an open paragraph
+            for i in range(len(self.stack) - 1, 0, -1):
+                if self.stack[i].tag == "p":
+                    self._close_to(i)
+                    break
+                if self.stack[i].tag not in INLINE_TAGS:
+                    break
+
+        node = Node(tag, hint, self.stack[-1])
+        self.stack[-1].children.append(node)
+        if tag not in VOID_TAGS:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        if not self.removing and tag == "br":
+            self.stack[-1].children.append(Node("br", "", self.stack[-1]))
+
+    def handle_endtag(self, tag):
+        if self.removing:
+            if tag in REMOVED_TAGS:
+                self.removing -= 1
+            return
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].tag == tag:
+                self._close_to(i)
+                return
+
+    def handle_data(self, data):
+        if not self.removing:
+            self.stack[-1].children.append(data)
+
+
+def parse_tree(html: str) -> Node:
+    """Parse HTML into a Node tree without script, style and page chrome elements."""
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+def _measure(node: Node) -> None:
+    """Compute text and link-text lengths bottom-up, iteratively."""
+    order = []
+    pending = [node]
+    while pending:
+        current = pending.pop()
+        order.append(current)
+        pending.extend(c for c in current.children if isinstance(c, Node))
+    for current in reversed(order):
+        text_len = link_len = 0
+        for child in current.children:
+            if isinstance(child, str):
+                text_len += len(child.strip())
+            else:
+                text_len += child.text_len
+                link_len += child.link_len
+        current.text_len = text_len
+        current.link_len = text_len if current.tag == "a" else link_len
+
+
+def _inline_text(node: Node) -> str:
+    """Return the whitespace-collapsed text of a subtree."""
+    parts = []
+    pending: List[Union[Node, str]] = [node]
+    while pending:
+        current = pending.pop()
+        if isinstance(current, str):
+            parts.append(current)
+        else:
+            if current.tag in BLOCK_TAGS or current.tag == "br":
+                parts.append(" ")
+            pending.extend(reversed(current.children))
+    return _WHITESPACE.sub(" ", "".join(parts)).strip()
+
+
+def _initial_score(node: Node) -> float:
+    """Base score of a candidate container from its tag and class/id."""
+    score = {
+        "div": 5, "article": 10, "main": 10, "section": 3, "table": 5, "tbody": 3,
+        "pre": 3, "td": 3, "blockquote": 3,
+        "form": -3, "ol": -3, "ul": -3, "dl": -3, "th": -5,
+        "h1": -5, "h2": -5, "h3": -5, "h4": -5, "h5": -5, "h6": -5,
+    }.get(node.tag, 0)
+    if node.hint:
+        if UNLIKELY_PATTERN.search(node.hint) and not POSITIVE_PATTERN.search(node.hint):
+            score -= 25
+        elif POSITIVE_PATTERN.search(node.hint):
+            score += 25
+    return score
+
+
+def _link_density(node: Node) -> float:
+    return node.link_len / node.text_len if node.text_len else 0.0
+
+
+def _iter_nodes(node: Node):
+    pending = [node]
+    while pending:
+        current = pending.pop()
+        yield current
+        pending.extend(c for c in reversed(current.children) if isinstance(c, Node))
+
+
+def find_main_content(root: Node) -> List[Node]:
+    """
+    Find the nodes making up the main content block.
+
+    Paragraph-like elements are scored by length and comma count, and each
+    score is credited to the parent and, halved, the grandparent. The best
+    container after a link-density penalty is chosen, together with siblings
+    that score comparably.
+
+    Args:
+        root: Parsed document
+
+    Returns:
+        List[Node]: Content nodes in document order (the body if nothing scores)
+    """
+    _measure(root)
+    candidates = []
+    for node in _iter_nodes(root):
+        if node.tag not in SCORED_TAGS:
+            continue
+        if node.text_len < (MIN_ROW_CHARS if node.tag == "tr" else MIN_PARAGRAPH_CHARS):
+            continue
+        text = _inline_text(node)
+        score = 1 + text.count(",") + min(len(text) // 100, 3)
+        for ancestor, share in ((node.parent, 1.0), (node.parent and node.parent.parent, 0.5)):
+            if ancestor is None or ancestor is root:
+                continue
+            if ancestor.score is None:
+                ancestor.score = _initial_score(ancestor)
+                candidates.append(ancestor)
+            ancestor.score += score * share
+
+    if not candidates:
+        body = next((n for n in _iter_nodes(root) if n.tag == "body"), root)
+        return [body]
+
+    for candidate in candidates:
+        candidate.score *= 1 - _link_density(candidate)
+    top = max(candidates, key=lambda n: n.score)
+
+    parent = top.parent
+    if parent is None:
+        return [top]
+    threshold = max(10.0, top.score * 0.2)
+    selected = []
+    for sibling in parent.children:
+        if not isinstance(sibling, Node):
+            continue
+        if sibling is top or (sibling.score is not None and sibling.score >= threshold):
+            selected.append(sibling)
+        elif sibling.tag == "p" and sibling.text_len > 80 and _link_density(sibling) < 0.25:
+            selected.append(sibling)
+    return selected
+
+
+def render_text(nodes: List[Node]) -> str:
+    """
+    Render nodes as text with one line per block and tables as compact rows.
+
+    Table rows become "cell | cell | cell" lines, list items start with "- ".
+
+    Args:
+        nodes: Nodes to render in order
+
+    Returns:
+        str: Rendered text
+    """
+    lines: List[str] = []
+    current: List[str] = []
+
+    def flush():
+        line = _WHITESPACE.sub(" ", "".join(current)).strip()
+        if line:
+            lines.append(line)
+        current.clear()
+
+    def visit(node: Union[Node, str]):
+        if isinstance(node, str):
+            current.append(node)
+            return
+        if node.tag == "br":
+            flush()
+            return
+        if node.tag == "tr":
+            flush()
+            cells = [_inline_text(c) for c in node.children if isinstance(c, Node) and c.tag in ("td", "th")]
+            if any(cells):
+                lines.append(" | ".join(cells))
+            return
+        block = node.tag in BLOCK_TAGS
+        if block:
+            flush()
+        if node.tag == "li":
+            current.append("- ")
+        for child in node.children:
+            visit(child)
+        if block:
+            flush()
+
+    for node in nodes:
+        _render_safely(node, visit)
+    flush()
+    return "\n".join(lines)
+
+
+def _render_safely(node: Node, visit) -> None:
+    """Visit a subtree, falling back to flat text for pathologically deep documents."""
+    try:
+        visit(node)
+    except RecursionError:
+        visit(_inline_text(node))
+
+
+def extract_main_content(html: str) -> str:
+    """
+    Extract the main content of an HTML page as text.
+
+    Args:
+        html: HTML source
+
+    Returns:
+        str: Main content, one block per line with tables as rows
+    """
+    return render_text(find_main_content(parse_tree(html)))
+
+
+class MainContentExtractor:
+    """
+    Extractor with the StreamingTextExtractor interface for main-content mode.
+
+    Scoring needs the whole document, so chunks are decoded and buffered and
+    the text budget is applied when closed.
+    """
+
+    def __init__(self, encoding: str, max_chars: Optional[int] = None):
+        """
+        Initialize the extractor.
+
+        Args:
+            encoding: Character encoding of the byte stream
+            max_chars: Maximum characters of text to keep, or None for no limit
+        """
+        self.decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self.max_chars = max_chars
+        self.parts: List[str] = []
+        self.raw_chars = 0
+
+    @property
+    def done(self) -> bool:
+        """Always False: the whole page is needed to find the main content."""
+        return False
+
+    def feed(self, chunk: bytes) -> bool:
+        """Buffer a chunk of the response body; returns False (never stops early)."""
+        text = self.decoder.decode(chunk)
+        self.parts.append(text)
+        self.raw_chars += len(text)
+        return False
+
+    def close(self) -> Tuple[str, bool]:
+        """
+        Extract the main content.
+
+        Returns:
+            Tuple[str, bool]: (text, truncated)
+        """
+        self.parts.append(self.decoder.decode(b"", final=True))
+        html = "".join(self.parts)
+        self.parts = []
+        self.raw_chars = len(html)
+        text = extract_main_content(html)
+        if self.max_chars is not None and len(text) > self.max_chars:
+            return text[:self.max_chars], True
+        return text, False
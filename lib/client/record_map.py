@@ -0,0 +1,213 @@
+"""Streaming map of a task over stdin records, in concurrent batches with backpressure."""
+
+import json
+import re
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from .cache import DiskCache, content_hash
+from .client import Client
+from .utils import is_error_response
+
+# Record formats read from stdin
+RECORD_FORMATS = ("lines", "nul", "jsonl")
+
+# Records sent per request
+DEFAULT_BATCH_SIZE = 20
+
+# Batches queued or finished but not yet written, per worker; reading stops while the queue is full
+QUEUE_BATCHES_PER_WORKER = 2
+
+# Characters read at a time for NUL-separated records
+_READ_CHARS = 64 * 1024
+
+# "[3] result" lines in a batch response
+_RESULT_LINE = re.compile(r"^\s*\[(\d+)\]\s?(.*)$")
+
+MISSING_RESULT = "Error: no result returned for this record"
+
+RECORDS_PROMPT = """Apply the task below to each of the {count} numbered records independently.
+
+Reply with exactly one line per record, in order, each starting with the record's number in brackets, e.g. "[1] result". Keep each result on a single line and do not add any other text.
+
+=== TASK ===
+{task}
+
+=== RECORDS ===
+{records}
+"""
+
+
+def iter_records(stream: TextIO, record_format: str = "lines") -> Iterator[str]:
+    """
+    Read records from a stream incrementally.
+
+    Args:
+        stream: Text stream, e.g. sys.stdin
+        record_format: "lines" (blank lines skipped), "nul" (NUL-separated)
+            or "jsonl" (one JSON value per line, passed on compactly encoded)
+
+    Yields:
+        str: Each record, in order
+    """
+    if record_format == "nul":
+        partial = ""
+        while True:
+            data = stream.read(_READ_CHARS)
+            if not data:
+                break
+            pieces = (partial + data).split("\0")
+            partial = pieces.pop()
+            yield from (piece for piece in pieces if piece.strip())
+        if partial.strip():
+            yield partial
+        return
+
+    for number, line in enumerate(stream, 1):
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            continue
+        if record_format == "jsonl":
+            try:
+                line = json.dumps(json.loads(line), ensure_ascii=False, separators=(",", ":"))
+            except ValueError:
+                print(f"Warning: Line {number} is not valid JSON; sending it as text", file=sys.stderr)
+        yield line
+
+
+def batched(records: Iterable[str], size: int) -> Iterator[List[str]]:
+    """Group records into lists of up to size records."""
+    batch: List[str] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def parse_results(response: str, count: int) -> List[str]:
+    """
+    Split a batch response into one single-line result per record.
+
+    Args:
+        response: Model response with "[n] result" lines
+        count: Number of records in the batch
+
+    Returns:
+        List[str]: Results in record order; records without a result get MISSING_RESULT
+    """
+    results: Dict[int, str] = {}
+    for line in response.splitlines():
+        match = _RESULT_LINE.match(line)
+        if match:
+            results.setdefault(int(match.group(1)), match.group(2).strip())
+    return [results.get(number, MISSING_RESULT) for number in range(1, count + 1)]
+
+
+class RecordMapper:
+    """Applies a task to batches of records with a bounded number of requests in flight."""
+
+    def __init__(
+        self,
+        client: Client,
+        model: str,
+        task: str,
+        shared: Optional[List[str]] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_workers: int = 4,
+        cache: Optional[DiskCache] = None,
+    ):
+        """
+        Initialize the mapper.
+
+        Args:
+            client: Client used for every request
+            model: Model identifier
+            task: What to do with each record
+            shared: Reference material sent before the task in every request
+            batch_size: Records per request
+            max_workers: Maximum number of concurrent requests
+            cache: Cache for batch responses, or None to disable caching
+        """
+        self.client = client
+        self.model = model
+        self.task = task
+        self.shared = "\n\n".join(shared or [])
+        self.batch_size = max(1, batch_size)
+        self.max_workers = max(1, max_workers)
+        self.cache = cache
+        self.failed = 0  # Records whose batch request failed
+        self._lock = threading.Lock()
+
+    def _prompt(self, batch: List[str]) -> str:
+        records = "\n".join(
+            f"[{number}] " + record.replace("\n", "\n    ") for number, record in enumerate(batch, 1)
+        )
+        prompt = RECORDS_PROMPT.format(count=len(batch), task=self.task, records=records)
+        # Shared material first, so every request starts with the same prefix
+        return f"{self.shared}\n\n{prompt}" if self.shared else prompt
+
+    def _run_batch(self, batch: List[str]) -> List[str]:
+        prompt = self._prompt(batch)
+        key = content_hash(self.model, prompt)
+        response = self.cache.get(key) if self.cache is not None else None
+        if response is None:
+            response = self.client.query(self.model, [prompt])
+            if is_error_response(response):
+                with self._lock:
+                    self.failed += len(batch)
+                return [" ".join(response.split())] * len(batch)
+            if self.cache is not None:
+                self.cache.set(key, response)
+        return parse_results(response, len(batch))
+
+    def run(self, records: Iterable[str], ordered: bool = True) -> Iterator[Tuple[int, str]]:
+        """
+        Map the task over records, yielding results as batches finish.
+
+        Records are pulled from the iterable only while fewer than
+        QUEUE_BATCHES_PER_WORKER batches per worker are queued, running or
+        waiting to be yielded, so a fast producer (a pipe of millions of
+        lines) is held back rather than buffered in memory.
+
+        Args:
+            records: Records, e.g. from iter_records
+            ordered: Yield in input order; otherwise in completion order
+
+        Yields:
+            Tuple[int, str]: (1-based record number, result)
+        """
+        window = self.max_workers * QUEUE_BATCHES_PER_WORKER
+        batches = enumerate(batched(records, self.batch_size))
+        pending: Dict[int, Tuple[int, Future]] = {}  # batch index -> (first record number, future)
+        next_batch = 0
+        exhausted = False
+        first_number = 1
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                while not exhausted and len(pending) < window:
+                    try:
+                        index, batch = next(batches)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending[index] = (first_number, executor.submit(self._run_batch, batch))
+                    first_number += len(batch)
+                if not pending:
+                    return
+
+                if ordered:
+                    ready = [next_batch]
+                    next_batch += 1
+                else:
+                    done, _ = wait([future for _, future in pending.values()], return_when=FIRST_COMPLETED)
+                    ready = [index for index, (_, future) in pending.items() if future in done]
+                for index in ready:
+                    start, future = pending.pop(index)
+                    for offset, result in enumerate(future.result()):
+                        yield start + offset, result
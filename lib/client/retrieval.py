@@ -0,0 +1,209 @@
+"""In-memory BM25 retrieval for sending only the relevant parts of large inputs."""
+
+import re
+import sys
+from typing import List, NamedTuple
+
+import numpy as np
+
+from .chunking import split_into_chunks, estimate_tokens
+
+# Characters per retrievable passage
+RETRIEVAL_CHUNK_CHARS = 1500
+
+# Default number of passages to select
+DEFAULT_TOP_K = 20
+
+# Default token budget for the selected passages
+DEFAULT_TOKEN_BUDGET = 8000
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Headers of input contents that can be split into passages
+RETRIEVABLE_PREFIXES = ("Content from ",)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9_]+")
+
+_STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the "
+    "this to was were will with you your i we our they them do does not".split()
+)
+
+
+class Passage(NamedTuple):
+    """A retrievable piece of an input source."""
+
+    source: int
+    position: int
+    header: str
+    text: str
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase text and split it into word tokens, dropping stop words."""
+    return [t for t in _TOKEN_PATTERN.findall(text.lower()) if t not in _STOP_WORDS]
+
+
+class BM25Index:
+    """BM25 index over passages with postings stored as NumPy arrays."""
+
+    def __init__(self, passages: List[Passage], k1: float = BM25_K1, b: float = BM25_B):
+        """
+        Build the index.
+
+        Args:
+            passages: Passages to index
+            k1: Term frequency saturation parameter
+            b: Length normalization parameter
+        """
+        self.passages = passages
+        self.vocabulary: dict = {}
+
+        doc_tokens = [tokenize(p.text) for p in passages]
+        n_docs = len(passages)
+        lengths = np.array([len(tokens) for tokens in doc_tokens], dtype=np.float64)
+
+        term_ids = np.fromiter(
+            (self.vocabulary.setdefault(t, len(self.vocabulary)) for tokens in doc_tokens for t in tokens),
+            dtype=np.int64,
+        )
+        doc_ids = np.repeat(np.arange(n_docs, dtype=np.int64), lengths.astype(np.int64))
+
+        # One posting per (term, doc) pair, sorted by term then doc
+        pairs, tf = np.unique(term_ids * max(n_docs, 1) + doc_ids, return_counts=True)
+        posting_terms = pairs // max(n_docs, 1)
+        self.posting_docs = pairs % max(n_docs, 1)
+
+        vocab_size = len(self.vocabulary)
+        df = np.bincount(posting_terms, minlength=vocab_size)
+        self.indptr = np.concatenate(([0], np.cumsum(df)))
+        self.idf = np.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+
+        # Precompute the length-normalized term frequency component per posting
+        avg_length = lengths.mean() if n_docs and lengths.sum() else 1.0
+        norm = k1 * (1.0 - b + b * lengths[self.posting_docs] / avg_length)
+        self.posting_weights = tf * (k1 + 1.0) / (tf + norm)
+
+    def score(self, query: str) -> np.ndarray:
+        """Return the BM25 score of every passage for the query."""
+        scores = np.zeros(len(self.passages), dtype=np.float64)
+        for term in set(tokenize(query)):
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                continue
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            # Each doc appears once per term, so fancy-index addition is safe
+            scores[self.posting_docs[start:end]] += self.idf[term_id] * self.posting_weights[start:end]
+        return scores
+
+
+def make_passages(contents: List[str], chunk_chars: int = RETRIEVAL_CHUNK_CHARS) -> List[Passage]:
+    """Split retrievable contents into passages, keeping each source's header line."""
+    passages = []
+    for source, content in enumerate(contents):
+        if not content.startswith(RETRIEVABLE_PREFIXES):
+            continue
+        header, _, body = content.partition("\n")
+        for position, text in enumerate(split_into_chunks(body, chunk_chars)):
+            passages.append(Passage(source, position, header, text))
+    return passages
+
+
+def select_passages(
+    index: BM25Index, query: str, top_k: int, token_budget: int
+) -> List[Passage]:
+    """
+    Select the best-scoring passages within the token budget.
+
+    Args:
+        index: Index to search
+        query: Query text
+        top_k: Maximum number of passages
+        token_budget: Maximum estimated tokens across selected passages
+
+    Returns:
+        List[Passage]: Selected passages in source order
+    """
+    scores = index.score(query)
+    ranked = np.argsort(-scores, kind="stable")
+
+    selected = []
+    used_tokens = 0
+    for i in ranked:
+        if len(selected) >= top_k or scores[i] <= 0:
+            break
+        passage = index.passages[i]
+        tokens = estimate_tokens(passage.text)
+        if used_tokens + tokens > token_budget:
+            continue
+        selected.append(passage)
+        used_tokens += tokens
+
+    return sorted(selected, key=lambda p: (p.source, p.position))
+
+
+def retrieve_context(
+    contents: List[str],
+    query: str,
+    top_k: int = DEFAULT_TOP_K,
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    chunk_chars: int = RETRIEVAL_CHUNK_CHARS,
+) -> List[str]:
+    """
+    Replace file and page contents with the passages most relevant to a query.
+
+    Contents that are not file or page content (stdin, errors, warnings) are
+    kept unchanged, and nothing changes if all contents fit in the budget.
+    Sources with no selected passage keep only their header.
+
+    Args:
+        contents: Input contents, each starting with its "Content from ..." header
+        query: Text the passages should be relevant to (usually the prompt)
+        top_k: Maximum number of passages
+        token_budget: Maximum estimated tokens across selected passages
+        chunk_chars: Characters per passage
+
+    Returns:
+        List[str]: Contents with retrievable sources reduced to selected excerpts
+    """
+    passages = make_passages(contents, chunk_chars)
+    original_tokens = sum(estimate_tokens(p.text) for p in passages)
+    if not query.strip() or original_tokens <= token_budget:
+        return contents
+
+    index = BM25Index(passages)
+    selected = select_passages(index, query, top_k, token_budget)
+
+    by_source: dict = {}
+    for passage in selected:
+        by_source.setdefault(passage.source, []).append(passage)
+    totals: dict = {}
+    for passage in passages:
+        totals[passage.source] = totals.get(passage.source, 0) + 1
+
+    result = []
+    for source, content in enumerate(contents):
+        if source not in totals:
+            result.append(content)
+        elif source in by_source:
+            excerpts = by_source[source]
+            header = excerpts[0].header.rstrip(":")
+            body = "\n[...]\n".join(p.text.strip("\n") for p in excerpts)
+            result.append(
+                f"{header} [{len(excerpts)} of {totals[source]} excerpts]:\n{body}"
+            )
+        else:
+            header = content.partition("\n")[0].rstrip(":")
+            result.append(f"{header} [0 of {totals[source]} excerpts]: no relevant passages")
+
+    selected_tokens = sum(estimate_tokens(p.text) for p in selected)
+    print(
+        f"Retrieval: selected {len(selected)} of {len(passages)} passages "
+        f"(~{selected_tokens:,} of ~{original_tokens:,} tokens)",
+        file=sys.stderr,
+    )
+
+    return result
+
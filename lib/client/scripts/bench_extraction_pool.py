@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Benchmark HTML extraction of many pages in-process versus in a process pool."""
+
+import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the parent directory to the path to import the client library
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from client.fetcher import create_extraction_pool
+from client.url_handler import extract_body
+
+from bench_html_extraction import build_page
+
+
+def run(pages, pool) -> float:
+    """Extract every page from fetch-like threads, optionally through the pool."""
+    def one(page: bytes) -> str:
+        if pool is None:
+            return extract_body("https://example.com/", page, "utf-8", "text/html", None).text
+        return pool.submit(extract_body, "https://example.com/", page, "utf-8", "text/html", None).result().text
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=8) as threads:
+        list(threads.map(one, pages))
+    return time.perf_counter() - start
+
+
+def main():
+    """Compare wall time for N pages of a given size (args: N SIZE_MB)."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    size_mb = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+    pages = [build_page(int(size_mb * 1024 * 1024)) for _ in range(count)]
+
+    serial = run(pages, None)
+    print(f"{count} x {size_mb}MB pages  in-process  {serial:6.2f}s")
+
+    pool = create_extraction_pool(count)
+    if pool is None:
+        print(f"Process pool skipped: {os.cpu_count()} CPU(s)")
+        return
+    try:
+        pooled = run(pages, pool)
+    finally:
+        pool.shutdown()
+    print(
+        f"{count} x {size_mb}MB pages  pool x{min(os.cpu_count(), count)}  {pooled:6.2f}s  "
+        f"(speedup {serial / pooled:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Benchmark the fenced file block parser against the previous regex parser on adversarial output."""
+
+import sys
+import os
+import re
+import time
+
+# Add the parent directory to the path to import the client library
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from client.file_writer import _is_safe_filepath, parse_llm_output
+
+# The parser replaced by FenceParser: a lazy DOTALL regex run twice
+OLD_PATTERN = r"```(\S+)\n(.*?)\n```"
+
+
+def old_parse(response: str):
+    """Previous implementation, with the same path validation."""
+    matches = re.findall(OLD_PATTERN, response, re.MULTILINE | re.DOTALL)
+    matches = [(path, content) for path, content in matches if _is_safe_filepath(path)]
+    text = re.sub(OLD_PATTERN, "", response, flags=re.MULTILINE | re.DOTALL)
+    return matches, re.sub(r"\n\s*\n\s*\n", "\n\n", text.strip())
+
+
+def inputs(scale: int):
+    """Generate named responses; scale is roughly the size in KB."""
+    line = "x = compute(value) + 1  # a line of generated code\n"
+    body = line * (scale * 20)
+    return {
+        "many small files": "".join(f"File {i}:\n```pkg/m{i}.py\n{line * 5}```\n" for i in range(scale * 3)),
+        "one large file": f"Here:\n```pkg/big.py\n{body}```\n",
+        "unterminated fences": "".join(f"```pkg/f{i}.py\n{line}" for i in range(scale * 4)),
+        "unterminated large file": f"```pkg/cut.py\n{body}",
+        "fence openers only": "```a.py\n" * (scale * 20),
+        "inline fence markers": "see ```a.py\n" * (scale * 2),
+    }
+
+
+def timed(fn, text: str) -> float:
+    start = time.perf_counter()
+    fn(text)
+    return time.perf_counter() - start
+
+
+def main():
+    """Time both parsers at growing sizes (args: sizes in KB)."""
+    scales = [int(arg) for arg in sys.argv[1:]] or [50, 200, 800]
+    for scale in scales:
+        for name, text in inputs(scale).items():
+            old = timed(old_parse, text)
+            new = timed(parse_llm_output, text)
+            print(
+                f"{len(text) / 1e6:6.2f}MB  {name:24s} regex {old * 1000:9.1f}ms  "
+                f"fence parser {new * 1000:8.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark the content-sniffing file classifier against the legacy extension/mimetypes chain.
+
+Sniffing trades speed for accuracy only on dense non-UTF-8 text. On the
+generated corpus it classifies 20/20 files against 15/20 for the legacy
+chain, at a similar median (about 10 us/file each). Its mean is higher,
+about 90-105 us/file against 10-13 us/file, and one file (cp1251
+russian.txt) accounts for nearly all of that: it reaches chardet, which
+costs over a millisecond even on a CHARDET_SAMPLE_SIZE sample.
+"""
+
+import sys
+import os
+import time
+import random
+import statistics
+import mimetypes
+import tempfile
+from pathlib import Path
+
+# Add the parent directory to the path to import the client library
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from client.file_handler import classify_file
+
+# Legacy behaviour, reproduced here so the comparison survives future changes
+LEGACY_BINARY_EXTENSIONS = {
+    '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp',
+    '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
+    '.zip', '.tar', '.gz', '.rar', '.7z',
+    '.exe', '.dll', '.so', '.dylib',
+    '.mp3', '.mp4', '.avi', '.mov', '.wav',
+    '.bin', '.dat', '.db', '.sqlite'
+}
+LEGACY_ENCODINGS = ['utf-8', 'utf-8-sig', 'latin-1', 'cp1252', 'iso-8859-1']
+LEGACY_TEXT_APP_TYPES = {
+    'application/javascript', 'application/x-sh', 'application/x-python',
+    'application/x-yaml', 'application/toml'
+}
+
+
+def legacy_classify(filepath: str):
+    """Return (is_text, encoding) using the pre-sniffing logic."""
+    path = Path(filepath)
+    if path.suffix.lower() in LEGACY_BINARY_EXTENSIONS:
+        return False, None
+    mime_type, _ = mimetypes.guess_type(filepath)
+    if mime_type and not mime_type.startswith(('text/', 'application/json', 'application/xml')):
+        if mime_type not in LEGACY_TEXT_APP_TYPES:
+            return False, None
+    with open(filepath, 'rb') as f:
+        raw_data = f.read(8192)
+    for encoding in LEGACY_ENCODINGS:
+        try:
+            raw_data.decode(encoding)
+            return True, encoding
+        except UnicodeDecodeError:
+            continue
+    return True, None
+
+
+def build_corpus(root: Path) -> list:
+    """Write a mixed corpus and return (path, expected_text) pairs; expected_text is None for binaries."""
+    rng = random.Random(16)
+
+    def noise(size: int = 16000) -> bytes:
+        return bytes(rng.randrange(256) for _ in range(size))
+
+    text_files = [
+        ("main.py", "def handler(event):\n    return {'status': 200}\n" * 400, 'utf-8'),
+        ("app.ts", "export const answer: number = 42;\n" * 400, 'utf-8'),
+        ("view.tsx", "export const App = () => <div>hello</div>;\n" * 400, 'utf-8'),
+        ("schema.proto", "message Ping { string id = 1; }\n" * 400, 'utf-8'),
+        ("Dockerfile", "FROM python:3.11\nRUN pip install requests\n" * 400, 'utf-8'),
+        ("notes.md", "# Café notes — résumé\n" * 400, 'utf-8'),
+        ("legacy.txt", "naïve façade © 2024\n" * 400, 'cp1252'),
+        ("bom.txt", "hello world\n" * 400, 'utf-8-sig'),
+        ("wide.txt", "hello wide world\n" * 400, 'utf-16'),
+        ("records.dat", "id,name\n1,alpha\n2,beta\n" * 400, 'utf-8'),
+        ("russian.txt", "Привет, мир! Это тестовый файл.\n" * 400, 'cp1251'),
+        ("data.csv", "visitor,home,visitor_score,home_score,status\n" * 400, 'utf-8'),
+        ("tmpXk3q9a", "the input data is today's games\n" * 400, 'utf-8'),
+    ]
+    binary_files = [
+        ("image.png", b"\x89PNG\r\n\x1a\n" + noise()),
+        ("archive.gz", b"\x1f\x8b\x08\x00" + noise()),
+        ("dump.txt", noise()),
+        ("blob", noise()),
+        ("program.wasm", b"\x00asm\x01\x00\x00\x00" + noise()),
+        ("module.pyc", b"\xa7\r\r\n\x00\x00\x00\x00" + noise()),
+        ("doc.pdf", b"%PDF-1.7\n" + noise()),
+    ]
+
+    entries = []
+    for name, text, encoding in text_files:
+        path = root / name
+        path.write_bytes(text.encode(encoding))
+        entries.append((str(path), text))
+    for name, data in binary_files:
+        path = root / name
+        path.write_bytes(data)
+        entries.append((str(path), None))
+    return entries
+
+
+def is_correct(filepath: str, expected_text, is_text: bool, encoding) -> bool:
+    """Check the binary verdict and that the detected encoding round-trips the text."""
+    if expected_text is None:
+        return not is_text
+    if not is_text or not encoding:
+        return False
+    with open(filepath, 'rb') as f:
+        data = f.read(8192)
+    decoded = data.decode(encoding, errors='replace').lstrip('\ufeff')
+    return expected_text.startswith(decoded[:200])
+
+
+def run(label: str, classify, entries: list, rounds: int) -> None:
+    """Time a classifier over the corpus and report accuracy."""
+    timings = []
+    results = []
+    for path, _ in entries:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            result = classify(path)
+        timings.append((time.perf_counter() - start) / rounds * 1e6)
+        results.append(result)
+
+    correct = 0
+    for (path, expected), (is_text, encoding) in zip(entries, results):
+        ok = is_correct(path, expected, is_text, encoding)
+        correct += ok
+        if not ok:
+            print(f"  {label}: misclassified {os.path.basename(path)} -> text={is_text}, encoding={encoding}")
+
+    mean_us = statistics.mean(timings)
+    median_us = statistics.median(timings)
+    print(
+        f"{label:8s} mean {mean_us:8.1f} us/file  median {median_us:6.1f} us/file  "
+        f"accuracy {correct}/{len(entries)}"
+    )
+
+
+def main():
+    """Run the benchmark on a generated corpus."""
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    with tempfile.TemporaryDirectory() as tmp:
+        entries = build_corpus(Path(tmp))
+
+        def sniff(path):
+            result = classify_file(path)
+            return result.is_text, result.encoding
+
+        run("legacy", legacy_classify, entries, rounds)
+        run("sniff", sniff, entries, rounds)
+
+
+if __name__ == "__main__":
+    main()
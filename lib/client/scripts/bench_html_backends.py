@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Benchmark the available HTML-to-text backends: throughput in MB/s and peak memory."""
+
+import sys
+import os
+import time
+import tracemalloc
+
+# Add the parent directory to the path to import the client library
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from client.html_backends import available_backends, create_extractor
+
+from bench_html_extraction import build_page, CHUNK_SIZE
+
+
+def extract(backend: str, page: bytes) -> str:
+    """Feed the whole page in response-sized chunks with no text budget."""
+    extractor = create_extractor("utf-8", max_chars=None, backend=backend)
+    for i in range(0, len(page), CHUNK_SIZE):
+        extractor.feed(page[i:i + CHUNK_SIZE])
+    return extractor.close()[0]
+
+
+def main():
+    """Run every available backend over generated pages."""
+    sizes_mb = [float(arg) for arg in sys.argv[1:]] or [1, 4]
+    backends = available_backends()
+    print(f"Backends: {', '.join(f'{b.name} ({b.description})' for b in backends.values())}")
+
+    for size_mb in sizes_mb:
+        page = build_page(int(size_mb * 1024 * 1024))
+        texts = {}
+        for name in backends:
+            # Throughput without tracing overhead, then a separate traced run for memory
+            start = time.perf_counter()
+            texts[name] = extract(name, page)
+            elapsed = time.perf_counter() - start
+
+            tracemalloc.start()
+            extract(name, page)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            print(
+                f"{len(page) / 1e6:5.1f}MB page  {name:7s} {len(page) / 1e6 / elapsed:7.1f} MB/s  "
+                f"peak {peak / 1e6:7.2f}MB"
+            )
+        status = "equivalent" if len(set(texts.values())) == 1 else "TEXT DIFFERS"
+        print(f"{len(page) / 1e6:5.1f}MB page  output {status}")
+
+
+if __name__ == "__main__":
+    main()
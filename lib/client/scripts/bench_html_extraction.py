@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Benchmark streaming HTML-to-text extraction against download-then-parse on large pages."""
+
+import sys
+import os
+import time
+import random
+import tracemalloc
+
+# Add the parent directory to the path to import the client library
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from client.html_stream import StreamingTextExtractor
+from client.url_handler import clean_html_content, MAX_TEXT_CHARS
+
+CHUNK_SIZE = 8192
+
+
+def build_page(size: int) -> bytes:
+    """Generate an HTML page of roughly size bytes with chrome, scripts and article text."""
+    rng = random.Random(16)
+    words = "the game ended with a late run in the ninth inning after a long rain delay".split()
+    parts = [
+        "<!DOCTYPE html><html><head><title>Box scores</title>",
+        "<script>" + "var x = 1;" * 2000 + "</script><style>p { margin: 0; }</style></head><body>",
+        "<header><nav>" + "<a href='/'>Home</a>" * 200 + "</nav></header><main>",
+    ]
+    length = sum(len(p) for p in parts)
+    while length < size:
+        sentence = " ".join(rng.choice(words) for _ in range(40))
+        block = f"<div class='story'><h2>Recap</h2><p>{sentence}.</p><aside>ad</aside></div>\n"
+        parts.append(block)
+        length += len(block)
+    parts.append("</main><footer>Copyright</footer></body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+def response_chunks(page: bytes):
+    """Yield the page in response-sized chunks, as iter_content does."""
+    for i in range(0, len(page), CHUNK_SIZE):
+        yield page[i:i + CHUNK_SIZE]
+
+
+def download_then_parse(page: bytes) -> str:
+    """The previous approach: concatenate the whole body, decode, parse a full tree, truncate."""
+    content_bytes = b""
+    for chunk in response_chunks(page):
+        content_bytes += chunk
+    text = clean_html_content(content_bytes.decode("utf-8", errors="replace"))
+    return text[:MAX_TEXT_CHARS]
+
+
+def streaming(page: bytes) -> str:
+    """Feed chunks to the streaming extractor and stop at the text budget."""
+    extractor = StreamingTextExtractor("utf-8", max_chars=MAX_TEXT_CHARS)
+    for chunk in response_chunks(page):
+        if extractor.feed(chunk):
+            break
+    return extractor.close()[0]
+
+
+def measure(func, page: bytes):
+    """Return (seconds, peak bytes, text) for one run."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    text = func(page)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, text
+
+
+def main():
+    """Run the benchmark on generated pages of increasing size."""
+    sizes_mb = [float(arg) for arg in sys.argv[1:]] or [1, 2, 5]
+
+    for size_mb in sizes_mb:
+        page = build_page(int(size_mb * 1024 * 1024))
+        legacy_time, legacy_peak, legacy_text = measure(download_then_parse, page)
+        stream_time, stream_peak, stream_text = measure(streaming, page)
+        status = "same text" if legacy_text == stream_text else "TEXT DIFFERS"
+        print(
+            f"{len(page) / 1e6:5.1f}MB page: "
+            f"download+parse {legacy_time * 1000:8.1f} ms, peak {legacy_peak / 1e6:7.1f}MB | "
+            f"streaming {stream_time * 1000:7.1f} ms, peak {stream_peak / 1e6:5.2f}MB | {status}"
+        )
+
+
+if __name__ == "__main__":
+    main()
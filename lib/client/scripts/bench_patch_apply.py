@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Compare output size of whole-file and edit-block responses, and time applying the edits."""
+
+import sys
+import os
+import time
+
+# Add the parent directory to the path to import the client library
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from client.chunking import estimate_tokens
+from client.patcher import Hunk, apply_hunks
+
+
+def build_file(lines: int) -> str:
+    """Generate a Python module of roughly the given number of lines."""
+    functions = []
+    for i in range(lines // 5):
+        functions.append(
+            f"def handler_{i}(request):\n"
+            f"    value = request.get('field_{i}')\n"
+            f"    result = transform(value, {i})\n"
+            f"    return respond(result)\n"
+        )
+    return "\n".join(functions)
+
+
+def timed(original: str, hunk: Hunk, repeat: int = 5) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        apply_hunks(original, [hunk])
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    """Report tokens and apply time for one-function edits (args: file sizes in lines)."""
+    sizes = [int(arg) for arg in sys.argv[1:]] or [200, 2000, 10000]
+    for size in sizes:
+        original = build_file(size)
+        target = size // 10
+        search = [f"def handler_{target}(request):", f"    value = request.get('field_{target}')"]
+        replace = [f"def handler_{target}(request):", f"    value = request.get('field_{target}', '')"]
+        edited = apply_hunks(original, [Hunk(search, replace)])
+
+        block = "\n".join(["<<<<<<< SEARCH", *search, "=======", *replace, ">>>>>>> REPLACE"])
+        full_tokens = estimate_tokens(edited)
+        edit_tokens = estimate_tokens(block)
+
+        exact = timed(original, Hunk(search, replace))
+        # A garbled search text, with the line hint a diff hunk header would give
+        garbled = [line.replace("request", "req") for line in search]
+        fuzzy = timed(original, Hunk(garbled, replace, target * 5 + 1))
+        print(
+            f"{size:6d} lines  whole file {full_tokens:7d} tokens  edit {edit_tokens:4d} tokens "
+            f"({full_tokens / edit_tokens:6.0f}x fewer)  apply exact {exact * 1000:6.2f}ms  "
+            f"fuzzy {fuzzy * 1000:7.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
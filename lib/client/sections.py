@@ -0,0 +1,224 @@
+"""Outline-then-expand generation: a short outline call, then every section written concurrently."""
+
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, NamedTuple, Tuple
+
+from .client import Client
+from .exceptions import APICallError, ClientError
+from .utils import is_error_response
+
+# Most sections an outline may have; later ones are dropped
+MAX_SECTIONS = 12
+
+# Assistant turn between the shared context and each request, so the context
+# is a message of its own and can be served from the prompt cache
+CONTEXT_ACK = "I have read the instructions and input sources."
+
+OUTLINE_PROMPT = """Before writing anything, outline the complete response to the instructions and input sources above as a set of sections that can each be written independently. Use between 3 and {max_sections} sections, in reading order.
+
+Reply with only the outline in exactly this format, and nothing else:
+
+TITLE: <title of the whole document>
+1. <section title> | <one line on what the section covers>
+2. <section title> | <one line on what the section covers>
+"""
+
+SECTION_PROMPT = """You are writing one section of the document outlined below. The other sections are being written at the same time from the same outline.
+
+Write only section {number}, "{title}", which covers: {scope}
+
+Start with the heading "## {number}. {title}" and use ### or deeper headings inside it. Do not write material that belongs to another section, and do not add an introduction or conclusion for the whole document. When you rely on another section, refer to it as "Section N" using its number in the outline.
+
+=== OUTLINE ===
+{outline}
+"""
+
+# "3. Title | scope" outline lines, also with ")" or a bold title
+_OUTLINE_LINE = re.compile(r"^\s*(\d+)[.)]\s+\**(.+?)\**\s*(?:\|\s*(.*))?$")
+
+# "Section 4", "Sections 2 and 5", "Sections 3-6"
+_SECTION_REFERENCE = re.compile(r"\bSections?\s+(\d+(?:\s*(?:,|and|&|-|–|to)\s*\d+)*)")
+
+
+class Section(NamedTuple):
+    """One independently written part of an outline."""
+
+    number: int
+    title: str
+    scope: str
+
+
+class Outline(NamedTuple):
+    """A document title and its sections in reading order."""
+
+    title: str
+    sections: List[Section]
+
+    def text(self) -> str:
+        """Render the outline as sent with each section request."""
+        lines = [f"TITLE: {self.title}"] if self.title else []
+        lines.extend(f"{section.number}. {section.title} | {section.scope}" for section in self.sections)
+        return "\n".join(lines)
+
+
+def parse_outline(response: str) -> Outline:
+    """
+    Parse an outline reply, renumbering sections in order.
+
+    Args:
+        response: Reply to OUTLINE_PROMPT
+
+    Returns:
+        Outline: Title and up to MAX_SECTIONS sections
+
+    Raises:
+        ClientError: If fewer than two sections can be read from the reply
+    """
+    title = ""
+    sections: List[Section] = []
+    for line in response.splitlines():
+        if line.strip().upper().startswith("TITLE:") and not title:
+            title = line.split(":", 1)[1].strip()
+            continue
+        match = _OUTLINE_LINE.match(line)
+        if match and len(sections) < MAX_SECTIONS:
+            section_title = match.group(2).strip()
+            sections.append(Section(len(sections) + 1, section_title, (match.group(3) or section_title).strip()))
+    if len(sections) < 2:
+        raise ClientError("The outline reply did not list at least two sections")
+    return Outline(title, sections)
+
+
+def ask_after_context(client: Client, model: str, context: str, request: str) -> str:
+    """
+    Send a request after a shared context, with a prompt cache breakpoint on the context.
+
+    Concurrent requests over the same context then read it from the prompt
+    cache once the first one has written it.
+
+    Args:
+        client: Client used for the request
+        model: Model identifier
+        context: Shared instructions and input sources
+        request: What this request asks for
+
+    Returns:
+        str: Response text
+
+    Raises:
+        APICallError: If the request fails
+    """
+    response = "".join(client.stream(model, [context, CONTEXT_ACK, request], cache=True)).strip()
+    # Providers without streaming return query() errors as text
+    if is_error_response(response):
+        raise APICallError(response)
+    return response
+
+
+def request_outline(client: Client, model: str, context: str) -> Outline:
+    """
+    Ask for an outline of the response to a context.
+
+    The request also writes the shared context to the prompt cache, so the
+    section requests that follow read it from there.
+
+    Args:
+        client: Client used for the request
+        model: Model identifier
+        context: Instructions and input sources
+
+    Returns:
+        Outline: Parsed outline
+
+    Raises:
+        APICallError: If the request fails
+        ClientError: If the reply is not a usable outline
+    """
+    return parse_outline(ask_after_context(client, model, context, OUTLINE_PROMPT.format(max_sections=MAX_SECTIONS)))
+
+
+def expand_sections(
+    client: Client, model: str, context: str, outline: Outline, max_workers: int = 4
+) -> List[str]:
+    """
+    Write all sections of an outline concurrently.
+
+    A section whose request fails is replaced by a note saying so, and a
+    warning is printed, so the rest of the document is not lost.
+
+    Args:
+        client: Client used for every request
+        model: Model identifier
+        context: Instructions and input sources, as sent for the outline
+        outline: Sections to write
+        max_workers: Maximum number of concurrent requests
+
+    Returns:
+        List[str]: Text of each section, in outline order
+
+    Raises:
+        APICallError: If every section request fails
+    """
+    outline_text = outline.text()
+
+    def write(section: Section) -> str:
+        request = SECTION_PROMPT.format(
+            number=section.number, title=section.title, scope=section.scope, outline=outline_text
+        )
+        try:
+            text = ask_after_context(client, model, context, request)
+        except APICallError as e:
+            print(f"Warning: Could not write section {section.number} ({section.title}): {e}", file=sys.stderr)
+            return ""
+        print(f"Wrote section {section.number}/{len(outline.sections)}: {section.title}", file=sys.stderr)
+        return text
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        texts = list(executor.map(write, outline.sections))
+    if not any(texts):
+        raise APICallError("Every section request failed")
+    return [
+        text or f"## {section.number}. {section.title}\n\n_This section could not be generated._"
+        for section, text in zip(outline.sections, texts)
+    ]
+
+
+def _with_heading(section: Section, text: str) -> str:
+    """Give a section text the outline's heading, replacing a heading the model wrote for it."""
+    heading = f"## {section.number}. {section.title}"
+    lines = text.strip().splitlines()
+    if lines and lines[0].lstrip().startswith("#"):
+        first = lines[0].lstrip("# ").strip()
+        # The section's own number, not "10 tips" or "1.5 Background" in section 1
+        if re.match(rf"{section.number}(?:[.):]?(?:\s|$))", first) or section.title.lower() in first.lower():
+            lines = lines[1:]
+    body = "\n".join(lines).strip()
+    return f"{heading}\n\n{body}" if body else heading
+
+
+def merge_sections(outline: Outline, texts: List[str]) -> Tuple[str, List[str]]:
+    """
+    Join section texts in outline order and check their cross-references.
+
+    Args:
+        outline: Outline the sections were written from
+        texts: Text of each section, in outline order
+
+    Returns:
+        Tuple[str, List[str]]: (document, problems such as references to sections that do not exist)
+    """
+    numbers = {section.number for section in outline.sections}
+    parts = [f"# {outline.title}"] if outline.title else []
+    problems = []
+    for section, text in zip(outline.sections, texts):
+        parts.append(_with_heading(section, text))
+        referenced = {
+            int(number)
+            for match in _SECTION_REFERENCE.finditer(text)
+            for number in re.findall(r"\d+", match.group(1))
+        }
+        for number in sorted(referenced - numbers):
+            problems.append(f"Section {section.number} refers to Section {number}, which is not in the outline")
+    return "\n\n".join(parts), problems
@@ -0,0 +1,174 @@
+"""Named multi-turn sessions over ingested material, stored on disk between runs."""
+
+import json
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from .cache import get_cache_dir
+from .client import Client
+
+# Session names become file names
+_SESSION_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$")
+
+# Separator between ingested sources within the first message
+_SOURCE_SEPARATOR = "\n\n"
+
+# Heading of the digest of summarized material and turns
+DIGEST_HEADING = "Summary of earlier material and conversation:"
+
+
+class Session:
+    """
+    A conversation over ingested files and pages, resumable by name.
+
+    The ingested material is stored once and sent as the start of the first
+    user message; each turn's question and answer follow as alternating
+    messages. The conversation prefix therefore never changes between turns,
+    which is what lets provider prompt caching serve it. Material added after
+    the first turn is sent with the next question instead of rewriting that
+    prefix.
+
+    Pinned material (the system prompt and files marked by the user) comes
+    first and is never summarized; older material and turns may be replaced
+    by a digest (see memory.RollingMemory).
+    """
+
+    def __init__(self, name: str, directory: Optional[Path] = None):
+        """
+        Open a session, loading it if it was stored before.
+
+        Args:
+            name: Session name: letters, digits, '_', '-' and '.'
+            directory: Directory of stored sessions (default: the "sessions" cache namespace)
+
+        Raises:
+            ValueError: If the name is not valid
+        """
+        if not _SESSION_NAME.match(name):
+            raise ValueError(
+                f"Invalid session name '{name}': use letters, digits, '_', '-' and '.' (max 64 characters)"
+            )
+        self.name = name
+        self.path = (directory if directory is not None else get_cache_dir("sessions")) / f"{name}.json"
+        self.pinned: List[str] = []
+        self.digest = ""
+        self.material: List[str] = []
+        self.sources: List[str] = []
+        self.turns: List[List[str]] = []  # [user message as sent, answer]
+        self.pending: List[str] = []  # Material to send with the next question
+        self.exists = False
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Could not read session '{self.name}' from {self.path}: {e}")
+        self.pinned = list(data.get("pinned", []))
+        self.digest = data.get("digest", "")
+        self.material = list(data.get("material", []))
+        self.sources = list(data.get("sources", []))
+        self.turns = [list(turn) for turn in data.get("turns", [])]
+        self.pending = list(data.get("pending", []))
+        self.exists = True
+
+    def save(self) -> None:
+        """
+        Store the session atomically.
+
+        Raises:
+            OSError: If the session file cannot be written
+        """
+        data = {
+            "pinned": self.pinned,
+            "digest": self.digest,
+            "material": self.material,
+            "sources": self.sources,
+            "turns": self.turns,
+            "pending": self.pending,
+            "updated": time.time(),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        self.exists = True
+
+    def add_material(self, contents: List[str], sources: List[str], pinned: bool = False) -> None:
+        """
+        Add ingested content: to the shared prefix before the first turn, else to the next question.
+
+        Pinned content always joins the prefix, since it must stay verbatim
+        for the whole session.
+
+        Args:
+            contents: Content strings, e.g. from reading files and scraping URLs
+            sources: File paths and URLs the contents came from
+            pinned: Never summarize this content
+        """
+        target = self.pinned if pinned else self.pending if self.turns else self.material
+        target.extend(content for content in contents if content)
+        self.sources.extend(source for source in sources if source not in self.sources)
+
+    def context(self, question: str) -> List[str]:
+        """
+        Build the alternating user/assistant context for the next turn.
+
+        Args:
+            question: Next user message, including any pending material
+
+        Returns:
+            List[str]: Context strings, first and last from the user
+        """
+        if not self.turns:
+            return [_SOURCE_SEPARATOR.join(self.prefix() + [question])]
+        context = [_SOURCE_SEPARATOR.join(self.prefix() + [self.turns[0][0]]), self.turns[0][1]]
+        for message, answer in self.turns[1:]:
+            context.extend([message, answer])
+        context.append(question)
+        return context
+
+    def prefix(self) -> List[str]:
+        """Content sent before the first kept turn: pinned material, the digest, then other material."""
+        digest = [f"{DIGEST_HEADING}\n{self.digest}"] if self.digest else []
+        return self.pinned + digest + self.material
+
+    def ask(self, client: Client, model: str, question: str) -> Iterator[str]:
+        """
+        Send a question and yield the answer as it streams, then record and save the turn.
+
+        A turn whose stream fails is not recorded, so it can be asked again.
+
+        Args:
+            client: Client for the model's provider
+            model: Model to query
+            question: Question text
+
+        Yields:
+            str: Successive pieces of the answer
+
+        Raises:
+            APICallError: If the request or the stream fails
+        """
+        message = _SOURCE_SEPARATOR.join(self.pending + [question])
+        parts = []
+        for chunk in client.stream(model, self.context(message), cache=True):
+            parts.append(chunk)
+            yield chunk
+        self.turns.append([message, "".join(parts)])
+        self.pending = []
+        self.save()
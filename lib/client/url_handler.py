@@ -1,16 +1,24 @@
 """URL content handling with robust encoding detection and error handling."""
 
+import sys
 import urllib.parse
-from typing import Optional, Set
+from concurrent.futures import Executor
+from typing import List, NamedTuple, Optional, Set, Tuple
 
 import requests
 from bs4 import BeautifulSoup
 
+from .alternates import AlternateProbes, MARKDOWN_ACCEPT, MARKDOWN_TYPES, alternate_kind, alternate_url
+from .html_backends import create_extractor
+from .html_stream import LinkCollector
+from .http_cache import HTTPCache, CacheEntry
+from .readability import MainContentExtractor
+
 # Content types we can safely process
 ALLOWED_CONTENT_TYPES = {
     'text/html', 'text/plain', 'text/xml', 'text/css', 'text/javascript',
     'application/json', 'application/xml', 'application/xhtml+xml',
-    'application/javascript', 'application/x-javascript'
+    'application/javascript', 'application/x-javascript', 'text/markdown', 'text/x-markdown'
 }
 
 # Maximum content size to process (5MB)
@@ -19,6 +27,16 @@ MAX_CONTENT_SIZE = 5 * 1024 * 1024
 # Request timeout in seconds
 REQUEST_TIMEOUT = 15
 
+# Maximum characters of extracted text kept per page
+MAX_TEXT_CHARS = 50000
+
+# With a process pool, bytes downloaded per character of text budget before a
+# worker checks whether the budget is already filled (doubled after each check)
+POOL_BYTES_PER_CHAR = 8
+
+# Accept header for ordinary page requests
+DEFAULT_ACCEPT = 'text/html,application/xhtml+xml,application/xml;q=0.9,text/plain;q=0.8,*/*;q=0.1'
+
 
 def is_valid_url(url_string: str) -> bool:
     """Check if a string is a valid URL."""
@@ -39,8 +57,15 @@ def is_processable_content_type(content_type: str) -> bool:
     return main_type in ALLOWED_CONTENT_TYPES
 
 
-def detect_response_encoding(response: requests.Response) -> str:
-    """Detect the best encoding for the response."""
+def detect_response_encoding(response: requests.Response, head: Optional[bytes] = None) -> str:
+    """
+    Detect the best encoding for the response.
+
+    Args:
+        response: Response whose headers are checked first
+        head: First bytes of the body to sniff; defaults to response.content,
+            which reads a streamed body in full
+    """
     # First, try the response's apparent encoding (from headers)
     if response.encoding and response.encoding.lower() != 'iso-8859-1':
         # requests defaults to ISO-8859-1 if no charset is specified, which is often wrong
@@ -49,7 +74,9 @@ def detect_response_encoding(response: requests.Response) -> str:
     # Try to detect from content
     try:
         import chardet
-        detected = chardet.detect(response.content[:8192])  # Check first 8KB
+        if head is None:
+            head = response.content
+        detected = chardet.detect(head[:8192])  # Check first 8KB
         if detected['encoding'] and detected['confidence'] > 0.7:
             return detected['encoding']
     except ImportError:
@@ -87,36 +114,278 @@ def clean_html_content(html_content: str) -> str:
         return f"Error parsing HTML content: {e}"
 
 
-def scrape_url_content(url: str) -> str:
+def _format_content(url: str, content_type: str, encoding: str, text: str, truncated: bool) -> str:
+    """Format extracted text with its source header."""
+    # Basic content validation
+    if not text.strip():
+        return f"Warning: No text content found at {url}"
+
+    if truncated:
+        text += "\n... [Content truncated]"
+
+    return f"Content from {url} (type: {content_type}, encoding: {encoding}):\n{text}"
+
+
+def _create_extractor(encoding: str, content_type: str, max_chars: Optional[int], extract: str):
+    """Create the text extractor for a response and extraction mode."""
+    if extract == "main" and 'html' in content_type:
+        return MainContentExtractor(encoding, max_chars)
+    return create_extractor(encoding, 'html' in content_type, max_chars)
+
+
+def _report_main_content(url: str, text: str, raw_chars: Optional[int]) -> None:
+    """Report how much of the page main-content mode kept."""
+    if raw_chars:
+        print(
+            f"Main content of {url}: {len(text):,} of {raw_chars:,} raw characters "
+            f"({len(text) / raw_chars:.1%})",
+            file=sys.stderr,
+        )
+
+
+def _close_extractor(url: str, extractor) -> Tuple[str, bool]:
+    """Finish extraction, reporting how much of the page main-content mode kept."""
+    text, truncated = extractor.close()
+    if isinstance(extractor, MainContentExtractor):
+        _report_main_content(url, text, extractor.raw_chars)
+    return text, truncated
+
+
+class ExtractedBody(NamedTuple):
+    """Text and links extracted from a downloaded body."""
+
+    text: str
+    truncated: bool
+    links: Optional[List[str]]
+    raw_chars: Optional[int]
+
+
+def extract_body(
+    url: str,
+    body: bytes,
+    encoding: str,
+    content_type: str,
+    max_chars: Optional[int],
+    extract: str = "full",
+    collect_links: bool = False,
+) -> ExtractedBody:
+    """
+    Extract text (and optionally links) from a complete body.
+
+    A module-level function so that it can run in a process pool: the raw
+    bytes go in and only the compact text comes back.
+
+    Args:
+        url: Page URL, used to resolve links
+        body: Raw response body
+        encoding: Character encoding of the body
+        content_type: Response content type
+        max_chars: Maximum characters of text to keep, or None for no limit
+        extract: Extraction mode, "full" or "main"
+        collect_links: Collect the page's absolute link targets (HTML only)
+
+    Returns:
+        ExtractedBody: Text, truncation flag, links and raw size in main mode
+
+    Raises:
+        LookupError: If the encoding is unknown
+    """
+    extractor = _create_extractor(encoding, content_type, max_chars, extract)
+    extractor.feed(body)
+    text, truncated = extractor.close()
+
+    page_links = None
+    if collect_links and 'html' in content_type:
+        collector = LinkCollector(url, encoding)
+        collector.feed_bytes(body)
+        collector.close()
+        page_links = collector.links
+
+    raw_chars = extractor.raw_chars if isinstance(extractor, MainContentExtractor) else None
+    return ExtractedBody(text, truncated, page_links, raw_chars)
+
+
+def _extract_in_pool(
+    pool: Executor,
+    url: str,
+    body: bytes,
+    encoding: str,
+    content_type: str,
+    max_chars: Optional[int],
+    extract: str,
+    collect_links: bool,
+):
+    """Extract a body in a worker process, returning ExtractedBody or an error message."""
+    try:
+        return pool.submit(
+            extract_body, url, body, encoding, content_type, max_chars, extract, collect_links
+        ).result()
+    except LookupError:
+        return f"Error decoding content from {url}: unknown encoding {encoding}"
+    except Exception as e:
+        return f"Error decoding content from {url}: {e}"
+
+
+def _content_from_cache(
+    url: str,
+    cache: HTTPCache,
+    entry: CacheEntry,
+    max_chars: Optional[int],
+    extract: str,
+    links: Optional[List[str]] = None,
+) -> Optional[str]:
+    """Produce content from a cache entry without downloading, or None if it cannot."""
+    cached = cache.cached_text(entry, max_chars, extract)
+    if cached is None:
+        # Stored text has a smaller budget or another mode; re-extract from the stored body
+        body = cache.body(entry)
+        if body is None:
+            return None
+        extractor = _create_extractor(entry.encoding, entry.content_type, max_chars, extract)
+        extractor.feed(body)
+        cached = _close_extractor(url, extractor)
+
+    if links is not None:
+        if entry.links is None:
+            body = cache.body(entry)
+            if body is None:
+                return None
+            collector = LinkCollector(url, entry.encoding)
+            collector.feed_bytes(body)
+            collector.close()
+            entry = entry._replace(links=collector.links)
+        links.extend(entry.links)
+    return _format_content(url, entry.content_type, entry.encoding, *cached)
+
+
+def scrape_url_content(
+    url: str,
+    max_chars: Optional[int] = MAX_TEXT_CHARS,
+    session: Optional[requests.Session] = None,
+    cache: Optional[HTTPCache] = None,
+    extract: str = "full",
+    links: Optional[List[str]] = None,
+    alternates: Optional[AlternateProbes] = None,
+    pool: Optional[Executor] = None,
+) -> str:
     """
     Scrape content from a single URL with robust encoding handling.
     
+    With a cache, a fresh stored page is used without contacting the server,
+    and a stale one is revalidated with If-None-Match / If-Modified-Since so
+    that a 304 response skips both the download and the HTML parse.
+
+    With alternates, a compact representation is preferred over HTML: the
+    site's /llms.txt for a site root, the page's markdown twin otherwise
+    (e.g. /guide/setup.md), and text/markdown through the Accept header.
+    Hosts recorded as offering no twin or llms.txt are not probed again;
+    timeouts, connection errors and server errors are not recorded.
+
     Args:
         url: URL to scrape
+        max_chars: Maximum characters of text to keep, or None for no limit
+        session: Session whose connection pool is reused, or None for a one-off request
+        cache: HTTP cache to consult and update, or None to always download
+        extract: "full" for all visible text, "main" for the main content block
+            with tables kept as rows
+        links: List to append the page's absolute link targets to (HTML only),
+            or None to skip link collection; alternates are not used when set,
+            since they carry no HTML links
+        alternates: Per-host probe record enabling alternate representations,
+            or None to fetch the URL as-is
+        pool: Process pool to extract text in, or None to extract in-process;
+            with a pool the body is parsed off this thread, so many pages are
+            parsed in parallel, and downloading stops once a worker finds the
+            text budget filled by the part already read
         
     Returns:
         str: Scraped content or error message
     """
     if not is_valid_url(url):
         return f"Error: Invalid URL format: {url}"
-    
+
+    accept = DEFAULT_ACCEPT
+    if alternates is not None and links is None:
+        alternate = alternate_url(url)
+        kind = alternate_kind(url)
+        if alternate is not None and alternates.should_probe(url, kind):
+            content = _fetch_content(
+                alternate, max_chars, session, cache, "full", None, MARKDOWN_ACCEPT, pool, MARKDOWN_TYPES
+            )
+            if content.startswith("Content from "):
+                alternates.record(url, kind, True)
+                print(f"Using compact alternate {alternate} for {url}", file=sys.stderr)
+                return content
+            if _alternate_missing(content):
+                alternates.record(url, kind, False)
+        accept = MARKDOWN_ACCEPT
+
+    return _fetch_content(url, max_chars, session, cache, extract, links, accept, pool)
+
+
+def _alternate_missing(content: str) -> bool:
+    """Whether a probe's result shows the alternate does not exist: 404, 410 or not markdown."""
+    return content.startswith(("Error: HTTP 404 ", "Error: HTTP 410 ", "Skipped non-text content"))
+
+
+def _fetch_content(
+    url: str,
+    max_chars: Optional[int],
+    session: Optional[requests.Session],
+    cache: Optional[HTTPCache],
+    extract: str,
+    links: Optional[List[str]],
+    accept: str,
+    pool: Optional[Executor] = None,
+    allowed_types: Optional[Set[str]] = None,
+) -> str:
+    """Download or reuse a URL's content; allowed_types narrows the accepted content types."""
     try:
         headers = {
             'User-Agent': 'Mozilla/5.0 (compatible; tech16-cli/1.0)',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,text/plain;q=0.8,*/*;q=0.1',
+            'Accept': accept,
             'Accept-Language': 'en-US,en;q=0.9',
             'Accept-Encoding': 'gzip, deflate',
             'DNT': '1',
             'Connection': 'keep-alive',
         }
+
+        entry = cache.lookup(url) if cache is not None else None
+        if links is not None and entry is not None and entry.links is None and not entry.complete:
+            # Links were not collected and cannot be recovered from a partial body
+            entry = None
+        if entry is not None and cache.can_serve(entry, max_chars, extract):
+            if cache.is_fresh(entry):
+                content = _content_from_cache(url, cache, entry, max_chars, extract, links)
+                if content is not None:
+                    return content
+            headers.update(cache.conditional_headers(entry))
+        else:
+            entry = None
         
         # Make request with timeout
-        response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT, stream=True)
+        http = session if session is not None else requests
+        response = http.get(url, headers=headers, timeout=REQUEST_TIMEOUT, stream=True)
+
+        if response.status_code == 304 and entry is not None:
+            response.close()
+            entry = cache.refresh(entry, response.headers)
+            content = _content_from_cache(url, cache, entry, max_chars, extract, links)
+            if content is not None:
+                return content
+            # The stored body was evicted meanwhile; download it again
+            for name in cache.conditional_headers(entry):
+                headers.pop(name, None)
+            response = http.get(url, headers=headers, timeout=REQUEST_TIMEOUT, stream=True)
+
         response.raise_for_status()
         
         # Check content type before downloading
         content_type = response.headers.get('content-type', '').lower()
-        if not is_processable_content_type(content_type):
+        main_type = content_type.split(';')[0].strip()
+        if not is_processable_content_type(content_type) or (
+            allowed_types is not None and main_type not in allowed_types
+        ):
             return f"Skipped non-text content (type: {content_type}): {url}"
         
         # Check content length
@@ -125,43 +394,100 @@ def scrape_url_content(url: str) -> str:
             size_mb = int(content_length) / (1024 * 1024)
             return f"Error: Content too large ({size_mb:.1f}MB, max {MAX_CONTENT_SIZE // (1024*1024)}MB): {url}"
         
-        # Download content with size limit
-        content_bytes = b''
+        # Stream the body through the extractor, stopping once enough text is kept;
+        # with a pool, hand what was read to a worker process at growing sizes,
+        # stopping once it has filled the budget, or else the whole body
+        encoding = None
+        extractor = None
+        collector = None
         downloaded = 0
-        
-        for chunk in response.iter_content(chunk_size=8192):
-            if chunk:
+        body_chunks = []
+        complete = True
+        extracted = None
+        check_at = max_chars * POOL_BYTES_PER_CHAR if pool is not None and max_chars else None
+
+        def read_to_end() -> bool:
+            # Stopped early unless this was already the last chunk; with a
+            # content encoding the length is of the compressed body, so unknown
+            return (
+                bool(content_length)
+                and not response.headers.get('content-encoding')
+                and downloaded >= int(content_length)
+            )
+
+        try:
+            for chunk in response.iter_content(chunk_size=8192):
+                if not chunk:
+                    continue
                 downloaded += len(chunk)
                 if downloaded > MAX_CONTENT_SIZE:
                     return f"Error: Content exceeded size limit during download: {url}"
-                content_bytes += chunk
-        
-        # Detect and decode with proper encoding
-        if 'html' in content_type:
-            # For HTML, use requests' text property but with our encoding detection
-            try:
-                encoding = detect_response_encoding(response)
-                text_content = content_bytes.decode(encoding, errors='replace')
-                cleaned_content = clean_html_content(text_content)
-            except Exception as e:
-                return f"Error decoding HTML content from {url}: {e}"
+                if cache is not None or pool is not None:
+                    body_chunks.append(chunk)
+                if encoding is None:
+                    encoding = detect_response_encoding(response, chunk)
+                    if pool is None:
+                        try:
+                            extractor = _create_extractor(encoding, content_type, max_chars, extract)
+                        except LookupError:
+                            return f"Error decoding content from {url}: unknown encoding {encoding}"
+                        if links is not None and 'html' in content_type:
+                            collector = LinkCollector(url, encoding)
+                if pool is not None:
+                    if check_at is not None and downloaded >= check_at:
+                        extracted = _extract_in_pool(
+                            pool, url, b"".join(body_chunks), encoding, content_type,
+                            max_chars, extract, links is not None,
+                        )
+                        if isinstance(extracted, str):
+                            return extracted
+                        if extracted.truncated:
+                            complete = read_to_end()
+                            break
+                        extracted = None
+                        check_at = downloaded * 2
+                    continue
+                if collector is not None:
+                    collector.feed_bytes(chunk)
+                if extractor.feed(chunk):
+                    complete = read_to_end()
+                    break
+        finally:
+            response.close()
+
+        if encoding is None:
+            return f"Warning: No text content found at {url}"
+
+        page_links = None
+        if pool is not None:
+            if extracted is None:
+                extracted = _extract_in_pool(
+                    pool, url, b"".join(body_chunks), encoding, content_type,
+                    max_chars, extract, links is not None,
+                )
+                if isinstance(extracted, str):
+                    return extracted
+            cleaned_content, truncated, page_links = extracted.text, extracted.truncated, extracted.links
+            _report_main_content(url, cleaned_content, extracted.raw_chars)
         else:
-            # For plain text and other formats
             try:
-                encoding = detect_response_encoding(response)
-                cleaned_content = content_bytes.decode(encoding, errors='replace')
+                cleaned_content, truncated = _close_extractor(url, extractor)
             except Exception as e:
                 return f"Error decoding content from {url}: {e}"
-        
-        # Basic content validation
-        if not cleaned_content.strip():
-            return f"Warning: No text content found at {url}"
-        
-        # Truncate very long content
-        if len(cleaned_content) > 50000:  # 50KB of text
-            cleaned_content = cleaned_content[:50000] + "\n... [Content truncated]"
-        
-        return f"Content from {url} (type: {content_type}, encoding: {encoding}):\n{cleaned_content}"
+            if collector is not None:
+                collector.close()
+                page_links = collector.links
+
+        if page_links is not None:
+            links.extend(page_links)
+
+        if cache is not None:
+            cache.store(
+                url, response.headers, content_type, encoding, cleaned_content,
+                truncated, max_chars, b"".join(body_chunks), complete, extract, page_links,
+            )
+
+        return _format_content(url, content_type, encoding, cleaned_content, truncated)
         
     except requests.exceptions.Timeout:
         return f"Error: Request timeout ({REQUEST_TIMEOUT}s) for URL: {url}"
@@ -3,6 +3,7 @@
 import sys
 import time
 import functools
+import multiprocessing
 from typing import List, Callable, Any
 from .exceptions import InvalidContextError, APICallError
 
@@ -122,3 +123,32 @@ def format_error_message(error: Exception, provider: str, model: str) -> str:
     error_msg = str(error)
 
     return f"Error querying {provider} model '{model}': {error_type} - {error_msg}"
+
+
+def is_error_response(response: str) -> bool:
+    """
+    Check whether a query result is an error message rather than a model response.
+
+    Args:
+        response: Text returned by Client.query
+
+    Returns:
+        bool: True if the text was produced by format_error_message
+    """
+    return response.startswith("Error querying ")
+
+
+def worker_process_context() -> multiprocessing.context.BaseContext:
+    """
+    Return the multiprocessing context for worker process pools.
+
+    Pools are created while other threads may be running (Pipeline stages,
+    fetch threads, a client importing its SDK), so workers come from a fork
+    server, or are spawned where there is none, rather than being forked
+    from this process while another thread holds a lock.
+
+    Returns:
+        multiprocessing.context.BaseContext: Context to pass as mp_context
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
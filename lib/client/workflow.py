@@ -0,0 +1,402 @@
+"""Multi-step generation workflows: steps run concurrently once their inputs exist, cached by input hash."""
+
+import hashlib
+import json
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set
+
+from .cache import DiskCache, content_hash
+from .exceptions import WorkflowError
+from .file_writer import FileSpec, WriteReport, write_changed_files
+from .pipeline import Pipeline
+from .url_handler import is_valid_url
+
+# Tools a step can run, and the CLI script each names
+WORKFLOW_TOOLS = ("coder", "cli")
+
+# Steps run at the same time
+DEFAULT_JOBS = 4
+
+# Seconds a step with URL inputs reuses its cached outputs before running again
+DEFAULT_URL_TTL = 3600
+
+# Lines of a failed step's output shown
+_ERROR_TAIL_LINES = 20
+
+_STEP_KEYS = {"tool", "model", "prompt", "inputs", "outputs", "after", "args", "stdout", "url_ttl"}
+
+
+class Step(NamedTuple):
+    """One tool run of a workflow: a prompt and inputs that produce output files."""
+
+    name: str
+    tool: str  # One of WORKFLOW_TOOLS
+    model: str
+    prompt: str  # Prompt file
+    inputs: List[str]  # Files and URLs
+    outputs: List[str]  # Files the step writes
+    after: List[str]  # Steps to wait for beyond those producing its inputs
+    args: List[str]  # Extra tool options
+    stdout: Optional[str]  # File receiving a cli step's answer
+    url_ttl: Optional[float] = None  # Seconds URL inputs are trusted, or None for the runner's default
+
+
+class StepResult(NamedTuple):
+    """How a step ended."""
+
+    name: str
+    status: str  # "ran", "restored", "up to date", "failed" or "skipped"
+    detail: str = ""
+
+
+class Workflow:
+    """
+    Steps and the dependencies between them.
+
+    A step depends on every step that outputs one of its inputs or its
+    prompt, and on the steps it lists in "after". Paths are relative to the
+    workflow file's directory.
+
+    Workflow files are JSON:
+
+        {
+          "model": "o4-mini",
+          "steps": {
+            "csv": {"prompt": "csv.md", "inputs": ["https://mlb.com/schedule"], "outputs": ["mlb/mlb.csv"]},
+            "web": {"model": "claude-sonnet-4-20250514", "prompt": "web.md", "inputs": ["mlb/mlb.csv"],
+                    "outputs": ["mlb/index.html", "mlb/index.js"]},
+            "notes": {"tool": "cli", "prompt": "notes.md", "inputs": ["mlb/index.js"], "stdout": "NOTES.md"}
+          }
+        }
+
+    "tool" defaults to "coder" and "model" to the top-level model. "args"
+    holds extra options for the tool, e.g. ["--edit"]. "url_ttl" sets how
+    many seconds a step with URL inputs may reuse its outputs (0 to always
+    run it).
+    """
+
+    def __init__(self, steps: List[Step], directory: Path):
+        """
+        Initialize the workflow and work out its dependencies.
+
+        Args:
+            steps: Steps in file order
+            directory: Directory that step paths are relative to
+
+        Raises:
+            WorkflowError: If outputs collide, "after" names an unknown step, or the steps form a cycle
+        """
+        self.steps = {step.name: step for step in steps}
+        self.directory = directory
+        producers: Dict[str, str] = {}
+        for step in steps:
+            for output in step.outputs:
+                if output in producers:
+                    raise WorkflowError(f"Steps '{producers[output]}' and '{step.name}' both output {output}")
+                producers[output] = step.name
+
+        self.dependencies: Dict[str, Set[str]] = {}
+        for step in steps:
+            unknown = [name for name in step.after if name not in self.steps]
+            if unknown:
+                raise WorkflowError(f"Step '{step.name}' runs after unknown step(s): {', '.join(unknown)}")
+            needs = {producers[path] for path in [step.prompt] + step.inputs if path in producers}
+            self.dependencies[step.name] = (needs | set(step.after)) - {step.name}
+        self.order()
+
+    def order(self) -> List[str]:
+        """
+        Return the step names so that every step comes after those it depends on.
+
+        Raises:
+            WorkflowError: If the steps form a cycle
+        """
+        ordered: List[str] = []
+        done: Set[str] = set()
+        while len(ordered) < len(self.steps):
+            ready = [name for name in self.steps if name not in done and self.dependencies[name] <= done]
+            if not ready:
+                cycle = sorted(name for name in self.steps if name not in done)
+                raise WorkflowError(f"Steps depend on each other in a cycle: {', '.join(cycle)}")
+            ordered.extend(ready)
+            done.update(ready)
+        return ordered
+
+    def dependents(self, name: str) -> Set[str]:
+        """Return every step that depends on a step, directly or through others."""
+        found: Set[str] = set()
+        frontier = {name}
+        while frontier:
+            frontier = {step for step, needs in self.dependencies.items() if needs & frontier} - found
+            found |= frontier
+        return found
+
+
+def _string_list(data: dict, key: str, name: str) -> List[str]:
+    value = data.get(key, [])
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise WorkflowError(f"Step '{name}': '{key}' must be a list of strings")
+    return value
+
+
+def load_workflow(path: str) -> Workflow:
+    """
+    Read a workflow file.
+
+    Args:
+        path: Path of the JSON workflow file
+
+    Returns:
+        Workflow: Parsed and checked workflow
+
+    Raises:
+        WorkflowError: If the file cannot be read or does not describe a valid workflow
+    """
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except OSError as e:
+        raise WorkflowError(f"Could not read workflow {path}: {e}")
+    except ValueError as e:
+        raise WorkflowError(f"Workflow {path} is not valid JSON: {e}")
+    if not isinstance(data, dict) or not isinstance(data.get("steps"), dict) or not data["steps"]:
+        raise WorkflowError(f"Workflow {path} must have a non-empty 'steps' object")
+
+    default_model = data.get("model")
+    steps = []
+    for name, spec in data["steps"].items():
+        if not isinstance(spec, dict):
+            raise WorkflowError(f"Step '{name}' must be an object")
+        unknown = set(spec) - _STEP_KEYS
+        if unknown:
+            raise WorkflowError(f"Step '{name}' has unknown key(s): {', '.join(sorted(unknown))}")
+        tool = spec.get("tool", "coder")
+        if tool not in WORKFLOW_TOOLS:
+            raise WorkflowError(f"Step '{name}': tool must be one of {', '.join(WORKFLOW_TOOLS)}")
+        model = spec.get("model", default_model)
+        if not model:
+            raise WorkflowError(f"Step '{name}' has no model and the workflow sets no default")
+        if not spec.get("prompt"):
+            raise WorkflowError(f"Step '{name}' has no prompt file")
+        stdout = spec.get("stdout")
+        if tool == "cli" and not stdout:
+            raise WorkflowError(f"Step '{name}': cli steps need a 'stdout' file for the answer")
+        outputs = _string_list(spec, "outputs", name) + ([stdout] if stdout else [])
+        if not outputs:
+            raise WorkflowError(f"Step '{name}' declares no outputs")
+        url_ttl = spec.get("url_ttl")
+        if url_ttl is not None and (isinstance(url_ttl, bool) or not isinstance(url_ttl, (int, float)) or url_ttl < 0):
+            raise WorkflowError(f"Step '{name}': 'url_ttl' must be a number of seconds, 0 or more")
+        steps.append(
+            Step(
+                name,
+                tool,
+                model,
+                spec["prompt"],
+                _string_list(spec, "inputs", name),
+                outputs,
+                _string_list(spec, "after", name),
+                _string_list(spec, "args", name),
+                stdout,
+                url_ttl,
+            )
+        )
+    return Workflow(steps, Path(path).resolve().parent)
+
+
+class WorkflowRunner:
+    """
+    Runs a workflow's steps as their dependencies finish, skipping steps whose inputs have not changed.
+
+    A step's cache key hashes its tool, model, options, prompt file and the
+    current content of its input files, so a change anywhere upstream
+    reruns exactly the steps downstream of it. After a step runs, the
+    content of its outputs is cached under that key. When the key is found
+    again, the step is not run: its outputs are left as they are, restored
+    if missing, and kept if edited by hand. Step paths are relative to the
+    current directory; tech16-run changes to the workflow file's directory
+    first.
+
+    URL inputs are keyed by address, since only the tool fetches them, so
+    a step with URL inputs reuses its outputs only for its URL TTL after it
+    last ran and then runs again. Steps downstream of it still run only if
+    its outputs changed.
+    """
+
+    def __init__(
+        self,
+        workflow: Workflow,
+        tools: Dict[str, str],
+        jobs: int = DEFAULT_JOBS,
+        force: bool = False,
+        cache: Optional[DiskCache] = None,
+        url_ttl: float = DEFAULT_URL_TTL,
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            workflow: Workflow to run
+            tools: Script path for each tool name
+            jobs: Steps run at the same time
+            force: Run every step even if its cached outputs are current
+            cache: Cache of step outputs, or None to always run
+            url_ttl: Seconds a step with URL inputs reuses its outputs, unless
+                the step sets its own "url_ttl"
+        """
+        self.workflow = workflow
+        self.tools = tools
+        self.jobs = max(1, jobs)
+        self.force = force
+        self.cache = cache
+        self.url_ttl = url_ttl
+        self.pipeline = Pipeline(max_workers=self.jobs)
+        self._write_lock = threading.Lock()
+
+    def step_key(self, step: Step) -> str:
+        """
+        Hash everything a step's outputs depend on.
+
+        Raises:
+            WorkflowError: If the prompt or an input file does not exist
+        """
+        parts = [step.tool, step.model, json.dumps(step.args), json.dumps(step.outputs)]
+        for path in [step.prompt] + step.inputs:
+            if is_valid_url(path):
+                parts.append(path)
+                continue
+            try:
+                parts.append(hashlib.sha256(Path(path).read_bytes()).hexdigest())
+            except OSError as e:
+                raise WorkflowError(f"Cannot read input {path}: {e.strerror or e}")
+        return content_hash(*parts)
+
+    def _urls_expired(self, step: Step, ran_at: float) -> bool:
+        """Whether a step has URL inputs fetched longer ago than its URL TTL."""
+        if not any(is_valid_url(path) for path in step.inputs):
+            return False
+        ttl = step.url_ttl if step.url_ttl is not None else self.url_ttl
+        return time.time() - ran_at >= ttl
+
+    def command(self, step: Step) -> List[str]:
+        """Build the command line running a step's tool."""
+        command = [sys.executable, self.tools[step.tool], "--model", step.model]
+        if step.tool == "cli":
+            return command + ["--prompt", step.prompt] + step.args + step.inputs
+        # The coder reads the prompt as its last input
+        return command + step.args + step.inputs + [step.prompt]
+
+    def _write(self, outputs: Dict[str, str]) -> WriteReport:
+        # Writes share the manifest of generated files, so they take turns
+        with self._write_lock:
+            return write_changed_files([FileSpec(path, content) for path, content in outputs.items()])
+
+    def _restore(self, step: Step, outputs: Dict[str, str]) -> StepResult:
+        report = self._write(outputs)
+        kept = f"kept hand edits in {', '.join(report.preserved)}" if report.preserved else ""
+        if report.created or report.modified:
+            return StepResult(step.name, "restored", "; ".join(filter(None, [", ".join(report.written), kept])))
+        return StepResult(step.name, "up to date", kept)
+
+    def run_step(self, step: Step) -> StepResult:
+        """
+        Run one step, or restore it from the cache if its inputs are unchanged.
+
+        Returns:
+            StepResult: How the step ended; failures are results, not exceptions
+        """
+        try:
+            key = self.step_key(step)
+        except WorkflowError as e:
+            return StepResult(step.name, "failed", str(e))
+        if self.cache is not None and not self.force:
+            cached = self.cache.get(key)
+            if cached is not None:
+                entry = json.loads(cached)
+                if not self._urls_expired(step, entry["time"]):
+                    return self._restore(step, entry["outputs"])
+
+        print(f"Running {step.name} ({step.tool}, {step.model})...", file=sys.stderr)
+        started = time.time()
+        try:
+            completed = subprocess.run(
+                self.command(step), stdin=subprocess.DEVNULL, capture_output=True, text=True
+            )
+        except OSError as e:
+            return StepResult(step.name, "failed", f"Could not start {step.tool}: {e}")
+        if completed.returncode != 0:
+            tail = (completed.stderr or completed.stdout).strip().splitlines()[-_ERROR_TAIL_LINES:]
+            return StepResult(step.name, "failed", "\n".join(tail) or f"exit status {completed.returncode}")
+
+        try:
+            if step.stdout:
+                self._write({step.stdout: completed.stdout})
+            outputs = {path: Path(path).read_text(encoding="utf-8") for path in step.outputs}
+        except FileNotFoundError as e:
+            return StepResult(step.name, "failed", f"Did not write declared output {e.filename}")
+        except (OSError, UnicodeDecodeError) as e:
+            return StepResult(step.name, "failed", f"Cannot read outputs: {e}")
+        if self.cache is not None:
+            self.cache.set(key, json.dumps({"time": started, "outputs": outputs}))
+        return StepResult(step.name, "ran")
+
+    def run(self) -> List[StepResult]:
+        """
+        Run all steps, each as soon as the steps it depends on have succeeded.
+
+        Independent steps run concurrently, up to jobs at a time. When a step
+        fails, the steps depending on it are skipped and the rest continue.
+
+        Returns:
+            List[StepResult]: One result per step, in the order they ended
+        """
+        workflow = self.workflow
+        results: List[StepResult] = []
+        succeeded: Set[str] = set()
+        finished: Set[str] = set()
+        running: Dict[Future, str] = {}
+
+        try:
+            while True:
+                for name in workflow.order():
+                    if name in finished or name in running.values():
+                        continue
+                    if workflow.dependencies[name] <= succeeded:
+                        running[self.pipeline.submit(name, self.run_step, workflow.steps[name])] = name
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    del running[future]
+                    results.append(result)
+                    finished.add(result.name)
+                    _print_result(result)
+                    if result.status == "failed":
+                        for name in workflow.order():
+                            if name in workflow.dependents(result.name) and name not in finished:
+                                finished.add(name)
+                                skipped = StepResult(name, "skipped", f"'{result.name}' failed")
+                                results.append(skipped)
+                                _print_result(skipped)
+                    else:
+                        succeeded.add(result.name)
+        finally:
+            self.pipeline.close()
+        return results
+
+
+def _print_result(result: StepResult) -> None:
+    """Print how a step ended to stderr."""
+    if result.status == "failed":
+        print(f"Error: Step {result.name} failed:", file=sys.stderr)
+        for line in result.detail.splitlines():
+            print(f"    {line}", file=sys.stderr)
+        return
+    detail = f" ({result.detail})" if result.detail else ""
+    print(f"Step {result.name}: {result.status}{detail}", file=sys.stderr)
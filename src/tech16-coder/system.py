@@ -35,3 +35,27 @@ that the user prompt specifies
 
 Do not output any explanations, descriptions or other non-code text. output the code files only.
 """
+
+# Appended to the system prompt when the coder runs with --edit
+EDIT_PROMPT = """
+## Editing Existing Files
+
+The input files are the current contents of the project. To change an existing file, do not
+repeat the whole file. Output only the edits, as one or more SEARCH/REPLACE blocks inside a
+fence labelled with the file's path:
+
+```directory/filename.ext
+<<<<<<< SEARCH
+[lines exactly as they currently appear in the file]
+=======
+[the lines to put in their place]
+>>>>>>> REPLACE
+```
+
+- The SEARCH lines must match the current file exactly, including indentation and comments
+- Keep each SEARCH short: the lines being changed plus just enough surrounding lines to be unique
+- Use several blocks for changes in different parts of a file, in the order they appear in the file
+- To delete lines, leave the REPLACE section empty
+- To create a new file, output the whole file in a fence as usual
+- A unified diff in a ```diff fence is also accepted
+"""
@@ -0,0 +1,5 @@
+"""tech16-run - Workflow runner for multi-step generation with the tech16 tools."""
+
+__version__ = "1.0.0"
+__author__ = "tech16"
+__description__ = "Runs dependent tech16-coder and tech16-cli steps concurrently with caching"
@@ -2,12 +2,67 @@
 
 import sys
 import os
+import threading
 import pytest
 from unittest.mock import Mock, patch
 
 # Add the lib directory to the Python path to import our client library
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "lib"))
 from client.exceptions import APIKeyMissingError, APICallError
+from lib.client.client import Client
+
+# Seconds a FakeClient call waits for the other calls it expects to overlap with
+OVERLAP_TIMEOUT = 2
+
+
+class FakeClient(Client):
+    """
+    Client stand-in answering through a function and recording what it is sent.
+
+    respond(context) returns the answer text, or raises; for stream() it may
+    also return an iterable of chunks. Every call is recorded in contexts as
+    (context, cache), with cache False for query(). With together=N, each
+    call waits until N calls have been in progress at once (or
+    OVERLAP_TIMEOUT passes), so peak shows whether requests really ran
+    concurrently without the test depending on sleeps or timing.
+    """
+
+    def __init__(self, respond, together=1):
+        self.respond = respond
+        self.together = together
+        self.contexts = []
+        self.active = 0
+        self.peak = 0
+        self._condition = threading.Condition()
+
+    def _answer(self, context, cache):
+        with self._condition:
+            self.contexts.append((list(context), cache))
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self._condition.notify_all()
+            self._condition.wait_for(lambda: self.peak >= self.together, timeout=OVERLAP_TIMEOUT)
+        try:
+            return self.respond(context)
+        finally:
+            with self._condition:
+                self.active -= 1
+
+    def query(self, model, context):
+        return self._answer(context, False)
+
+    def stream(self, model, context, cache=False):
+        response = self._answer(context, cache)
+        if isinstance(response, str):
+            yield response
+        else:
+            yield from response
+
+
+@pytest.fixture
+def fake_client():
+    """Factory for FakeClient stand-ins: fake_client(respond, together=1)."""
+    return FakeClient
 
 
 @pytest.fixture
@@ -0,0 +1,109 @@
+"""Tests for alternate representations in URL scraping."""
+
+from unittest.mock import Mock
+
+import requests
+
+from lib.client.alternates import AlternateProbes, MARKDOWN_TWIN, TWIN_MISSES, alternate_url
+from lib.client.url_handler import scrape_url_content
+
+
+class TypedSession:
+    """Session stand-in serving (content type, body) pairs and recording requests."""
+
+    def __init__(self, pages, missing_status=404):
+        self.pages = pages
+        self.missing_status = missing_status
+        self.requests = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append((url, (headers or {}).get("Accept", "")))
+        response = Mock()
+        content_type, body = self.pages.get(url, ("text/html", None))
+        response.status_code = 200 if body is not None else self.missing_status
+        response.headers = {"content-type": content_type}
+        response.encoding = "utf-8"
+        response.iter_content = lambda chunk_size: iter([(body or "").encode("utf-8")])
+        if body is None:
+            response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=response)
+        return response
+
+
+HTML = "<html><body><nav>Menu</nav><h1>Setup</h1><p>Install it.</p></body></html>"
+
+
+class TestAlternateUrl:
+    """Test cases for alternate URL mapping."""
+
+    def test_mapping(self):
+        """Test llms.txt for site roots and markdown twins for pages."""
+        assert alternate_url("https://docs.example.com") == "https://docs.example.com/llms.txt"
+        assert alternate_url("https://docs.example.com/guide/") == "https://docs.example.com/guide/index.md"
+        assert alternate_url("https://docs.example.com/guide/setup.html") == "https://docs.example.com/guide/setup.md"
+        assert alternate_url("https://docs.example.com/v1.2/setup") == "https://docs.example.com/v1.2/setup.md"
+        assert alternate_url("https://docs.example.com/README.md") is None
+
+
+class TestScrapeAlternates:
+    """Test cases for scrape_url_content with alternates."""
+
+    def test_markdown_twin_preferred(self, tmp_path):
+        """Test that a page's markdown twin is used instead of its HTML."""
+        session = TypedSession({
+            "https://docs.example.com/setup": ("text/html", HTML),
+            "https://docs.example.com/setup.md": ("text/markdown", "# Setup\n\nInstall it."),
+        })
+        result = scrape_url_content(
+            "https://docs.example.com/setup", session=session, alternates=AlternateProbes(tmp_path)
+        )
+        assert result.startswith("Content from https://docs.example.com/setup.md (type: text/markdown")
+        assert result.endswith("# Setup\n\nInstall it.")
+        assert len(session.requests) == 1
+
+    def test_host_without_alternates_not_reprobed(self, tmp_path):
+        """Test that after TWIN_MISSES missing twins the host is recorded and not probed again."""
+        probes = AlternateProbes(tmp_path)
+        pages = [f"https://docs.example.com/p{i}" for i in range(TWIN_MISSES + 1)]
+        session = TypedSession({page: ("text/html", HTML) for page in pages})
+        results = [scrape_url_content(page, session=session, alternates=probes) for page in pages]
+        assert all("Install it." in result for result in results)
+        assert [url for url, _ in session.requests] == [
+            url for page in pages[:-1] for url in (f"{page}.md", page)
+        ] + [pages[-1]]
+        assert probes.known("https://docs.example.com/x", MARKDOWN_TWIN) is False
+
+    def test_transient_failures_not_recorded(self, tmp_path):
+        """Test that a twin failing with a server error does not count against the host."""
+        probes = AlternateProbes(tmp_path)
+        session = TypedSession({"https://docs.example.com/a": ("text/html", HTML)}, missing_status=503)
+        for _ in range(TWIN_MISSES):
+            scrape_url_content("https://docs.example.com/a", session=session, alternates=probes)
+        assert probes.known("https://docs.example.com/a", MARKDOWN_TWIN) is None
+
+    def test_html_twin_rejected(self, tmp_path):
+        """Test that a twin URL answering with HTML (a soft 404) is not used."""
+        session = TypedSession({
+            "https://docs.example.com/setup": ("text/html", HTML),
+            "https://docs.example.com/setup.md": ("text/html", "<html><body>Not found</body></html>"),
+        })
+        result = scrape_url_content(
+            "https://docs.example.com/setup", session=session, alternates=AlternateProbes(tmp_path)
+        )
+        assert result.startswith("Content from https://docs.example.com/setup (type: text/html")
+
+    def test_negotiated_markdown(self, tmp_path):
+        """Test that markdown is requested through Accept and kept as-is."""
+        probes = AlternateProbes(tmp_path)
+        for _ in range(TWIN_MISSES):
+            probes.record("https://docs.example.com/", MARKDOWN_TWIN, False)
+        session = TypedSession({"https://docs.example.com/setup": ("text/markdown", "# Setup")})
+        result = scrape_url_content("https://docs.example.com/setup", session=session, alternates=probes)
+        assert result.endswith("# Setup")
+        assert session.requests[0][1].startswith("text/markdown")
+
+    def test_disabled_by_default(self):
+        """Test that no alternates are probed without a probe record."""
+        session = TypedSession({"https://docs.example.com/": ("text/html", HTML)})
+        scrape_url_content("https://docs.example.com/", session=session)
+        assert session.requests == [("https://docs.example.com/", session.requests[0][1])]
+        assert session.requests[0][1].startswith("text/html")
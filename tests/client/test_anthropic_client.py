@@ -112,4 +112,41 @@ class TestAnthropicClient:
         
         assert messages[-1]["role"] == "user"
         # The third message is treated as user (index 2), so no continuation needed
-        assert messages[-1]["content"] == "another assistant message"
\ No newline at end of file
+        assert messages[-1]["content"] == "another assistant message"
+
+    @patch('anthropic.Anthropic')
+    def test_format_messages_cache_breakpoints(self, mock_anthropic_class, mock_env_vars):
+        """Test that caching marks the first and last messages as cache breakpoints."""
+        mock_anthropic_class.return_value = Mock()
+        client = AnthropicClient()
+
+        messages = client._format_messages(["material and Q1", "A1", "Q2"], cache=True)
+
+        assert messages[0]["content"][0]["cache_control"] == {"type": "ephemeral"}
+        assert messages[0]["content"][0]["text"] == "material and Q1"
+        assert messages[1]["content"] == "A1"
+        assert messages[2]["content"][0]["cache_control"] == {"type": "ephemeral"}
+
+    @patch('anthropic.Anthropic')
+    def test_stream_yields_text(self, mock_anthropic_class, mock_env_vars, sample_context):
+        """Test that stream yields the text chunks as they arrive."""
+        mock_client = Mock()
+        stream = Mock()
+        stream.text_stream = iter(["Par", "is."])
+        mock_client.messages.stream.return_value.__enter__ = Mock(return_value=stream)
+        mock_client.messages.stream.return_value.__exit__ = Mock(return_value=False)
+        mock_anthropic_class.return_value = mock_client
+        client = AnthropicClient()
+
+        assert list(client.stream("claude-sonnet-4-20250514", sample_context)) == ["Par", "is."]
+
+    @patch('anthropic.Anthropic')
+    def test_stream_error_raises(self, mock_anthropic_class, mock_env_vars, sample_context):
+        """Test that a failing stream raises APICallError."""
+        mock_client = Mock()
+        mock_client.messages.stream.side_effect = Exception("API Error")
+        mock_anthropic_class.return_value = mock_client
+        client = AnthropicClient()
+
+        with pytest.raises(APICallError, match="API Error"):
+            list(client.stream("claude-sonnet-4-20250514", sample_context))
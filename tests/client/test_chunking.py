@@ -0,0 +1,45 @@
+"""Tests for the chunking module."""
+
+import pytest
+from lib.client.chunking import split_into_chunks, estimate_tokens
+
+
+class TestChunking:
+    """Test cases for chunking module."""
+
+    def test_small_text_is_one_chunk(self):
+        """Test that text under the limit is returned whole."""
+        assert split_into_chunks("hello world", 100) == ["hello world"]
+
+    def test_empty_text(self):
+        """Test that empty text yields no chunks."""
+        assert split_into_chunks("", 100) == []
+
+    def test_invalid_size(self):
+        """Test that a non-positive chunk size is rejected."""
+        with pytest.raises(ValueError):
+            split_into_chunks("text", 0)
+
+    def test_prefers_paragraph_boundaries(self):
+        """Test that chunks end at blank lines when possible."""
+        text = "para one line\n\npara two line\n\npara three line\n\n"
+        chunks = split_into_chunks(text, 32)
+        assert chunks == ["para one line\n\npara two line\n\n", "para three line\n\n"]
+
+    def test_round_trip_and_limit(self):
+        """Test that chunks respect the limit and rejoin to the original text."""
+        text = "".join(f"line {i}. Some more words here.\n" for i in range(500))
+        chunks = split_into_chunks(text, 256)
+        assert "".join(chunks) == text
+        assert all(len(chunk) <= 256 for chunk in chunks)
+
+    def test_hard_cut_without_boundaries(self):
+        """Test text with no boundaries is cut at the limit."""
+        chunks = split_into_chunks("x" * 250, 100)
+        assert [len(c) for c in chunks] == [100, 100, 50]
+
+    def test_estimate_tokens(self):
+        """Test the token estimate."""
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("abcd") == 1
+        assert estimate_tokens("abcde") == 2
@@ -0,0 +1,149 @@
+"""Tests for the compaction module."""
+
+import threading
+
+from lib.client import compaction
+from lib.client.compaction import compact_contents, compact_python, compact_source, files_named_in
+
+
+PYTHON_SOURCE = '''"""Order helpers.
+
+Longer description that is dropped.
+"""
+
+import json
+from typing import List
+
+MAX_ITEMS = 50
+
+
+class Order:
+    """An order.
+
+    More detail.
+    """
+
+    status: str = "open"
+
+    def total(self, items: List[float]) -> float:
+        """Return the order total."""
+        subtotal = sum(items)
+        return subtotal * 1.2
+
+
+def load(path: str) -> Order:
+    with open(path) as f:
+        return Order(**json.load(f))
+'''
+
+JS_SOURCE = """import { api } from './api.js';
+
+/** Fetch the games for a date. */
+async function fetchGames(date) {
+    const response = await api.get(date);
+    if (response.ok) { return response.json(); }
+    return [];
+}
+
+class Board {
+    render(games) {
+        for (const game of games) {
+            draw(game);
+        }
+    }
+}
+"""
+
+
+def file_content(path, body):
+    """Build a file content item as read_file_content does."""
+    return f"Content from file {path} (encoding: utf-8):\n{body}"
+
+
+class TestCompactSource:
+    """Test cases for per-language skeletons."""
+
+    def test_python_skeleton(self):
+        """Test that bodies are stubbed and interfaces kept."""
+        skeleton = compact_python(PYTHON_SOURCE)
+        assert "import json" in skeleton
+        assert "MAX_ITEMS = 50" in skeleton
+        assert "def total(self, items: List[float]) -> float:" in skeleton
+        assert "Return the order total." in skeleton
+        assert "status: str = 'open'" in skeleton
+        assert "subtotal" not in skeleton
+        assert "More detail" not in skeleton
+        assert "def load(path: str) -> Order:\n    ..." in skeleton
+
+    def test_invalid_python_is_not_compacted(self):
+        """Test that unparsable sources are left to be sent in full."""
+        assert compact_source("broken.py", "def f(:\n") is None
+
+    def test_javascript_skeleton(self):
+        """Test that functions and methods are kept without their bodies."""
+        skeleton = compact_source("board.js", JS_SOURCE)
+        assert skeleton.splitlines() == [
+            "import { api } from './api.js';",
+            "/** Fetch the games for a date. */",
+            "async function fetchGames(date) { ... }",
+            "class Board { ... }",
+            "    render(games) { ... }",
+        ]
+
+    def test_unsupported_language(self):
+        """Test that unknown file types are not compacted."""
+        assert compact_source("notes.txt", "hello") is None
+
+
+class TestCompactContents:
+    """Test cases for compacting a list of inputs."""
+
+    def test_supporting_files_are_compacted(self, tmp_path, monkeypatch):
+        """Test that only supporting source files are reduced."""
+        monkeypatch.setenv("TECH16_CACHE_DIR", str(tmp_path))
+        contents = [
+            file_content("spec.md", "Add a discount to total()."),
+            file_content("orders.py", PYTHON_SOURCE),
+            file_content("src/board.js", JS_SOURCE),
+        ]
+        result = compact_contents(contents, targets=["./src/board.js"])
+        assert result[0] == contents[0]
+        assert result[1].startswith(
+            "Content from file orders.py (encoding: utf-8) [compacted to signatures]:\n"
+        )
+        assert "subtotal" not in result[1]
+        assert result[2] == contents[2]
+
+    def test_files_named_in_prompt_are_kept(self, tmp_path, monkeypatch):
+        """Test that a file mentioned by the prompt is sent in full."""
+        monkeypatch.setenv("TECH16_CACHE_DIR", str(tmp_path))
+        contents = [
+            file_content("spec.md", "Change orders.py to apply discounts."),
+            file_content("orders.py", PYTHON_SOURCE),
+        ]
+        assert compact_contents(contents) == contents
+
+    def test_files_named_as_whole_names(self):
+        """Test that a file name only counts when it is not part of a longer name."""
+        paths = ["src/a.py", "data.py", "lib/orders.py"]
+        assert files_named_in(["Update data.py and a.pyc"], paths) == {"data.py"}
+        assert files_named_in(["Fix (a.py), then lib/orders.py."], paths) == {"src/a.py", "lib/orders.py"}
+
+    def test_pool_from_a_thread_matches_in_process(self, monkeypatch):
+        """Test that compacting in worker processes, started from a non-main thread, matches in-process results."""
+        contents = [file_content(f"orders{i}.py", PYTHON_SOURCE) for i in range(compaction.MIN_FILES_FOR_POOL)]
+        pooled = []
+        thread = threading.Thread(target=lambda: pooled.extend(compact_contents(contents, max_workers=2, use_cache=False)))
+        thread.start()
+        thread.join(60)
+        monkeypatch.setattr(compaction, "MIN_FILES_FOR_POOL", len(contents) + 1)
+        assert pooled == compact_contents(contents, use_cache=False)
+        assert "[compacted to signatures]" in pooled[0]
+
+    def test_cached_skeleton_is_reused(self, tmp_path, monkeypatch):
+        """Test that a second run gives the same result from the cache."""
+        monkeypatch.setenv("TECH16_CACHE_DIR", str(tmp_path))
+        contents = [file_content("orders.py", PYTHON_SOURCE)]
+        first = compact_contents(contents)
+        assert any((tmp_path / "compaction").rglob("*"))
+        assert compact_contents(contents) == first
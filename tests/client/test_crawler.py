@@ -0,0 +1,161 @@
+"""Tests for the crawler module."""
+
+import threading
+from unittest.mock import Mock
+
+import requests
+
+from lib.client.crawler import Crawler, canonicalize_url, crawl_urls
+
+
+class SiteSession:
+    """Session stand-in serving a fixed set of pages and recording requests."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+        self.lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        with self.lock:
+            self.requested.append(url)
+        response = Mock()
+        body = self.pages.get(url)
+        response.status_code = 200 if body is not None else 404
+        content_type = "application/xml" if url.endswith(".xml") else "text/html"
+        response.headers = {"content-type": content_type if not url.endswith(".txt") else "text/plain"}
+        response.encoding = "utf-8"
+        response.text = body or ""
+        response.content = (body or "").encode("utf-8")
+        response.iter_content = lambda chunk_size: iter([response.content])
+        if body is None:
+            error = requests.exceptions.HTTPError(response=response)
+            response.raise_for_status.side_effect = error
+        return response
+
+
+def page(title, *links):
+    anchors = "".join(f'<a href="{link}"> link </a>' for link in links)
+    return f"<html><body><h1>{title}</h1>{anchors}</body></html>"
+
+
+SITE = {
+    "https://docs.example.com/": page("Home", "/a", "/b#intro", "https://other.example.org/x"),
+    "https://docs.example.com/a": page("A", "/a/deep", "/logo.png", "/?utm_source=nav"),
+    "https://docs.example.com/b": page("B", "/a"),
+    "https://docs.example.com/a/deep": page("Deep", "/a/deeper"),
+    "https://docs.example.com/a/deeper": page("Deeper"),
+    "https://other.example.org/x": page("Other"),
+}
+
+
+class TestCanonicalize:
+    """Test cases for URL canonicalization."""
+
+    def test_equivalent_forms(self):
+        """Test that case, default ports, fragments and tracking parameters are normalized."""
+        assert canonicalize_url("HTTPS://Docs.Example.com:443#top") == "https://docs.example.com/"
+        assert canonicalize_url("http://example.com:8080/p?utm_medium=x&q=1") == "http://example.com:8080/p?q=1"
+        assert canonicalize_url("mailto:someone@example.com") is None
+
+
+class TestCrawler:
+    """Test cases for bounded crawling."""
+
+    def crawl(self, pages, seeds, **options):
+        session = SiteSession(pages)
+        options.setdefault("use_sitemap", False)
+        results = crawl_urls(seeds, session=session, **options)
+        return results, session
+
+    def test_depth_limit_and_dedup(self):
+        """Test breadth-first order, depth limit and that each page is fetched once."""
+        results, session = self.crawl(SITE, ["https://docs.example.com/"], max_depth=1, same_host=True)
+        titles = [r.split("\n")[-1].split()[0] for r in results]
+        assert titles == ["Home", "A", "B"]
+        assert session.requested.count("https://docs.example.com/a") == 1
+        assert "https://docs.example.com/logo.png" not in session.requested
+
+    def test_same_host(self):
+        """Test that links to other hosts are only followed without --same-host."""
+        results, _ = self.crawl(SITE, ["https://docs.example.com/"], max_depth=1)
+        assert any("Other" in r for r in results)
+        results, _ = self.crawl(SITE, ["https://docs.example.com/"], max_depth=1, same_host=True)
+        assert not any("Other" in r for r in results)
+
+    def test_max_pages(self):
+        """Test that the crawl stops at the page limit."""
+        results, _ = self.crawl(SITE, ["https://docs.example.com/"], max_depth=3, max_pages=4, same_host=True)
+        assert len(results) == 4
+
+    def test_token_budget(self):
+        """Test that no new pages are scheduled once the token budget is used."""
+        results, _ = self.crawl(
+            SITE, ["https://docs.example.com/"], max_depth=3, same_host=True, token_budget=1, max_connections=1
+        )
+        assert len(results) == 1
+
+    def test_robots_disallow(self):
+        """Test that robots.txt rules are honoured for discovered pages."""
+        pages = dict(SITE)
+        pages["https://docs.example.com/robots.txt"] = "User-agent: *\nDisallow: /a\n"
+        results, session = self.crawl(pages, ["https://docs.example.com/"], max_depth=2, same_host=True)
+        assert [r.split("\n")[-1].split()[0] for r in results] == ["Home", "B"]
+        assert "https://docs.example.com/a" not in session.requested
+
+    def test_slow_robots_does_not_stall_other_hosts(self):
+        """Test that a slow robots.txt for one host does not hold up fetching pages on another."""
+        pages = {
+            "https://docs.example.com/": page("Home", "https://slow.example.org/x", "/a", "/b"),
+            "https://docs.example.com/a": page("A"),
+            "https://docs.example.com/b": page("B"),
+            "https://slow.example.org/x": page("Slow"),
+        }
+        session = SiteSession(pages)
+        get = session.get
+        robots_started = threading.Event()
+        release = threading.Event()
+        stalled = []
+
+        def slow_robots(url, **kwargs):
+            if url == "https://slow.example.org/robots.txt":
+                robots_started.set()
+                if not release.wait(2):
+                    stalled.append(url)
+            elif url == "https://docs.example.com/b":
+                assert robots_started.wait(5)
+                release.set()
+            return get(url, **kwargs)
+
+        session.get = slow_robots
+        results = crawl_urls(["https://docs.example.com/"], session=session, max_depth=1, use_sitemap=False)
+        assert len(results) == 4 and not stalled
+        assert session.requested.count("https://slow.example.org/robots.txt") == 1
+
+    def test_sitemap_seeding(self):
+        """Test that sitemap entries under the seed's directory are crawled."""
+        pages = {
+            "https://docs.example.com/guide/": page("Guide"),
+            "https://docs.example.com/guide/install": page("Install"),
+            "https://docs.example.com/blog/post": page("Post"),
+            "https://docs.example.com/sitemap.xml": (
+                '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                "<url><loc>https://docs.example.com/guide/install</loc></url>"
+                "<url><loc>https://docs.example.com/blog/post</loc></url></urlset>"
+            ),
+        }
+        results, _ = self.crawl(pages, ["https://docs.example.com/guide/"], max_depth=1, use_sitemap=True)
+        assert len(results) == 2 and "Install" in results[1]
+
+    def test_seed_errors_reported(self):
+        """Test that a failing seed is reported while failing discovered pages are skipped."""
+        pages = {"https://docs.example.com/": page("Home", "/missing")}
+        results, _ = self.crawl(pages, ["https://docs.example.com/", "https://docs.example.com/gone"], max_depth=1)
+        assert len(results) == 2
+        assert results[1].startswith("Error: HTTP 404")
+
+    def test_pages_yields_crawled_pages(self):
+        """Test the page records yielded by the generator."""
+        crawler = Crawler(max_depth=0, session=SiteSession(SITE), use_sitemap=False)
+        pages = list(crawler.pages(["https://docs.example.com"]))
+        assert [(p.depth, p.url) for p in pages] == [(0, "https://docs.example.com/")]
@@ -0,0 +1,59 @@
+"""Tests for the dedup module."""
+
+from lib.client.dedup import deduplicate_contents, minhash_signature, MIN_BLOCK_CHARS
+
+
+def page(label, body):
+    """Build a content item with a header line."""
+    return f"Content from {label} (type: text/html, encoding: utf-8):\n{body}"
+
+
+ARTICLE = " ".join(f"sentence {i} about the installation guide and its options." for i in range(300))
+
+
+class TestDedup:
+    """Test cases for duplicate removal."""
+
+    def test_exact_duplicate_source(self):
+        """Test that a second identical source is replaced by a reference."""
+        contents = [page("https://a/docs", ARTICLE), page("https://b/docs", ARTICLE + "  \n")]
+        result, report = deduplicate_contents(contents)
+        assert result[0] == contents[0]
+        assert "same content as Content from https://a/docs" in result[1]
+        assert report.exact_sources == 1
+        assert report.bytes_saved > 0 and report.tokens_saved > 0
+
+    def test_near_duplicate_source(self):
+        """Test that a lightly edited copy is detected with MinHash."""
+        edited = ARTICLE.replace("sentence 7 ", "line 7 ")
+        contents = [page("https://a", ARTICLE), page("https://b", edited)]
+        result, report = deduplicate_contents(contents)
+        assert report.near_sources == 1
+        assert "near-duplicate" in result[1]
+
+    def test_different_sources_are_kept(self):
+        """Test that unrelated sources are untouched."""
+        other = " ".join(f"recipe step {i}: stir the sauce slowly." for i in range(300))
+        contents = [page("https://a", ARTICLE), page("https://b", other)]
+        result, report = deduplicate_contents(contents)
+        assert result == contents
+        assert report.bytes_saved == 0
+
+    def test_repeated_blocks(self):
+        """Test that repeated blocks are replaced after their first occurrence."""
+        block = "ERROR connection reset by peer " * (MIN_BLOCK_CHARS // 20)
+        log = "\n\n".join([block, "INFO retrying", block, block])
+        result, report = deduplicate_contents([page("app.log", log)])
+        assert report.repeated_blocks == 2
+        assert result[0].count(block) == 1
+        assert "[repeated block omitted, same as in Content from app.log" in result[0]
+
+    def test_non_content_items_untouched(self):
+        """Test that stdin and error items are never deduplicated."""
+        contents = ["Input from stdin:\nhi", "Input from stdin:\nhi"]
+        assert deduplicate_contents(contents)[0] == contents
+
+    def test_minhash_similarity(self):
+        """Test that identical text gives identical signatures."""
+        assert (minhash_signature(ARTICLE) == minhash_signature(ARTICLE)).all()
+        assert minhash_signature("   ") is None
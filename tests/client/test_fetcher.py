@@ -0,0 +1,144 @@
+"""Tests for the fetcher module."""
+
+import threading
+import time
+from unittest.mock import Mock
+
+from lib.client import fetcher
+from lib.client.fetcher import create_extraction_pool, fetch_urls
+from lib.client.url_handler import extract_body
+
+
+class SlowSession:
+    """Session stand-in whose requests take a fixed time and record concurrency."""
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.active = {}
+        self.peak = {}
+        self.lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        host = url.split("/")[2]
+        with self.lock:
+            self.active[host] = self.active.get(host, 0) + 1
+            self.peak[host] = max(self.peak.get(host, 0), self.active[host])
+        time.sleep(self.delays.get(url, 0.2))
+        with self.lock:
+            self.active[host] -= 1
+
+        response = Mock()
+        response.headers = {"content-type": "text/plain"}
+        response.encoding = "utf-8"
+        response.iter_content = lambda chunk_size: iter([f"body of {url}".encode("utf-8")])
+        return response
+
+
+class TestFetchUrls:
+    """Test cases for concurrent fetching."""
+
+    def test_concurrent_and_in_order(self):
+        """Test that URLs are fetched in parallel and results keep input order."""
+        urls = [f"https://host{i}.example.com/page" for i in range(8)]
+        session = SlowSession({})
+        start = time.monotonic()
+        results = fetch_urls(urls, max_connections=8, session=session)
+        elapsed = time.monotonic() - start
+
+        assert elapsed < 0.2 * 4
+        for url, result in zip(urls, results):
+            assert result.endswith(f"body of {url}")
+
+    def test_per_host_limit(self):
+        """Test that requests to one host never exceed the per-host limit."""
+        urls = [f"https://docs.example.com/page{i}" for i in range(6)]
+        session = SlowSession({})
+        fetch_urls(urls, max_connections=6, per_host=2, session=session)
+        assert session.peak["docs.example.com"] == 2
+
+    def test_deadline(self):
+        """Test that URLs still pending at the deadline are reported as errors."""
+        slow = "https://slow.example.com/"
+        urls = ["https://fast.example.com/", slow]
+        session = SlowSession({slow: 1.0, urls[0]: 0.0})
+        results = fetch_urls(urls, deadline=0.3, session=session)
+        assert results[0].startswith("Content from https://fast.example.com/")
+        assert results[1] == f"Error: Deadline of 0.3s exceeded before fetching URL: {slow}"
+
+    def test_empty(self):
+        """Test that no URLs means no work."""
+        assert fetch_urls([]) == []
+
+
+class HTMLSession:
+    """Session stand-in serving the same HTML page for every URL."""
+
+    def get(self, url, **kwargs):
+        response = Mock()
+        response.headers = {"content-type": "text/html"}
+        response.encoding = "utf-8"
+        html = f"<html><body><script>x()</script><p>Page {url}</p><a href='/next'>next</a></body></html>"
+        response.iter_content = lambda chunk_size: iter([html.encode("utf-8")])
+        return response
+
+
+class TestExtractionPool:
+    """Test cases for HTML extraction in worker processes."""
+
+    def test_single_page_stays_in_process(self):
+        """Test that no pool is started for one page or one worker."""
+        assert create_extraction_pool(1, workers=4) is None
+        assert create_extraction_pool(5, workers=1) is None
+
+    def test_workers_started_lazily_and_not_forked(self, monkeypatch):
+        """Test that workers start on the first page, not by fork, and a slow start falls back to in-process."""
+        pool = create_extraction_pool(2, workers=2)
+        assert pool._pool is None
+        try:
+            assert pool.submit(len, "abc").result() == 3
+            assert pool._pool._mp_context.get_start_method() in ("forkserver", "spawn")
+        finally:
+            pool.shutdown()
+        monkeypatch.setattr(fetcher, "WARM_UP_TIMEOUT", 0)
+        pool = create_extraction_pool(2, workers=2)
+        assert pool.submit(len, "abc").result() == 3
+        assert pool._pool is None
+
+    def test_pool_matches_in_process(self):
+        """Test that pooled extraction gives the same contents as in-process extraction."""
+        urls = [f"https://host{i}.example.com/" for i in range(4)]
+        pooled = fetch_urls(urls, session=HTMLSession(), extract_workers=2)
+        in_process = fetch_urls(urls, session=HTMLSession(), extract_workers=1)
+        assert pooled == in_process
+        assert pooled[0].endswith("Page https://host0.example.com/next")
+
+    def test_pooled_download_stops_at_budget(self):
+        """Test that pooled extraction stops downloading once the text budget is filled."""
+        read = []
+
+        class LongSession:
+            def get(self, url, **kwargs):
+                response = Mock()
+                response.headers = {"content-type": "text/html"}
+                response.encoding = "utf-8"
+
+                def chunks(chunk_size):
+                    for i in range(200):
+                        read.append(url)
+                        yield f"<p>{'x' * 8000}</p>".encode("utf-8")
+
+                response.iter_content = chunks
+                return response
+
+        urls = ["https://a.example.com/", "https://b.example.com/"]
+        results = fetch_urls(urls, max_chars=10000, session=LongSession(), extract_workers=2)
+        assert all(result.endswith("... [Content truncated]") for result in results)
+        assert read.count(urls[0]) < 20
+
+    def test_extract_body_links(self):
+        """Test that extract_body returns text and resolved links."""
+        body = b"<p>Hello</p><a href='/a#x'>a</a>"
+        result = extract_body("https://example.com/p", body, "utf-8", "text/html", None, collect_links=True)
+        assert result.text == "Helloa"
+        assert result.links == ["https://example.com/a"]
+        assert not result.truncated
@@ -0,0 +1,106 @@
+"""Tests for the file_handler module."""
+
+import codecs
+import pytest
+from lib.client.file_handler import (
+    classify_bytes, classify_file, is_binary_file, detect_file_encoding,
+    read_file_content, FileClassification, SNIFF_BLOCK_SIZE
+)
+
+
+class TestClassifyBytes:
+    """Test cases for content sniffing."""
+
+    def test_empty_is_text(self):
+        """Test that empty content is treated as text."""
+        result = classify_bytes(b"")
+        assert result.is_text
+        assert result.encoding == "utf-8"
+
+    def test_ascii_fast_path(self):
+        """Test pure ASCII content."""
+        result = classify_bytes(b"export const answer: number = 42;\n")
+        assert result == FileClassification(True, "utf-8", 1.0, "ascii")
+
+    def test_utf8(self):
+        """Test strict UTF-8 validation."""
+        result = classify_bytes("Café — résumé\n".encode("utf-8"))
+        assert result.is_text
+        assert result.encoding == "utf-8"
+        assert result.reason == "utf-8"
+
+    def test_utf8_sequence_cut_at_block_end(self):
+        """Test that a multi-byte sequence split by the block boundary is still UTF-8."""
+        data = "é".encode("utf-8") * 10
+        result = classify_bytes(data[:-1], truncated=True)
+        assert result.encoding == "utf-8"
+
+    @pytest.mark.parametrize("bom,encoding", [
+        (codecs.BOM_UTF8, "utf-8-sig"),
+        (codecs.BOM_UTF16_LE, "utf-16"),
+        (codecs.BOM_UTF32_LE, "utf-32"),
+    ])
+    def test_bom_detection(self, bom, encoding):
+        """Test byte order mark detection."""
+        result = classify_bytes(bom + b"h\x00i\x00")
+        assert result.is_text
+        assert result.encoding == encoding
+        assert result.reason == "bom"
+
+    def test_nul_bytes_are_binary(self):
+        """Test that NUL bytes mark content as binary."""
+        result = classify_bytes(b"\x00asm\x01\x00\x00\x00")
+        assert not result.is_text
+        assert result.encoding is None
+
+    def test_signature_is_binary(self):
+        """Test known binary signatures without NUL bytes."""
+        assert not classify_bytes(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n").is_text
+
+    def test_control_chars_are_binary(self):
+        """Test that a high ratio of control characters marks content as binary."""
+        assert classify_bytes(b"\x01\x02\x03\x04abc").reason == "control-chars"
+
+    def test_cp1252_text(self):
+        """Test legacy Western text that is not valid UTF-8."""
+        result = classify_bytes("naïve façade © 2024\n".encode("cp1252"))
+        assert result.is_text
+        assert result.encoding == "cp1252"
+
+
+class TestFileFunctions:
+    """Test cases for file-level helpers."""
+
+    @pytest.mark.parametrize("name", ["app.ts", "view.tsx", "schema.proto", "Dockerfile", "records.dat"])
+    def test_text_files_without_known_extension(self, tmp_path, name):
+        """Test that text files are detected by content, not extension."""
+        path = tmp_path / name
+        path.write_text("message Ping { string id = 1; }\n")
+        assert not is_binary_file(str(path))
+        assert detect_file_encoding(str(path)) == "utf-8"
+
+    def test_binary_with_text_extension(self, tmp_path):
+        """Test that a binary file with a text extension is skipped."""
+        path = tmp_path / "dump.txt"
+        path.write_bytes(b"\x89PNG\r\n\x1a\n\x00\x00")
+        assert is_binary_file(str(path))
+        assert read_file_content(str(path)).startswith("Skipped binary file")
+
+    def test_classify_missing_file(self, tmp_path):
+        """Test classification of an unreadable path."""
+        result = classify_file(str(tmp_path / "missing"))
+        assert not result.is_text
+        assert result.confidence == 0.0
+
+    def test_read_file_content_strips_bom(self, tmp_path):
+        """Test reading a UTF-8 file with a BOM."""
+        path = tmp_path / "bom.txt"
+        path.write_bytes(codecs.BOM_UTF8 + b"hello\r\nworld\n")
+        content = read_file_content(str(path))
+        assert content == f"Content from file {path} (encoding: utf-8-sig):\nhello\nworld\n"
+
+    def test_read_file_content_large_text(self, tmp_path):
+        """Test that content beyond the sniffed block is read in full."""
+        path = tmp_path / "big.md"
+        path.write_text("a" * SNIFF_BLOCK_SIZE + "é", encoding="utf-8")
+        assert read_file_content(str(path)).endswith("é")
@@ -0,0 +1,75 @@
+"""Tests for the file_plan module."""
+
+import re
+
+import pytest
+
+from lib.client.exceptions import APICallError, ClientError
+from lib.client.file_plan import PlannedFile, generate_files, parse_file_plan, request_file_plan
+from lib.client.file_writer import FileSpec
+
+MANIFEST_REPLY = """FILE: mlb/index.html
+PURPOSE: Page shell
+INTERFACE: Loads index.css and index.js; has <div id="games">
+FILE: ./mlb/index.js
+PURPOSE: Fetches and renders games
+INTERFACE: renderGames(rows) fills #games with .card elements
+  fetchCsv() polls http://localhost:8001/mlb.csv every 30s
+FILE: mlb/index.html
+PURPOSE: Duplicate entry
+"""
+
+
+def write_files(fail=None, extra=False):
+    """Responder returning the manifest, then one block per file request."""
+
+    def respond(context):
+        if context[-1].startswith("Before writing any code"):
+            return MANIFEST_REPLY
+        path = re.search(r"Output only the file (\S+),", context[-1]).group(1)
+        if path == fail:
+            raise APICallError("Error querying o4-mini: timeout")
+        return f"```{path}\n// {path}\n```\n" + ("```mlb/index.css\nbody {}\n```\n" if extra else "")
+
+    return respond
+
+
+class TestParseFilePlan:
+    """Test cases for reading file manifests."""
+
+    def test_parse(self):
+        """Test that paths are normalized, interfaces may span lines and duplicates are dropped."""
+        files = parse_file_plan(MANIFEST_REPLY)
+        assert [planned.path for planned in files] == ["mlb/index.html", "mlb/index.js"]
+        assert files[0].purpose == "Page shell"
+        assert files[1].interface.splitlines() == [
+            "renderGames(rows) fills #games with .card elements",
+            "  fetchCsv() polls http://localhost:8001/mlb.csv every 30s",
+        ]
+        with pytest.raises(ClientError):
+            parse_file_plan("Sure, here is the code you asked for.")
+
+
+class TestGenerateFiles:
+    """Test cases for generating planned files concurrently."""
+
+    def test_concurrent_with_shared_manifest(self, fake_client):
+        """Test that files are requested at once, each with the whole manifest, keeping only its own block."""
+        files = request_file_plan(fake_client(write_files()), "o4-mini", "CONTEXT")
+        client = fake_client(write_files(extra=True), together=2)
+        file_specs, responses = generate_files(client, "o4-mini", "CONTEXT", files)
+        assert client.peak == 2
+        assert file_specs == [
+            FileSpec("mlb/index.html", "// mlb/index.html"),
+            FileSpec("mlb/index.js", "// mlb/index.js"),
+        ]
+        assert len(responses) == 2
+        assert all("renderGames(rows)" in context[-1] for context, _ in client.contexts)
+
+    def test_failures(self, fake_client):
+        """Test that a failed file is left out, and that losing every file raises."""
+        files = [PlannedFile("a.py", "", ""), PlannedFile("b.py", "", "")]
+        file_specs, _ = generate_files(fake_client(write_files(fail="a.py")), "o4-mini", "CONTEXT", files)
+        assert [file_spec.filepath for file_spec in file_specs] == ["b.py"]
+        with pytest.raises(APICallError):
+            generate_files(fake_client(write_files(fail="a.py")), "o4-mini", "CONTEXT", files[:1])
@@ -0,0 +1,293 @@
+"""Tests for the file_writer module."""
+
+import hashlib
+import json
+import os
+import threading
+
+import pytest
+
+from lib.client.client import Client
+from lib.client.exceptions import APICallError
+from lib.client.file_writer import (
+    MANIFEST_NAME,
+    FenceParser,
+    FileSpec,
+    iter_file_specs,
+    parse_llm_output,
+    new_write_report,
+    write_changed_files,
+    write_generated_files,
+    write_streamed_files,
+)
+
+
+class TestParseLLMOutput:
+    """Test cases for parse_llm_output."""
+
+    def test_files_and_text(self):
+        """Test that file blocks are extracted and the rest kept as text."""
+        response = "Intro:\n\n```src/a.py\nprint(1)\n```\n\nAnd:\n\n```src/b.py\nx = 2\n\ny = 3\n```\nDone."
+        specs, text = parse_llm_output(response)
+        assert specs == [FileSpec("src/a.py", "print(1)"), FileSpec("src/b.py", "x = 2\n\ny = 3")]
+        assert text == "Intro:\n\nAnd:\n\nDone."
+
+    def test_tilde_and_long_fences(self):
+        """Test ~~~ fences and a four-backtick fence containing a three-backtick one."""
+        response = "~~~notes.txt\nhello\n~~~\n````README.md\n# Title\n```\ncode\n```\n````\n"
+        specs, _ = parse_llm_output(response)
+        assert specs == [FileSpec("notes.txt", "hello"), FileSpec("README.md", "# Title\n```\ncode\n```")]
+
+    def test_nested_fences(self):
+        """Test that fenced examples inside a file block do not close it."""
+        response = "```docs/guide.md\nRun:\n```bash\nmake\n```\nThen done.\n```\nAfter."
+        specs, text = parse_llm_output(response)
+        assert specs == [FileSpec("docs/guide.md", "Run:\n```bash\nmake\n```\nThen done.")]
+        assert text == "After."
+
+    def test_non_file_blocks_and_unterminated(self):
+        """Test that unlabeled blocks stay in the text, as does an unterminated file block."""
+        response = "See:\n```\nplain\n```\n```python run this\nx\n```\n```a.py\nnever closed\n"
+        specs, text = parse_llm_output(response)
+        assert specs == []
+        assert text == response.strip()
+
+    def test_unsafe_paths_skipped(self):
+        """Test that unsafe paths are dropped from both files and text."""
+        specs, text = parse_llm_output("```../evil.py\nx\n```\nok")
+        assert specs == []
+        assert text == "ok"
+
+
+class TestFenceParser:
+    """Test cases for incremental parsing."""
+
+    def test_streamed_chunks(self):
+        """Test that each block is yielded as soon as its closing fence arrives."""
+        response = "Intro\n```a.py\nx = 1\n```\nMiddle\n```b.py\ny = 2\n```\nEnd"
+        parser = FenceParser()
+        closed_after = []
+        for i in range(0, len(response), 3):
+            for spec in parser.feed(response[i:i + 3]):
+                closed_after.append((spec.filepath, i + 3))
+        parser.close()
+        assert [path for path, _ in closed_after] == ["a.py", "b.py"]
+        assert closed_after[0][1] <= response.index("Middle") + 3
+        assert parser.non_file_text == "Intro\nMiddle\nEnd"
+
+    def test_iter_file_specs_matches_whole_parse(self):
+        """Test that chunked and whole parsing agree."""
+        response = "x\n~~~~a.md\n~~~\nin\n~~~\n~~~~\ny\n```b.txt\nz\n```"
+        specs = list(iter_file_specs(response[i:i + 5] for i in range(0, len(response), 5)))
+        assert specs == parse_llm_output(response)[0]
+
+
+class TestStreamedWriting:
+    """Test cases for writing files while the response streams."""
+
+    def test_files_written_as_blocks_close(self, tmp_path, monkeypatch):
+        """Test that a file exists on disk before the rest of the stream is read."""
+        monkeypatch.chdir(tmp_path)
+        seen_on_disk = []
+
+        def chunks():
+            yield "Intro\n```out/a.py\nx = 1\n"
+            yield "```\nMore\n"
+            seen_on_disk.append(os.path.exists("out/a.py"))
+            yield "```out/b.py\ny = 2\n```\n"
+
+        parser = FenceParser()
+        written = list(write_streamed_files(chunks(), parser))
+        assert written == ["out/a.py", "out/b.py"]
+        assert seen_on_disk == [True]
+        assert (tmp_path / "out/b.py").read_text() == "y = 2"
+        assert parser.non_file_text == "Intro\nMore"
+
+    def test_failure_keeps_completed_files(self, tmp_path, monkeypatch):
+        """Test that completed files stay and the unfinished one is discarded."""
+        monkeypatch.chdir(tmp_path)
+
+        def chunks():
+            yield "```done.py\nok\n```\n```partial.py\nhalf"
+            raise APICallError("connection reset")
+
+        written = []
+        with pytest.raises(APICallError):
+            for filepath in write_streamed_files(chunks()):
+                written.append(filepath)
+        assert written == ["done.py"]
+        assert sorted(os.listdir(tmp_path)) == [MANIFEST_NAME, "done.py"]
+
+    def test_file_modes(self, tmp_path, monkeypatch):
+        """Test that new files get the umask's default mode and rewritten files keep theirs."""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "run.sh").write_text("echo old")
+        os.chmod(tmp_path / "run.sh", 0o755)
+        umask = os.umask(0o022)
+        os.umask(umask)
+
+        list(write_streamed_files(["```run.sh\necho new\n```\n```new.py\nx = 1\n```\n"]))
+        assert os.stat(tmp_path / "run.sh").st_mode & 0o777 == 0o755
+        assert os.stat(tmp_path / "new.py").st_mode & 0o777 == 0o666 & ~umask
+
+    def test_default_client_stream(self):
+        """Test that clients without streaming yield the whole query result."""
+
+        class StaticClient(Client):
+            def query(self, model, context):
+                return "Error querying x model 'm': E - bad" if model == "bad" else "answer"
+
+        assert list(StaticClient().stream("m", ["q"])) == ["answer"]
+        with pytest.raises(APICallError):
+            list(StaticClient().stream("bad", ["q"]))
+
+
+class TestTransactionalWriting:
+    """Test cases for write_generated_files."""
+
+    def test_writes_and_replaces(self, tmp_path, monkeypatch):
+        """Test that new and existing files are written with their modes, leaving no temporary files."""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "old.py").write_text("old")
+        os.chmod(tmp_path / "old.py", 0o755)
+        umask = os.umask(0o022)
+        os.umask(umask)
+        specs = [FileSpec("old.py", "new"), FileSpec("pkg/sub/m.py", "m")] + [
+            FileSpec(f"pkg/f{i}.py", str(i)) for i in range(20)
+        ]
+        written = write_generated_files(specs, fsync=True, max_workers=4)
+        assert written == [spec.filepath for spec in specs]
+        assert (tmp_path / "old.py").read_text() == "new"
+        assert (tmp_path / "pkg/f7.py").read_text() == "7"
+        assert os.stat(tmp_path / "old.py").st_mode & 0o777 == 0o755
+        assert os.stat(tmp_path / "pkg/f7.py").st_mode & 0o777 == 0o666 & ~umask
+        assert not [name for name in os.listdir(tmp_path / "pkg") if name.startswith(".")]
+
+    def test_staging_failure_changes_nothing(self, tmp_path, monkeypatch):
+        """Test that one unwritable file leaves the whole tree untouched."""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "keep.py").write_text("original")
+        (tmp_path / "blocker").write_text("a file, not a directory")
+        written = write_generated_files([FileSpec("keep.py", "changed"), FileSpec("blocker/x.py", "x")])
+        assert written == []
+        assert (tmp_path / "keep.py").read_text() == "original"
+        assert sorted(os.listdir(tmp_path)) == ["blocker", "keep.py"]
+
+    def test_commit_failure_rolls_back(self, tmp_path, monkeypatch):
+        """Test that a failed rename restores replaced files and removes new ones."""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "a.py").write_text("original")
+        real_replace = os.replace
+        calls = []
+
+        def failing_replace(src, dst):
+            calls.append(dst)
+            if str(dst).endswith("c.py"):
+                raise OSError("disk full")
+            return real_replace(src, dst)
+
+        monkeypatch.setattr(os, "replace", failing_replace)
+        written = write_generated_files([FileSpec("a.py", "A"), FileSpec("new/b.py", "B"), FileSpec("c.py", "C")])
+        monkeypatch.setattr(os, "replace", real_replace)
+        assert written == []
+        assert (tmp_path / "a.py").read_text() == "original"
+        assert sorted(os.listdir(tmp_path)) == ["a.py"]
+
+    def test_dry_run_manifest(self, tmp_path, monkeypatch, capsys):
+        """Test that a dry run lists paths, sizes and hashes without writing."""
+        monkeypatch.chdir(tmp_path)
+        written = write_generated_files([FileSpec("a.py", "print(1)"), FileSpec("../x.py", "x")], dry_run=True)
+        out = capsys.readouterr().out
+        assert written == []
+        assert os.listdir(tmp_path) == []
+        assert "1 file(s), 8 bytes" in out
+        assert hashlib.sha256(b"print(1)").hexdigest()[:16] in out and "a.py" in out
+
+
+class TestChangeAwareWriting:
+    """Test cases for skipping unchanged files and preserving hand edits."""
+
+    def test_unchanged_files_not_touched(self, tmp_path, monkeypatch):
+        """Test that identical content keeps the file's mtime."""
+        monkeypatch.chdir(tmp_path)
+        specs = [FileSpec("a.py", "a"), FileSpec("b.py", "b")]
+        write_changed_files(specs)
+        os.utime("a.py", (1, 1))
+
+        report = write_changed_files([FileSpec("a.py", "a"), FileSpec("b.py", "b2"), FileSpec("c.py", "c")])
+        assert (report.created, report.modified, report.unchanged) == (["c.py"], ["b.py"], ["a.py"])
+        assert os.stat("a.py").st_mtime == 1
+        assert report.summary() == "1 created, 1 modified, 1 unchanged"
+
+    def test_hand_edits_preserved(self, tmp_path, monkeypatch, capsys):
+        """Test that a file edited since the last write is kept unless overwriting is requested."""
+        monkeypatch.chdir(tmp_path)
+        write_changed_files([FileSpec("a.py", "generated")])
+        (tmp_path / "a.py").write_text("edited by hand")
+
+        report = write_changed_files([FileSpec("a.py", "regenerated")])
+        assert report.preserved == ["a.py"]
+        assert (tmp_path / "a.py").read_text() == "edited by hand"
+        assert "Preserving a.py" in capsys.readouterr().err
+
+        report = write_changed_files([FileSpec("a.py", "regenerated")], overwrite_edited=True, show_diff=True)
+        assert report.modified == ["a.py"]
+        assert "-edited by hand\n+regenerated" in capsys.readouterr().err
+
+    def test_concurrent_writers_share_manifest(self, tmp_path, monkeypatch):
+        """Test that writers saving the manifest at the same time all keep their entries."""
+        monkeypatch.chdir(tmp_path)
+        threads = [
+            threading.Thread(target=write_changed_files, args=([FileSpec(f"f{i}.py", str(i))],)) for i in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(json.loads((tmp_path / MANIFEST_NAME).read_text())["files"]) == [f"f{i}.py" for i in range(8)]
+
+    def test_streamed_report(self, tmp_path, monkeypatch):
+        """Test that the streaming writer skips unchanged files and fills the report."""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "same.py").write_text("s")
+        report = new_write_report()
+        written = list(write_streamed_files(["```same.py\ns\n```\n```new.py\nn\n```\n"], report=report))
+        assert written == ["new.py"]
+        assert report.unchanged == ["same.py"] and report.created == ["new.py"]
+
+
+class TestEditBlocks:
+    """Test cases for applying edit blocks while writing."""
+
+    def test_streamed_edits(self, tmp_path, monkeypatch, capsys):
+        """Test chained edits, a diff, a hand-edited file and a conflict in one response."""
+        monkeypatch.chdir(tmp_path)
+        write_changed_files([FileSpec("a.py", "x = 1\ny = 2\n")])
+        (tmp_path / "a.py").write_text("x = 1\ny = 2\n# mine\n")
+        (tmp_path / "b.py").write_text("keep\n")
+        response = (
+            "```a.py\n<<<<<<< SEARCH\nx = 1\n=======\nx = 10\n>>>>>>> REPLACE\n```\n"
+            "```a.py\n<<<<<<< SEARCH\ny = 2\n=======\ny = 20\n>>>>>>> REPLACE\n```\n"
+            "```diff\n--- /dev/null\n+++ b/c.py\n@@ -0,0 +1 @@\n+z = 3\n```\n"
+            "```b.py\n<<<<<<< SEARCH\nmissing\n=======\nx\n>>>>>>> REPLACE\n```\n"
+        )
+        report = new_write_report()
+        written = list(write_streamed_files([response], report=report, apply_edits=True))
+        assert written == ["a.py", "a.py", "c.py"]
+        assert (tmp_path / "a.py").read_text() == "x = 10\ny = 20\n# mine\n"
+        assert (tmp_path / "c.py").read_text() == "z = 3\n"
+        assert (tmp_path / "b.py").read_text() == "keep\n"
+        assert report.conflicts == ["b.py"]
+        assert "Could not apply edits to b.py" in capsys.readouterr().err
+
+    def test_transactional_edits(self, tmp_path, monkeypatch):
+        """Test that edits are chained in memory before one transactional write."""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "m.py").write_text("a\nb\nc\n")
+        blocks = [
+            FileSpec("m.py", "<<<<<<< SEARCH\na\n=======\nA\n>>>>>>> REPLACE"),
+            FileSpec("m.py", "<<<<<<< SEARCH\nc\n=======\nC\n>>>>>>> REPLACE"),
+        ]
+        report = write_changed_files(blocks, apply_edits=True)
+        assert report.modified == ["m.py"]
+        assert (tmp_path / "m.py").read_text() == "A\nb\nC\n"
@@ -0,0 +1,122 @@
+"""Tests for the html_backends module."""
+
+import pytest
+
+from lib.client.exceptions import ClientError
+from lib.client.html_backends import (
+    available_backends,
+    create_extractor,
+    get_backend,
+    html_to_text,
+    PREFERRED_BACKENDS,
+)
+
+# Golden corpus: every backend must extract exactly the expected text
+GOLDEN = {
+"article": """<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <title>Release notes</title>
+  <style>body { font-family: sans-serif; }</style>
+  <script>window.dataLayer = [];</script>
+</head>
+<body>
+  <header><h1>Site</h1></header>
+  <nav><ul><li><a href="/">Home</a></li></ul></nav>
+  <main>
+    <article>
+      <h2>Version 2.0</h2>
+      <p>This release adds <strong>streaming</strong> extraction and
+      fixes several bugs.</p>
+      <ul>
+        <li>Faster parsing</li>
+        <li>Lower memory</li>
+      </ul>
+    </article>
+    <aside>Related posts</aside>
+  </main>
+  <footer>&copy; 2025 Example</footer>
+</body>
+</html>
+""",
+"table": """<html><body>
+<table>
+  <thead><tr><th>Team</th><th>Score</th></tr></thead>
+  <tbody>
+    <tr><td>Giants</td><td>5</td></tr>
+    <tr><td>Dodgers</td><td>3</td></tr>
+  </tbody>
+</table>
+</body></html>
+""",
+"entities": """<html><body>
+<p>Caf&eacute; &amp; cr&egrave;me &lt;br&gt; &quot;quoted&quot; &#8212; &#x2019;s</p>
+<p>café — naïve 日本語</p>
+</body></html>
+""",
+"comments_and_scripts": """<html><head><script type="text/javascript">
+if (a < b && c > d) { document.write("<p>fake</p>"); }
+</script></head><body>
+<!-- a comment with <p>markup</p> -->
+<div>Visible <span>text</span></div>
+<noscript>Enable JavaScript</noscript>
+<style>.x { content: "<b>" }</style>
+<pre>line one
+    line two</pre>
+</body></html>
+""",
+"forms": """<html><body>
+<form><label>Name <input type="text" name="n"></label>
+<button>Send</button></form>
+<img src="a.png" alt="diagram"><br>
+<p>After<br>break</p>
+</body></html>
+""",
+}
+
+EXPECTED = {
+    'article': 'Release notes Version 2.0 This release adds streaming extraction and fixes several bugs. Faster parsing Lower memory',
+    'table': 'TeamScore Giants5 Dodgers3',
+    'entities': 'Café & crème <br> "quoted" — ’s café — naïve 日本語',
+    'comments_and_scripts': 'Visible text Enable JavaScript line one line two',
+    'forms': 'Name Send Afterbreak',
+}
+
+BACKENDS = list(available_backends())
+
+
+class TestHTMLBackends:
+    """Test cases for backend equivalence and selection."""
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    @pytest.mark.parametrize("name", sorted(GOLDEN))
+    def test_golden_corpus(self, backend, name):
+        """Test that each backend extracts the golden text."""
+        assert html_to_text(GOLDEN[name], backend) == EXPECTED[name]
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_streamed_in_small_chunks(self, backend):
+        """Test that chunked feeding gives the same text and honours the budget."""
+        data = GOLDEN["article"].encode("utf-8")
+        extractor = create_extractor("utf-8", max_chars=30, backend=backend)
+        for i in range(0, len(data), 7):
+            if extractor.feed(data[i:i + 7]):
+                break
+        assert extractor.close() == (EXPECTED["article"][:30], True)
+
+    def test_automatic_selection_prefers_fastest(self, monkeypatch):
+        """Test that the first available backend in preference order is chosen."""
+        monkeypatch.delenv("TECH16_HTML_BACKEND", raising=False)
+        expected = next(name for name in PREFERRED_BACKENDS if name in BACKENDS)
+        assert get_backend().name == expected
+
+    def test_environment_override(self, monkeypatch):
+        """Test that the environment variable forces a backend."""
+        monkeypatch.setenv("TECH16_HTML_BACKEND", "bs4")
+        assert get_backend().name == "bs4"
+
+    def test_unknown_backend(self):
+        """Test that an unknown backend name is rejected."""
+        with pytest.raises(ClientError, match="not available"):
+            get_backend("nope")
@@ -0,0 +1,98 @@
+"""Tests for the html_stream module and streaming URL scraping."""
+
+from unittest.mock import Mock, patch
+
+from lib.client.html_stream import StreamingTextExtractor, extract_text
+from lib.client.url_handler import clean_html_content, scrape_url_content
+
+
+PAGE = """<!DOCTYPE html><html><head><title>Guide &amp; notes</title>
+<style>p { color: red; }</style><script>var s = "<p>not text</p>";</script></head>
+<body><header>Site header</header><nav><a href="/">Home</a></nav>
+<main><h1>Install   the tool</h1><p>Run&nbsp;the installer
+  and follow <b>the</b>prompts.<br>Then restart.</p><!-- hidden -->
+<aside>Related links</aside><ul><li>one</li><li>two</li></ul>
+<footer>Copyright</footer><div>tail  text\r\nend</div></main></body></html>"""
+
+
+def feed_in_chunks(data, size, **kwargs):
+    """Feed data to a new extractor in fixed-size chunks and return (text, truncated)."""
+    extractor = StreamingTextExtractor("utf-8", **kwargs)
+    for i in range(0, len(data), size):
+        if extractor.feed(data[i:i + size]):
+            break
+    return extractor.close()
+
+
+class TestStreamingTextExtractor:
+    """Test cases for incremental extraction."""
+
+    def test_matches_full_tree_extraction(self):
+        """Test that output equals clean_html_content for any chunk size."""
+        expected = clean_html_content(PAGE)
+        for size in (1, 5, 64, 8192):
+            assert feed_in_chunks(PAGE.encode("utf-8"), size) == (expected, False)
+
+    def test_skipped_subtrees(self):
+        """Test that script, style and page chrome are dropped."""
+        text = extract_text(PAGE.encode("utf-8"))
+        for hidden in ("not text", "Site header", "Home", "Related", "Copyright", "hidden"):
+            assert hidden not in text
+        assert "Install the tool" in text
+
+    def test_multibyte_characters_split_across_chunks(self):
+        """Test that the incremental decoder joins split UTF-8 sequences."""
+        data = "<p>café — naïve</p>".encode("utf-8")
+        assert feed_in_chunks(data, 1) == ("café — naïve", False)
+
+    def test_stops_at_budget(self):
+        """Test that feeding reports completion once the budget is reached."""
+        data = b"<html><body>" + b"<p>word word word</p>\n" * 100000
+        extractor = StreamingTextExtractor("utf-8", max_chars=100)
+        consumed = 0
+        for i in range(0, len(data), 8192):
+            consumed += 8192
+            if extractor.feed(data[i:i + 8192]):
+                break
+        text, truncated = extractor.close()
+        assert truncated
+        assert len(text) == 100
+        assert consumed == 8192
+
+    def test_long_unbroken_text_respects_budget(self):
+        """Test that a single long phrase does not defeat the budget."""
+        data = b"<p>" + b"x " * 50000
+        assert feed_in_chunks(data, 4096, max_chars=10) == ("x x x x x ", True)
+
+    def test_plain_text_is_kept_verbatim(self):
+        """Test that non-HTML content is decoded without cleanup."""
+        data = b"line one\n  indented\n"
+        assert feed_in_chunks(data, 3, is_html=False) == ("line one\n  indented\n", False)
+
+
+class TestStreamingScrape:
+    """Test cases for scrape_url_content with a streamed response."""
+
+    @patch("lib.client.url_handler.requests.get")
+    def test_download_stops_at_budget(self, mock_get):
+        """Test that no more chunks are read once the text budget is reached."""
+        chunk = b"<p>" + b"lorem ipsum dolor " * 400 + b"</p>\n"
+        pulled = []
+
+        def iter_content(chunk_size):
+            for i in range(1000):
+                pulled.append(i)
+                yield chunk
+
+        response = Mock()
+        response.headers = {"content-type": "text/html; charset=utf-8"}
+        response.encoding = "utf-8"
+        response.iter_content = iter_content
+        mock_get.return_value = response
+
+        result = scrape_url_content("https://example.com/big", max_chars=1000)
+
+        assert result.startswith("Content from https://example.com/big (type: text/html; charset=utf-8, encoding: utf-8):\n")
+        assert result.endswith("\n... [Content truncated]")
+        assert len(pulled) == 1
+        response.close.assert_called_once()
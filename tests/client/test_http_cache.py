@@ -0,0 +1,119 @@
+"""Tests for the http_cache module and cached URL scraping."""
+
+import os
+from unittest.mock import Mock
+
+from lib.client.cache import DiskCache
+from lib.client.http_cache import HTTPCache, parse_cache_control
+from lib.client.url_handler import scrape_url_content
+
+URL = "https://example.com/schedule"
+PAGE = b"<html><body><nav>menu</nav><p>Game one at 7pm.</p><p>Game two at 9pm.</p></body></html>"
+
+
+class FakeServer:
+    """Session stand-in that answers conditional requests like a server with an ETag."""
+
+    def __init__(self, body=PAGE, cache_control=None, etag='"v1"'):
+        self.body = body
+        self.cache_control = cache_control
+        self.etag = etag
+        self.requests = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append(dict(headers or {}))
+        response = Mock()
+        response.encoding = "utf-8"
+        response.headers = {
+            "content-type": "text/html; charset=utf-8",
+            "content-length": str(len(self.body)),
+            "etag": self.etag,
+        }
+        if self.cache_control:
+            response.headers["cache-control"] = self.cache_control
+        if headers and headers.get("If-None-Match") == self.etag:
+            response.status_code = 304
+            response.iter_content = Mock(side_effect=AssertionError("304 has no body"))
+        else:
+            response.status_code = 200
+            response.iter_content = lambda chunk_size: iter([self.body])
+        return response
+
+
+class TestHTTPCache:
+    """Test cases for cached scraping."""
+
+    def test_revalidation_uses_304(self, tmp_path):
+        """Test that a stale entry is revalidated and a 304 reuses the stored text."""
+        cache = HTTPCache(tmp_path)
+        server = FakeServer()
+        first = scrape_url_content(URL, session=server, cache=cache)
+        second = scrape_url_content(URL, session=server, cache=cache)
+
+        assert first == second
+        assert "Game two at 9pm." in second and "menu" not in second
+        assert "If-None-Match" not in server.requests[0]
+        assert server.requests[1]["If-None-Match"] == '"v1"'
+
+    def test_changed_page_is_downloaded(self, tmp_path):
+        """Test that a new ETag replaces the stored page."""
+        cache = HTTPCache(tmp_path)
+        server = FakeServer()
+        scrape_url_content(URL, session=server, cache=cache)
+        server.etag = '"v2"'
+        server.body = b"<p>Postponed.</p>"
+        assert scrape_url_content(URL, session=server, cache=cache).endswith("\nPostponed.")
+
+    def test_fresh_entry_skips_request(self, tmp_path):
+        """Test that max-age lets a stored page be used without contacting the server."""
+        cache = HTTPCache(tmp_path)
+        server = FakeServer(cache_control="public, max-age=600")
+        first = scrape_url_content(URL, session=server, cache=cache)
+        assert scrape_url_content(URL, session=server, cache=cache) == first
+        assert len(server.requests) == 1
+
+    def test_ttl_override(self, tmp_path):
+        """Test that a forced TTL serves stored pages regardless of Cache-Control."""
+        server = FakeServer(cache_control="no-cache")
+        scrape_url_content(URL, session=server, cache=HTTPCache(tmp_path))
+        scrape_url_content(URL, session=server, cache=HTTPCache(tmp_path, ttl=3600))
+        assert len(server.requests) == 1
+
+    def test_no_store_is_not_cached(self, tmp_path):
+        """Test that no-store responses are never written."""
+        cache = HTTPCache(tmp_path)
+        server = FakeServer(cache_control="no-store")
+        scrape_url_content(URL, session=server, cache=cache)
+        assert cache.lookup(URL) is None
+
+    def test_larger_budget_reextracts_stored_body(self, tmp_path):
+        """Test that a complete stored body serves a larger budget without a download."""
+        cache = HTTPCache(tmp_path, ttl=3600)
+        server = FakeServer()
+        short = scrape_url_content(URL, max_chars=10, session=server, cache=cache)
+        assert short.endswith("\n... [Content truncated]")
+        full = scrape_url_content(URL, max_chars=None, session=server, cache=cache)
+        assert full.endswith("\nGame one at 7pm.Game two at 9pm.")
+        assert len(server.requests) == 1
+
+    def test_parse_cache_control(self):
+        """Test directive parsing."""
+        assert parse_cache_control('Public, max-age="60", no-cache') == {
+            "public": None, "max-age": "60", "no-cache": None,
+        }
+
+
+class TestDiskCacheEviction:
+    """Test cases for size-based eviction."""
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Test that the oldest entries go first."""
+        cache = DiskCache("test", tmp_path)
+        for i, key in enumerate(["aa01", "bb02", "cc03"]):
+            cache.set_bytes(key, b"x" * 100)
+            os.utime(cache._path(key), (1000 + i, 1000 + i))
+        cache.touch("aa01")
+
+        assert cache.evict(200) == 1
+        assert cache.get_bytes("bb02") is None
+        assert cache.get_bytes("aa01") is not None
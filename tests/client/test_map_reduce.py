@@ -0,0 +1,111 @@
+"""Tests for the map_reduce module."""
+
+import pytest
+from unittest.mock import Mock
+from lib.client.cache import DiskCache, content_hash
+from lib.client.exceptions import APICallError
+from lib.client.map_reduce import (
+    MapReduce, map_reduce_query, make_chunks, partition_inputs, NOTHING_RELEVANT
+)
+
+
+def echo_client():
+    """Client whose query returns a summary of the prompt's section labels."""
+    client = Mock()
+
+    def query(model, context):
+        prompt = context[0]
+        if "=== NOTES EXTRACTED" in prompt:
+            return "FINAL\n" + prompt.split("part by part, in order.\n\n", 1)[1]
+        if "[part" in prompt:
+            label = prompt.split("=== Content", 1)[1].split(" ===", 1)[0]
+            return f"note for{label}"
+        return "combined"
+
+    client.query.side_effect = query
+    return client
+
+
+class TestMapReduce:
+    """Test cases for map-reduce processing."""
+
+    def test_partition_inputs(self):
+        """Test that small inputs are shared and large ones chunked."""
+        shared, sources = partition_inputs(["prompt", "x" * 50, "y"], max_shared_chars=10)
+        assert shared == ["prompt", "y"]
+        assert sources == ["x" * 50]
+
+    def test_make_chunks_keeps_attribution(self):
+        """Test that every chunk is labelled with its source header."""
+        source = "Content from file big.log (encoding: utf-8):\n" + "line\n" * 20
+        chunks = make_chunks([source], 40)
+        assert len(chunks) == 3
+        assert chunks[0][0] == "Content from file big.log (encoding: utf-8) [part 1/3]"
+        assert "".join(text for _, text in chunks) == "line\n" * 20
+
+    def test_small_inputs_use_single_query(self):
+        """Test that inputs fitting in one chunk are sent in one request."""
+        client = Mock()
+        client.query.return_value = "answer"
+        result = map_reduce_query(client, "o4-mini", "task", ["small"], chunk_chars=1000)
+        assert result == "answer"
+        assert client.query.call_count == 1
+
+    def test_map_then_reduce_in_order(self, tmp_path):
+        """Test that partial results are reduced in input order."""
+        client = echo_client()
+        source = "Content from file big.log:\n" + "".join(f"entry {i}\n" for i in range(40))
+        runner = MapReduce(client, "o4-mini", chunk_chars=100, max_workers=4,
+                           cache=DiskCache("test", tmp_path), progress=False)
+        result = runner.run("task", [source])
+        parts = [line for line in result.splitlines() if line.startswith("note for")]
+        assert parts == sorted(parts, key=lambda p: int(p.split("part ")[1].split("/")[0]))
+        assert result.startswith("FINAL")
+
+    def test_cache_skips_unchanged_chunks(self, tmp_path):
+        """Test that a rerun only queries the final reduce step."""
+        cache = DiskCache("test", tmp_path)
+        source = "Content from file big.log:\n" + "".join(f"entry {i}\n" for i in range(40))
+
+        first = echo_client()
+        MapReduce(first, "o4-mini", 200, cache=cache, progress=False).run("task", [source])
+        second = echo_client()
+        MapReduce(second, "o4-mini", 200, cache=cache, progress=False).run("task", [source])
+
+        assert first.query.call_count > 1
+        assert second.query.call_count == 1
+
+    def test_nothing_relevant_notes_are_dropped(self, tmp_path):
+        """Test that empty partial results do not reach the reduce step."""
+        client = Mock()
+        client.query.side_effect = lambda model, context: (
+            "done" if "=== NOTES EXTRACTED" in context[0] else NOTHING_RELEVANT
+        )
+        source = "Content from file a:\n" + "z\n" * 100
+        MapReduce(client, "o4-mini", 50, progress=False).run("task", [source])
+        final_prompt = client.query.call_args_list[-1][0][1][0]
+        assert "Notes from" not in final_prompt
+
+    def test_error_response_raises(self):
+        """Test that an error string from the client fails the run."""
+        client = Mock()
+        client.query.return_value = "Error querying openai model 'o4-mini': boom"
+        source = "Content from file a:\n" + "z\n" * 100
+        with pytest.raises(APICallError):
+            MapReduce(client, "o4-mini", 50, progress=False).run("task", [source])
+
+
+class TestDiskCache:
+    """Test cases for the on-disk cache."""
+
+    def test_round_trip(self, tmp_path):
+        """Test storing and retrieving a value."""
+        cache = DiskCache("test", tmp_path)
+        key = content_hash("a", "b")
+        assert cache.get(key) is None
+        cache.set(key, "value")
+        assert cache.get(key) == "value"
+
+    def test_content_hash_is_unambiguous(self):
+        """Test that part boundaries affect the hash."""
+        assert content_hash("ab", "c") != content_hash("a", "bc")
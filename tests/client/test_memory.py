@@ -0,0 +1,106 @@
+"""Tests for the memory module."""
+
+import threading
+
+from lib.client.memory import RollingMemory, plan_fold, verify_pinned
+from lib.client.session import DIGEST_HEADING, Session
+
+# How summary requests begin, telling them apart from turns
+SUMMARY_START = "You maintain the memory"
+
+def scripted(answer="ok", summary="digest", gate=None):
+    """Responder giving summary to summary requests, once gate is set, and answer to everything else."""
+
+    def respond(context):
+        if not context[0].startswith(SUMMARY_START):
+            return answer
+        if gate is not None:
+            gate.wait(5)
+        return summary
+
+    return respond
+
+
+def summary_prompts(client):
+    return [context[0] for context, _ in client.contexts if context[0].startswith(SUMMARY_START)]
+
+
+def long_session(tmp_path, turns):
+    session = Session("long", tmp_path)
+    session.add_material(["PROMPT " * 50], [], pinned=True)
+    session.add_material(["spec " * 400], ["spec.md"])
+    session.turns = [[f"question {i} " * 40, f"answer {i} " * 40] for i in range(turns)]
+    return session
+
+
+class TestPlanFold:
+    """Test cases for choosing what to summarize."""
+
+    def test_within_budget(self, tmp_path):
+        """Test that nothing is summarized below the budget."""
+        assert plan_fold(long_session(tmp_path, 3), max_tokens=100000) is None
+
+    def test_oldest_first_keeping_recent(self, tmp_path):
+        """Test that material goes first, then old turns, never the most recent ones."""
+        plan = plan_fold(long_session(tmp_path, 10), max_tokens=2500, keep_turns=4)
+        assert plan.material == 1
+        assert 0 < plan.turns <= 6
+
+    def test_only_pinned_left(self, tmp_path):
+        """Test that a session over budget only through pinned material and recent turns is left alone."""
+        session = Session("pinned", tmp_path)
+        session.add_material(["PROMPT " * 4000], [], pinned=True)
+        session.turns = [["q", "a"]]
+        assert plan_fold(session, max_tokens=100, keep_turns=1) is None
+
+
+class TestRollingMemory:
+    """Test cases for background summarization around turns."""
+
+    def test_summary_replaces_old_content(self, tmp_path, fake_client):
+        """Test that old material and turns become a digest while pinned material stays verbatim."""
+        session = long_session(tmp_path, 10)
+        pinned = list(session.pinned)
+        client = fake_client(scripted())
+        memory = RollingMemory(session, client, "cheap", max_tokens=2500, keep_turns=4)
+
+        assert "".join(memory.ask(client, "main", "next question")) == "ok"
+        memory.close()
+
+        assert session.digest == "digest"
+        assert session.pinned == pinned and session.material == []
+        assert len(session.turns) >= 4 and session.turns[-1][0] == "next question"
+        first = session.context("q")[0]
+        assert first.startswith(pinned[0]) and f"{DIGEST_HEADING}\ndigest" in first
+        summaries = summary_prompts(client)
+        assert "spec spec" in summaries[0] and "PROMPT" not in summaries[0]
+        verify_pinned(session)
+        assert Session("long", tmp_path).digest == "digest"
+
+    def test_summary_runs_in_background(self, tmp_path, fake_client):
+        """Test that the answer is returned while the summary is still running."""
+        gate = threading.Event()
+        session = long_session(tmp_path, 10)
+        session.material = []
+        client = fake_client(scripted(answer="word " * 800, gate=gate))
+        memory = RollingMemory(session, client, "cheap", max_tokens=3000, keep_turns=2)
+
+        assert plan_fold(session, 3000) is None
+        assert "".join(memory.ask(client, "main", "q")) == "word " * 800
+        assert session.digest == ""
+        gate.set()
+        list(memory.ask(client, "main", "q2"))
+        assert session.digest == "digest"
+        streamed = [context for context, cache in client.contexts if cache]
+        assert streamed[-1][0].startswith(session.pinned[0])
+        memory.close()
+
+    def test_failed_summary_keeps_everything(self, tmp_path, capsys, fake_client):
+        """Test that a failed summary leaves the session in full."""
+        session = long_session(tmp_path, 10)
+        client = fake_client(scripted(summary="Error querying anthropic model 'cheap': APIError - overloaded"))
+        memory = RollingMemory(session, client, "cheap", max_tokens=2500)
+        list(memory.ask(client, "main", "q"))
+        memory.close()
+        assert session.digest == "" and len(session.turns) == 11
+        assert "Could not summarize" in capsys.readouterr().err
@@ -0,0 +1,89 @@
+"""Tests for the patcher module."""
+
+import pytest
+
+from lib.client.exceptions import PatchError
+from lib.client.patcher import (
+    FilePatch,
+    Hunk,
+    apply_hunks,
+    is_search_replace,
+    is_unified_diff,
+    parse_search_replace,
+    parse_unified_diff,
+)
+
+ORIGINAL = (
+    "import os\n"
+    "\n"
+    "def load(path):\n"
+    "    with open(path) as f:\n"
+    "        return f.read()\n"
+    "\n"
+    "def save(path, data):\n"
+    "    with open(path, 'w') as f:\n"
+    "        f.write(data)\n"
+)
+
+
+class TestParsing:
+    """Test cases for parsing edit blocks and diffs."""
+
+    def test_search_replace_blocks(self):
+        """Test that several blocks are parsed in order, with empty sections allowed."""
+        content = "<<<<<<< SEARCH\na\nb\n=======\nc\n>>>>>>> REPLACE\nnoise\n<<<<<<< SEARCH\nd\n=======\n>>>>>>> REPLACE"
+        assert is_search_replace(content)
+        assert parse_search_replace(content) == [Hunk(["a", "b"], ["c"]), Hunk(["d"], [])]
+
+    def test_malformed_search_replace(self):
+        """Test that an unterminated block is an error rather than a partial edit."""
+        with pytest.raises(PatchError):
+            parse_search_replace("<<<<<<< SEARCH\na\n=======\nb\n")
+
+    def test_unified_diff(self):
+        """Test headers, hunks, wrong line counts and new files."""
+        diff = (
+            "--- a/app.py\n+++ b/app.py\n@@ -3,9 +3,9 @@ def load\n def load(path):\n"
+            "-    with open(path) as f:\n+    with open(path, encoding='utf-8') as f:\n"
+            "--- /dev/null\n+++ b/new.py\n@@ -0,0 +1,2 @@\n+x = 1\n+y = 2\n"
+        )
+        assert is_unified_diff("diff", diff)
+        assert parse_unified_diff(diff) == [
+            FilePatch("app.py", [Hunk(
+                ["def load(path):", "    with open(path) as f:"],
+                ["def load(path):", "    with open(path, encoding='utf-8') as f:"],
+                3,
+            )]),
+            FilePatch("new.py", [Hunk([], ["x = 1", "y = 2"], 0)]),
+        ]
+
+
+class TestApplyHunks:
+    """Test cases for applying edits."""
+
+    def test_exact_edit_keeps_rest(self):
+        """Test an exact edit, preserving everything else and the final newline."""
+        result = apply_hunks(ORIGINAL, [Hunk(["        f.write(data)"], ["        f.write(data)", "        f.flush()"])])
+        assert result == ORIGINAL + "        f.flush()\n"
+
+    def test_reindents_and_fuzzy(self):
+        """Test that unindented and slightly wrong search text still lands in the right place."""
+        unindented = Hunk(["with open(path) as f:", "    return f.read()"], ["with open(path) as f:", "    return f.read().strip()"])
+        fuzzy = Hunk(["def save(path, data) :", "    with open(path, 'w') as f :"], ["def save(path, data, mode='w'):", "    with open(path, mode) as f:"])
+        result = apply_hunks(ORIGINAL, [unindented, fuzzy])
+        assert "        return f.read().strip()\n" in result
+        assert "def save(path, data, mode='w'):\n    with open(path, mode) as f:\n        f.write(data)" in result
+
+    def test_ambiguous_uses_line_hint(self):
+        """Test that repeated search text is a conflict unless a line hint picks the match."""
+        text = "x = 1\nprint(x)\nx = 1\nprint(x)\n"
+        with pytest.raises(PatchError, match="matches 2 places"):
+            apply_hunks(text, [Hunk(["x = 1"], ["x = 2"])])
+        assert apply_hunks(text, [Hunk(["x = 1"], ["x = 2"], 3)]) == "x = 1\nprint(x)\nx = 2\nprint(x)\n"
+
+    def test_missing_text_and_line_endings(self):
+        """Test that unmatched search text is a conflict and CRLF endings survive."""
+        with pytest.raises(PatchError, match="not found"):
+            apply_hunks(ORIGINAL, [Hunk(["class Missing:"], [])])
+        assert apply_hunks("a\r\nb\r\n", [Hunk(["b"], ["c"])]) == "a\r\nc\r\n"
+        assert apply_hunks(None, [Hunk([], ["new"])]) == "new\n"
@@ -0,0 +1,51 @@
+"""Tests for the pipeline module."""
+
+import io
+import time
+
+import pytest
+
+from lib.client.pipeline import Pipeline
+
+
+class TestPipeline:
+    """Test cases for concurrent stages and their timings."""
+
+    def test_stages_overlap(self):
+        """Test that submitted stages run concurrently, so wall time is the slowest stage."""
+        with Pipeline() as pipeline:
+            started = time.perf_counter()
+            futures = [pipeline.submit(name, time.sleep, 0.2) for name in ("client", "files", "urls")]
+            for future in futures:
+                future.result()
+            elapsed = time.perf_counter() - started
+        assert elapsed < 0.5
+        assert sorted(timing.name for timing in pipeline.timings) == ["client", "files", "urls"]
+
+    def test_critical_path(self):
+        """Test that the critical path follows the slowest stage into the stages waiting on it."""
+        with Pipeline() as pipeline:
+            client = pipeline.submit("client", time.sleep, 0.01)
+            urls = pipeline.submit("urls", time.sleep, 0.15)
+            client.result()
+            urls.result()
+            with pipeline.stage("context"):
+                pass
+            with pipeline.stage("query"):
+                time.sleep(0.05)
+
+        assert [timing.name for timing in pipeline.critical_path()] == ["urls", "context", "query"]
+        out = io.StringIO()
+        pipeline.print_timings(out)
+        assert "Critical path: urls -> context -> query" in out.getvalue()
+
+    def test_errors_raised_from_result(self):
+        """Test that a failing stage surfaces its error, including SystemExit, to the caller."""
+        def failing_setup():
+            raise SystemExit(1)
+
+        with Pipeline() as pipeline:
+            future = pipeline.submit("client", failing_setup)
+            with pytest.raises(SystemExit):
+                future.result()
+        assert [timing.name for timing in pipeline.timings] == ["client"]
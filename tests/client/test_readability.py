@@ -0,0 +1,90 @@
+"""Tests for the readability module and main-content scraping."""
+
+from unittest.mock import Mock
+
+from lib.client.http_cache import HTTPCache
+from lib.client.readability import extract_main_content, parse_tree, render_text
+from lib.client.url_handler import scrape_url_content
+
+ARTICLE = """<html><head><title>Recap</title></head><body>
+<div id="cookie-banner">We use cookies to improve your experience, please accept all cookies now.</div>
+<div class="menu"><ul><li><a href="/">Home</a></li><li><a href="/news">News about all the teams</a></li></ul></div>
+<div class="container">
+ <div class="article-body">
+  <h1>Giants beat Dodgers</h1>
+  <p>The Giants beat the Dodgers 5-3 on Tuesday night, with a late rally in the eighth inning.</p>
+  <p>Starter Logan Webb allowed two runs over seven innings, striking out eight, and the bullpen held on.
+  <p>The teams meet again on Wednesday, weather permitting, at Oracle Park.</p>
+ </div>
+ <div class="related-links"><a href="/a">Another story that you might like to read today</a></div>
+</div>
+<div class="newsletter">Subscribe to our newsletter for the latest news, scores and more.</div>
+</body></html>"""
+
+SCHEDULE = (
+    "<html><body><div class='nav'><a>Scores</a><a>Standings</a></div>"
+    "<div class='schedule'><table><tr><th>Away<th>Home<th>Status"
+    + "".join(f"<tr><td>Team {i}<td>Team {i + 10}<td>7:{i}0 PM ET" for i in range(5))
+    + "</table></div><div class='footer-links'><a>Privacy policy and terms of use</a></div>"
+    "</body></html>"
+)
+
+
+class TestMainContent:
+    """Test cases for main-content extraction."""
+
+    def test_article_without_chrome(self):
+        """Test that banners, menus and related links are dropped."""
+        text = extract_main_content(ARTICLE)
+        assert text.splitlines() == [
+            "Giants beat Dodgers",
+            "The Giants beat the Dodgers 5-3 on Tuesday night, with a late rally in the eighth inning.",
+            "Starter Logan Webb allowed two runs over seven innings, striking out eight, and the bullpen held on.",
+            "The teams meet again on Wednesday, weather permitting, at Oracle Park.",
+        ]
+
+    def test_tables_become_rows(self):
+        """Test that a tabular page keeps one compact line per row."""
+        lines = extract_main_content(SCHEDULE).splitlines()
+        assert lines[0] == "Away | Home | Status"
+        assert lines[1] == "Team 0 | Team 10 | 7:00 PM ET"
+        assert len(lines) == 6
+
+    def test_render_lists_and_breaks(self):
+        """Test the block rendering of lists and line breaks."""
+        root = parse_tree("<div><ul><li>one<li>two</ul><p>a<br>b</p></div>")
+        assert render_text([root]) == "- one\n- two\na\nb"
+
+    def test_page_without_paragraphs_falls_back_to_body(self):
+        """Test that short pages are rendered whole."""
+        assert extract_main_content("<html><body><h1>Hi</h1><div>there</div></body></html>") == "Hi\nthere"
+
+
+class TestMainContentScrape:
+    """Test cases for scrape_url_content in main-content mode."""
+
+    def make_session(self, body):
+        session = Mock()
+        response = Mock()
+        response.status_code = 200
+        response.encoding = "utf-8"
+        response.headers = {"content-type": "text/html", "etag": '"a"'}
+        response.iter_content = lambda chunk_size: iter([body.encode("utf-8")])
+        session.get.return_value = response
+        return session
+
+    def test_reports_ratio(self, capsys):
+        """Test that the extracted-to-raw ratio is reported on stderr."""
+        result = scrape_url_content("https://example.com/recap", session=self.make_session(ARTICLE), extract="main")
+        assert "Giants beat Dodgers\nThe Giants" in result
+        assert "newsletter" not in result
+        assert "Main content of https://example.com/recap:" in capsys.readouterr().err
+
+    def test_cache_keeps_modes_apart(self, tmp_path):
+        """Test that a page cached in full mode is re-extracted for main mode."""
+        cache = HTTPCache(tmp_path, ttl=3600)
+        session = self.make_session(ARTICLE)
+        full = scrape_url_content("https://example.com/r", session=session, cache=cache)
+        main = scrape_url_content("https://example.com/r", session=session, cache=cache, extract="main")
+        assert "Subscribe" in full and "Subscribe" not in main
+        assert session.get.call_count == 1
@@ -0,0 +1,88 @@
+"""Tests for the record_map module."""
+
+import io
+import re
+import threading
+
+from lib.client.cache import DiskCache
+from lib.client.record_map import MISSING_RESULT, RecordMapper, iter_records, parse_results
+
+
+def echo(fail_on=None, wait_for=None):
+    """Responder answering each numbered record with its upper-cased text; wait_for maps a record to an Event."""
+
+    def respond(context):
+        records = re.findall(r"^\[(\d+)\] (.*)$", context[-1].split("=== RECORDS ===")[1], re.MULTILINE)
+        for _, text in records:
+            if wait_for and text in wait_for:
+                wait_for[text].wait(2)
+        if fail_on is not None and any(text == fail_on for _, text in records):
+            return "Error querying o4-mini: rate limited"
+        return "\n".join(f"[{number}] {text.upper()}" for number, text in records)
+
+    return respond
+
+
+class TestRecords:
+    """Test cases for reading records and parsing batch responses."""
+
+    def test_formats(self):
+        """Test that each record format splits stdin into the expected records."""
+        assert list(iter_records(io.StringIO("a\n\nb\r\n"), "lines")) == ["a", "b"]
+        assert list(iter_records(io.StringIO("one\ntwo\0three\0"), "nul")) == ["one\ntwo", "three"]
+        assert list(iter_records(io.StringIO('{"a": 1}\nnot json\n'), "jsonl")) == ['{"a":1}', "not json"]
+
+    def test_missing_results(self):
+        """Test that records the model skipped get a placeholder instead of shifting later results."""
+        assert parse_results("Sure:\n[1] x\n[3] z", 3) == ["x", MISSING_RESULT, "z"]
+
+
+class TestRecordMapper:
+    """Test cases for mapping a task over records."""
+
+    def test_ordered_despite_slow_batch(self, fake_client):
+        """Test that results come out in input order even when an early batch finishes last."""
+        later_answered = threading.Event()
+        respond = echo(wait_for={"r0": later_answered})
+
+        def respond_and_signal(context):
+            response = respond(context)
+            if "] r2\n" in context[-1] + "\n":
+                later_answered.set()
+            return response
+
+        client = fake_client(respond_and_signal, together=2)
+        mapper = RecordMapper(client, "o4-mini", "upper-case", batch_size=2, max_workers=4)
+        results = list(mapper.run([f"r{i}" for i in range(10)]))
+        assert results == [(i + 1, f"R{i}") for i in range(10)]
+        assert len(client.contexts) == 5
+        assert client.peak > 1 and later_answered.is_set()
+
+    def test_unordered_backpressure_and_failures(self, fake_client):
+        """Test that reading stays a bounded window ahead and failed batches still yield a line per record."""
+        client = fake_client(echo(fail_on="r7"))
+        mapper = RecordMapper(client, "o4-mini", "upper-case", batch_size=1, max_workers=2)
+        read = []
+
+        def records():
+            for i in range(50):
+                read.append(i)
+                yield f"r{i}"
+
+        results = mapper.run(records(), ordered=False)
+        first = next(results)
+        assert len(read) <= 2 * 2 + 1
+        rest = dict([first] + list(results))
+        assert sorted(rest) == list(range(1, 51))
+        assert rest[8] == "Error querying o4-mini: rate limited"
+        assert rest[9] == "R8"
+        assert mapper.failed == 1
+
+    def test_cached_batches(self, tmp_path, fake_client):
+        """Test that a rerun answers unchanged batches from the cache."""
+        cache = DiskCache("record_map", tmp_path)
+        client = fake_client(echo())
+        for _ in range(2):
+            mapper = RecordMapper(client, "o4-mini", "upper-case", ["shared"], batch_size=3, cache=cache)
+            assert [result for _, result in mapper.run(["a", "b", "c", "d"])] == ["A", "B", "C", "D"]
+        assert len(client.contexts) == 2
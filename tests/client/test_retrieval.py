@@ -0,0 +1,77 @@
+"""Tests for the retrieval module."""
+
+import numpy as np
+from lib.client.retrieval import (
+    BM25Index, Passage, tokenize, make_passages, select_passages, retrieve_context
+)
+
+
+def passage(text, source=0, position=0):
+    """Build a passage with a fixed header."""
+    return Passage(source, position, "Content from file doc.md:", text)
+
+
+class TestRetrieval:
+    """Test cases for BM25 retrieval."""
+
+    def test_tokenize_drops_stop_words(self):
+        """Test tokenization and stop word removal."""
+        assert tokenize("The Quick brown_fox, and 42 dogs") == ["quick", "brown_fox", "42", "dogs"]
+
+    def test_bm25_ranks_matching_passage_first(self):
+        """Test that the passage containing the query terms scores highest."""
+        index = BM25Index([
+            passage("weather report sunny skies"),
+            passage("database connection timeout error in pool"),
+            passage("lunch menu pasta salad"),
+        ])
+        scores = index.score("connection timeout")
+        assert int(np.argmax(scores)) == 1
+        assert scores[0] == 0 and scores[2] == 0
+
+    def test_bm25_rare_terms_weigh_more(self):
+        """Test that inverse document frequency favours rare terms."""
+        index = BM25Index([
+            passage("error error common"),
+            passage("error rare"),
+            passage("error other"),
+        ])
+        scores = index.score("rare error")
+        assert scores[1] > scores[0]
+
+    def test_select_respects_budget_and_order(self):
+        """Test top-k, token budget and source ordering of the selection."""
+        passages = [passage(f"alpha filler {i} " * 10, position=i) for i in range(10)]
+        index = BM25Index(passages)
+        selected = select_passages(index, "alpha", top_k=3, token_budget=10_000)
+        assert len(selected) == 3
+        assert [p.position for p in selected] == sorted(p.position for p in selected)
+
+        selected = select_passages(index, "alpha", top_k=10, token_budget=1)
+        assert selected == []
+
+    def test_make_passages_skips_non_content(self):
+        """Test that only file and page contents are split into passages."""
+        contents = ["Input from stdin:\nhello", "Content from file a.md:\nbody text"]
+        passages = make_passages(contents)
+        assert [(p.source, p.text) for p in passages] == [(1, "body text")]
+
+    def test_retrieve_context_keeps_attribution(self):
+        """Test that selected excerpts keep their source header."""
+        body = "".join(f"Section {i}: generic filler text about topics.\n\n" for i in range(200))
+        body += "Section X: the deployment uses kubernetes with helm charts.\n\n"
+        contents = [
+            "Input from stdin:\nhow is it deployed?",
+            f"Content from file manual.md (encoding: utf-8):\n{body}",
+            "Content from file other.md (encoding: utf-8):\n" + "unrelated words here\n\n" * 300,
+        ]
+        result = retrieve_context(contents, "kubernetes helm deployment", top_k=1, token_budget=1000)
+        assert result[0] == contents[0]
+        assert result[1].startswith("Content from file manual.md (encoding: utf-8) [1 of ")
+        assert "kubernetes" in result[1]
+        assert result[2].endswith("no relevant passages")
+
+    def test_retrieve_context_noop_when_within_budget(self):
+        """Test that small inputs are sent unchanged."""
+        contents = ["Content from file a.md:\nshort"]
+        assert retrieve_context(contents, "anything", token_budget=1000) == contents
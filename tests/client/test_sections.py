@@ -0,0 +1,96 @@
+"""Tests for the sections module."""
+
+import re
+
+import pytest
+
+from lib.client.exceptions import APICallError, ClientError
+from lib.client.sections import (
+    CONTEXT_ACK,
+    Outline,
+    Section,
+    expand_sections,
+    merge_sections,
+    parse_outline,
+    request_outline,
+)
+
+OUTLINE_REPLY = """TITLE: Lunar Base Plan
+1. Scope | What the base must do
+2) **Schedule** | Phases and milestones
+3. Risks
+"""
+
+
+def write_sections(fail_section=None):
+    """Responder that outlines, then writes each requested section."""
+
+    def respond(context):
+        request = context[-1]
+        if request.startswith("Before writing anything"):
+            return OUTLINE_REPLY
+        number = int(re.search(r"Write only section (\d+)", request).group(1))
+        if number == fail_section:
+            raise APICallError("Error querying claude-sonnet-4: overloaded")
+        return f"# {number}. Heading from the model\n\nBody {number}, see Section {4 - number}."
+
+    return respond
+
+
+class TestOutline:
+    """Test cases for requesting and parsing outlines."""
+
+    def test_parse(self):
+        """Test that titles, scopes and loosely formatted numbering are read and renumbered."""
+        outline = parse_outline(OUTLINE_REPLY)
+        assert outline.title == "Lunar Base Plan"
+        assert outline.sections == [
+            Section(1, "Scope", "What the base must do"),
+            Section(2, "Schedule", "Phases and milestones"),
+            Section(3, "Risks", "Risks"),
+        ]
+        with pytest.raises(ClientError):
+            parse_outline("Here is a plan without any sections.")
+
+    def test_request_shares_cached_context(self, fake_client):
+        """Test that the outline and every section send the same context message with caching on."""
+        client = fake_client(write_sections())
+        outline = request_outline(client, "claude-sonnet-4", "CONTEXT")
+        expand_sections(client, "claude-sonnet-4", "CONTEXT", outline)
+        assert len(client.contexts) == 4
+        assert all(context[:2] == ["CONTEXT", CONTEXT_ACK] and cache for context, cache in client.contexts)
+
+
+class TestExpandAndMerge:
+    """Test cases for writing sections concurrently and merging them."""
+
+    def test_concurrent_and_ordered(self, fake_client):
+        """Test that sections are written at the same time and merged in outline order."""
+        client = fake_client(write_sections(), together=3)
+        outline = parse_outline(OUTLINE_REPLY)
+        texts = expand_sections(client, "claude-sonnet-4", "CONTEXT", outline, max_workers=3)
+        assert client.peak == 3
+
+        plan, problems = merge_sections(outline, texts)
+        assert plan.startswith("# Lunar Base Plan\n\n## 1. Scope\n\nBody 1, see Section 3.")
+        assert plan.index("## 2. Schedule") < plan.index("## 3. Risks")
+        assert "Heading from the model" not in plan
+        assert problems == []
+
+    def test_model_heading_replaced_only_when_it_is_the_section(self):
+        """Test that a heading with another number is kept as content, not taken for the section heading."""
+        outline = Outline("", [Section(1, "Scope", "s")])
+        plan, _ = merge_sections(outline, ["## 1. Our scope\n\nBody"])
+        assert plan == "## 1. Scope\n\nBody"
+        for heading in ("### 10 tips for launch", "### 1.5 Background"):
+            plan, _ = merge_sections(outline, [f"{heading}\n\nBody"])
+            assert plan == f"## 1. Scope\n\n{heading}\n\nBody"
+
+    def test_failed_section_and_dangling_reference(self, fake_client):
+        """Test that a failed section leaves a note and references to missing sections are reported."""
+        client = fake_client(write_sections(fail_section=2))
+        outline = Outline("", [Section(1, "Scope", "s"), Section(2, "Schedule", "s")])
+        texts = expand_sections(client, "claude-sonnet-4", "CONTEXT", outline)
+        plan, problems = merge_sections(outline, texts)
+        assert "## 2. Schedule\n\n_This section could not be generated._" in plan
+        assert problems == ["Section 1 refers to Section 3, which is not in the outline"]
@@ -0,0 +1,63 @@
+"""Tests for the session module."""
+
+import pytest
+
+from lib.client.exceptions import APICallError
+from lib.client.session import Session
+
+
+def numbered_answers(fail=False):
+    """Responder streaming "answer N" for the Nth request, or failing partway through."""
+    count = []
+
+    def respond(context):
+        count.append(context)
+        yield "answer "
+        if fail:
+            raise APICallError("connection reset")
+        yield str(len(count))
+
+    return respond
+
+
+class TestSession:
+    """Test cases for stored multi-turn sessions."""
+
+    def test_turns_extend_a_stable_prefix(self, tmp_path, fake_client):
+        """Test that each turn resends the previous turns unchanged, with caching requested."""
+        session = Session("docs", tmp_path)
+        session.add_material(["File a", "Page b"], ["a.md", "https://b.example.com"])
+        client = fake_client(numbered_answers())
+
+        assert "".join(session.ask(client, "m", "Q1")) == "answer 1"
+        session.add_material(["File c"], ["c.md"])
+        assert "".join(session.ask(client, "m", "Q2")) == "answer 2"
+
+        first, second = client.contexts
+        assert first == (["File a\n\nPage b\n\nQ1"], True)
+        assert second[0] == ["File a\n\nPage b\n\nQ1", "answer 1", "File c\n\nQ2"]
+        assert session.sources == ["a.md", "https://b.example.com", "c.md"]
+
+    def test_resume_from_disk(self, tmp_path, fake_client):
+        """Test that a reopened session continues without its material being ingested again."""
+        session = Session("work", tmp_path)
+        session.add_material(["Spec"], ["spec.md"])
+        list(session.ask(fake_client(numbered_answers()), "m", "Q1"))
+
+        resumed = Session("work", tmp_path)
+        assert resumed.exists and resumed.sources == ["spec.md"]
+        client = fake_client(numbered_answers())
+        list(resumed.ask(client, "m", "Q2"))
+        assert client.contexts[0][0] == ["Spec\n\nQ1", "answer 1", "Q2"]
+
+    def test_failed_turn_not_recorded(self, tmp_path, fake_client):
+        """Test that a turn whose stream fails leaves the session as it was."""
+        session = Session("s", tmp_path)
+        with pytest.raises(APICallError):
+            list(session.ask(fake_client(numbered_answers(fail=True)), "m", "Q"))
+        assert session.turns == [] and not session.exists
+
+    def test_invalid_name(self, tmp_path):
+        """Test that names that are not plain file names are rejected."""
+        with pytest.raises(ValueError):
+            Session("../escape", tmp_path)
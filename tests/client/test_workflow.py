@@ -0,0 +1,146 @@
+"""Tests for the workflow module."""
+
+import json
+import textwrap
+import time
+
+import pytest
+
+from lib.client.cache import DiskCache
+from lib.client.exceptions import WorkflowError
+from lib.client.workflow import WorkflowRunner, load_workflow
+
+# Stands in for tech16-coder: the prompt file says what to write, how long to take, or to fail
+FAKE_CODER = textwrap.dedent(
+    """
+    import sys, time
+    from pathlib import Path
+
+    args = sys.argv[1:]
+    model, files = args[1], args[2:]
+    inputs = "".join(Path(path).read_text() for path in files[:-1] if "://" not in path)
+    note = ""
+    with open("calls.log", "a") as log:
+        log.write(files[-1] + "\\n")
+    for line in Path(files[-1]).read_text().splitlines():
+        command, _, value = line.partition(" ")
+        if command == "SLEEP":
+            time.sleep(float(value))
+        elif command == "FAIL":
+            sys.exit("model refused")
+        elif command == "NOTE":
+            note = value
+        elif command == "WRITE":
+            Path(value).parent.mkdir(parents=True, exist_ok=True)
+            Path(value).write_text(f"{model}:{inputs}{note}")
+    """
+)
+
+
+def make_workflow(tmp_path, steps):
+    (tmp_path / "fake_coder.py").write_text(FAKE_CODER)
+    for name, spec in steps.items():
+        (tmp_path / f"{name}.md").write_text(spec.pop("script"))
+        spec["prompt"] = f"{name}.md"
+    path = tmp_path / "build.json"
+    path.write_text(json.dumps({"model": "o4-mini", "steps": steps}))
+    return load_workflow(str(path))
+
+
+def run(tmp_path, workflow, **kwargs):
+    runner = WorkflowRunner(
+        workflow, {"coder": str(tmp_path / "fake_coder.py")}, cache=DiskCache("workflow", tmp_path / "cache"), **kwargs
+    )
+    return runner, {result.name: result.status for result in runner.run()}
+
+
+def calls(tmp_path):
+    return (tmp_path / "calls.log").read_text().split()
+
+
+def chain_steps():
+    return {
+        "schema": {"script": "SLEEP 0.5\nWRITE out/schema.sql", "outputs": ["out/schema.sql"]},
+        "docs": {"script": "SLEEP 0.5\nWRITE out/docs.md", "outputs": ["out/docs.md"]},
+        "api": {"script": "WRITE out/api.py", "inputs": ["out/schema.sql"], "outputs": ["out/api.py"]},
+    }
+
+
+class TestLoadWorkflow:
+    """Test cases for reading workflow files."""
+
+    def test_dependencies_from_files(self, tmp_path):
+        """Test that steps depend on the steps writing their inputs, and 'after' adds more."""
+        steps = chain_steps()
+        steps["docs"]["after"] = ["api"]
+        workflow = make_workflow(tmp_path, steps)
+        assert workflow.dependencies == {"schema": set(), "api": {"schema"}, "docs": {"api"}}
+        assert workflow.order() == ["schema", "api", "docs"]
+
+    def test_invalid(self, tmp_path):
+        """Test that cycles and colliding outputs are rejected."""
+        with pytest.raises(WorkflowError, match="cycle"):
+            make_workflow(tmp_path, {
+                "a": {"script": "", "inputs": ["b.txt"], "outputs": ["a.txt"]},
+                "b": {"script": "", "inputs": ["a.txt"], "outputs": ["b.txt"]},
+            })
+        with pytest.raises(WorkflowError, match="both output"):
+            make_workflow(tmp_path, {
+                "a": {"script": "", "outputs": ["x.txt"]},
+                "b": {"script": "", "outputs": ["x.txt"]},
+            })
+
+
+class TestWorkflowRunner:
+    """Test cases for running steps."""
+
+    def test_independent_steps_overlap(self, tmp_path, monkeypatch):
+        """Test that independent steps run together and the critical path is the longest chain."""
+        monkeypatch.chdir(tmp_path)
+        workflow = make_workflow(tmp_path, chain_steps())
+        started = time.perf_counter()
+        runner, statuses = run(tmp_path, workflow)
+        elapsed = time.perf_counter() - started
+
+        assert statuses == {"schema": "ran", "docs": "ran", "api": "ran"}
+        assert (tmp_path / "out/api.py").read_text() == "o4-mini:o4-mini:"
+        assert elapsed < 0.95  # Not the 1s of both sleeps in series
+        path = [timing.name for timing in runner.pipeline.critical_path()]
+        assert path[-1] == "api" and path[0] in ("schema", "docs")
+
+    def test_rerun_skips_unchanged_steps(self, tmp_path, monkeypatch):
+        """Test that only steps downstream of a change run again, and missing outputs are restored."""
+        monkeypatch.chdir(tmp_path)
+        workflow = make_workflow(tmp_path, chain_steps())
+        run(tmp_path, workflow)
+        assert len(calls(tmp_path)) == 3
+
+        assert set(run(tmp_path, workflow)[1].values()) == {"up to date"}
+        (tmp_path / "out/docs.md").unlink()
+        (tmp_path / "schema.md").write_text("NOTE v2\nWRITE out/schema.sql\n")
+        _, statuses = run(tmp_path, workflow)
+        assert statuses == {"schema": "ran", "docs": "restored", "api": "ran"}
+        assert (tmp_path / "out/docs.md").exists()
+        assert (tmp_path / "out/api.py").read_text() == "o4-mini:o4-mini:v2"
+        assert len(calls(tmp_path)) == 5
+
+    def test_url_inputs_expire(self, tmp_path, monkeypatch):
+        """Test that a step with URL inputs reuses its outputs only within its URL TTL."""
+        monkeypatch.chdir(tmp_path)
+        steps = {
+            "csv": {"script": "WRITE out/a.csv", "inputs": ["https://example.com/data"], "outputs": ["out/a.csv"]},
+            "web": {"script": "WRITE out/b.js", "inputs": ["out/a.csv"], "outputs": ["out/b.js"]},
+        }
+        workflow = make_workflow(tmp_path, steps)
+        run(tmp_path, workflow)
+        assert run(tmp_path, workflow)[1] == {"csv": "up to date", "web": "up to date"}
+        assert run(tmp_path, workflow, url_ttl=0)[1] == {"csv": "ran", "web": "up to date"}
+        assert len(calls(tmp_path)) == 3
+
+    def test_failure_skips_dependents(self, tmp_path, monkeypatch):
+        """Test that a failed step skips the steps needing it while the others finish."""
+        monkeypatch.chdir(tmp_path)
+        steps = chain_steps()
+        steps["schema"]["script"] = "FAIL"
+        _, statuses = run(tmp_path, make_workflow(tmp_path, steps))
+        assert statuses == {"schema": "failed", "api": "skipped", "docs": "ran"}